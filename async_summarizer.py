@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Async Summarizer Module
+
+Concurrent summary generation with AsyncAnthropic, paced to stay under
+the account's request and token rate limits
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Optional, Dict, List, Tuple, Hashable
+
+from text_compactor import estimate_tokens
+from circuit_breaker import CLOSED
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+
+
+class TokenRateScheduler:
+    """
+    Sliding one-minute window over requests, input tokens and output tokens
+
+    Each call reserves its estimated input tokens and max_tokens of output
+    before it is sent, and the reservation is corrected to the real usage
+    once the response arrives.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None,
+                 input_tokens_per_minute: Optional[int] = None,
+                 output_tokens_per_minute: Optional[int] = None):
+        """
+        Initialize scheduler
+
+        Args:
+            requests_per_minute: Request budget (ANTHROPIC_RPM)
+            input_tokens_per_minute: Input token budget (ANTHROPIC_INPUT_TPM)
+            output_tokens_per_minute: Output token budget (ANTHROPIC_OUTPUT_TPM)
+        """
+        self.requests_per_minute = requests_per_minute or int(os.getenv('ANTHROPIC_RPM', 50))
+        self.input_tokens_per_minute = input_tokens_per_minute or int(os.getenv('ANTHROPIC_INPUT_TPM', 50000))
+        self.output_tokens_per_minute = output_tokens_per_minute or int(os.getenv('ANTHROPIC_OUTPUT_TPM', 10000))
+
+        self._window = deque()  # [timestamp, input_tokens, output_tokens]
+        # summarize_batch runs every burst in a fresh event loop, possibly from
+        # another thread: the window is shared, the FIFO lock is per loop
+        self._window_lock = threading.Lock()
+        self._loop_locks = weakref.WeakKeyDictionary()
+
+    def _prune(self, now: float):
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _fits(self, input_tokens: int, output_tokens: int) -> bool:
+        # A single call larger than the whole budget still goes through on an empty window
+        if not self._window:
+            return True
+        used_input = sum(entry[1] for entry in self._window)
+        used_output = sum(entry[2] for entry in self._window)
+        return (len(self._window) < self.requests_per_minute
+                and used_input + input_tokens <= self.input_tokens_per_minute
+                and used_output + output_tokens <= self.output_tokens_per_minute)
+
+    async def acquire(self, input_tokens: int, output_tokens: int) -> List:
+        """
+        Wait until the call fits in the current window and reserve it
+
+        Args:
+            input_tokens: Estimated input tokens
+            output_tokens: Maximum output tokens
+
+        Returns:
+            Reservation to pass to record()
+        """
+        loop = asyncio.get_running_loop()
+        with self._window_lock:
+            lock = self._loop_locks.get(loop)
+            if lock is None:
+                lock = self._loop_locks[loop] = asyncio.Lock()
+
+        # Calls of one loop are admitted in FIFO order
+        async with lock:
+            while True:
+                with self._window_lock:
+                    now = time.monotonic()
+                    self._prune(now)
+                    if self._fits(input_tokens, output_tokens):
+                        reservation = [now, input_tokens, output_tokens]
+                        self._window.append(reservation)
+                        return reservation
+                    wait = WINDOW_SECONDS - (now - self._window[0][0])
+
+                logger.debug(f"Rate budget exhausted, waiting {wait:.1f}s")
+                await asyncio.sleep(max(wait, 0.05))
+
+    @staticmethod
+    def record(reservation: List, input_tokens: int, output_tokens: int):
+        """Replace reserved token counts with the actual usage of the call"""
+        reservation[1] = input_tokens
+        reservation[2] = output_tokens
+
+
+class AsyncSummarizationService:
+    """Generates many summaries concurrently through AsyncAnthropic"""
+
+    def __init__(self, summarizer, max_concurrency: Optional[int] = None,
+                 scheduler: Optional[TokenRateScheduler] = None):
+        """
+        Initialize service
+
+        Args:
+            summarizer: ClaudeSummarizer providing prompts, cache and compaction
+            max_concurrency: Maximum number of in-flight API calls (SUMMARY_CONCURRENCY)
+            scheduler: Optional shared TokenRateScheduler
+        """
+        self.summarizer = summarizer
+        self.max_concurrency = max_concurrency or int(os.getenv('SUMMARY_CONCURRENCY', 5))
+        self.scheduler = scheduler or TokenRateScheduler()
+
+    def is_available(self) -> bool:
+        """Check if the underlying summarizer can call the API"""
+        return self.summarizer.is_available()
+
+    def can_summarize(self) -> bool:
+        """Check if summaries can be produced at all (API or local fallback)"""
+        return self.summarizer.is_available() or self.summarizer.fallback is not None
+
+    def retry_in(self) -> float:
+        """Seconds until the API circuit lets calls through again"""
+        return self.summarizer.breaker.retry_in()
+
+    async def _call(self, client, semaphore: asyncio.Semaphore, params: Dict):
+        """One paced API call returning (message, usage)"""
+        estimated_input = sum(estimate_tokens(block['text']) for block in params.get('system', []))
+        estimated_input += sum(estimate_tokens(m['content']) for m in params['messages'])
+
+        async with semaphore:
+            reservation = await self.scheduler.acquire(estimated_input, params['max_tokens'])
+            breaker = self.summarizer.breaker
+            breaker.before_call()
+            started = time.monotonic()
+            try:
+                message = await client.messages.create(**params)
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+            breaker.record_success()
+            latency = time.monotonic() - started
+
+        usage = self.summarizer.record_usage(message, latency)
+        self.scheduler.record(reservation, usage['input_tokens'], usage['output_tokens'])
+        return message, usage
+
+    async def _summarize_one(self, client, semaphore: asyncio.Semaphore,
+                             document_text: str, document_name: str) -> Optional[Dict]:
+        try:
+            request = self.summarizer.prepare_request(document_text, document_name)
+            if request is None or 'summary' in request:
+                return request
+
+            usages = []
+            params = request.get('params')
+
+            if request['strategy'] == 'map_reduce':
+                mapped = await asyncio.gather(*[
+                    self._call(client, semaphore, map_params) for map_params in request['map_params']
+                ])
+                usages.extend(usage for _, usage in mapped)
+                params = self.summarizer.build_reduce_params(
+                    document_name, [self.summarizer.extract_text(message) for message, _ in mapped]
+                )
+
+            message, usage = await self._call(client, semaphore, params)
+            usages.append(usage)
+
+            return self.summarizer.finish(request, self.summarizer.extract_text(message), usages)
+
+        except Exception as e:
+            self.summarizer.handle_error(e)
+            return self.summarizer.fallback_result(document_text, document_name)
+
+    async def summarize_many(self, items: List[Tuple[Hashable, str, str]]) -> Dict[Hashable, Optional[Dict]]:
+        """
+        Summarize documents concurrently
+
+        Args:
+            items: List of (key, document_text, document_name)
+
+        Returns:
+            Dictionary mapping key to the summarizer result (None if not generated)
+        """
+        if not items:
+            return {}
+
+        client = None
+        if self.summarizer.is_available():
+            import anthropic
+            client = anthropic.AsyncAnthropic(api_key=self.summarizer.api_key)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.monotonic()
+
+        try:
+            summaries = []
+            pending = list(items)
+            if self.summarizer.breaker.state != CLOSED:
+                # Recovering circuit: one document probes the API before the rest is sent
+                _, text, name = pending.pop(0)
+                summaries.append(await self._summarize_one(client, semaphore, text, name))
+
+            summaries.extend(await asyncio.gather(*[
+                self._summarize_one(client, semaphore, text, name)
+                for _, text, name in pending
+            ]))
+        finally:
+            if client is not None:
+                await client.close()
+
+        results = {key: summary for (key, _, _), summary in zip(items, summaries)}
+        logger.info(
+            f"Summarized {sum(1 for s in summaries if s)}/{len(items)} documents "
+            f"in {time.monotonic() - started:.1f}s (concurrency {self.max_concurrency})"
+        )
+        return results
+
+    def summarize_batch(self, items: List[Tuple[Hashable, str, str]]) -> Dict[Hashable, Optional[Dict]]:
+        """
+        Blocking wrapper around summarize_many for the synchronous scraper loop
+
+        A fresh event loop and client are used per call, so the service can be
+        driven from any thread.
+        """
+        return asyncio.run(self.summarize_many(items))
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Batch Summarizer Module
+
+Bulk (re-)summarization through the Message Batches API for backfills.
+Live, latency-sensitive summaries keep using ClaudeSummarizer directly.
+"""
+
+import os
+import time
+import logging
+from typing import Optional, Dict, List
+
+from claude_summarizer import language_summary_rows
+
+logger = logging.getLogger(__name__)
+
+
+def _batches_api(client):
+    """Message Batches resource (GA in newer SDKs, beta in anthropic 0.39)"""
+    batches = getattr(client.messages, 'batches', None)
+    return batches if batches is not None else client.beta.messages.batches
+
+
+def fetch_document_text(db, pdf_processor, document: Dict) -> Optional[str]:
+    """
+    Text of a stored document
+
+    Uses document['text'] (joined page text) when present, otherwise
+    downloads and extracts the PDF and stores its pages for next time.
+
+    Args:
+        db: Database
+        pdf_processor: Optional PDFProcessor, None to skip extraction
+        document: Dictionary with 'id', 'document_url' and optional 'text'
+
+    Returns:
+        Text or None
+    """
+    if document.get('text'):
+        return document['text']
+    if pdf_processor is None:
+        return None
+
+    pdf_path = None
+    try:
+        result = pdf_processor.process_pdf(
+            document['document_url'], text_lookup=db.get_page_texts_by_hash
+        )
+        pdf_path = result.get('pdf_path')
+        if result.get('pages'):
+            db.save_document_pages(document['id'], result['pages'])
+        return result.get('text')
+    finally:
+        if pdf_path:
+            pdf_processor.cleanup_temp_file(pdf_path)
+
+
+class BatchSummarizer:
+    """Submits many documents in one batch, polls it and writes summaries back in bulk"""
+
+    def __init__(self, summarizer, db, pdf_processor=None, poll_interval: Optional[int] = None,
+                 max_requests: Optional[int] = None, client=None):
+        """
+        Initialize Batch Summarizer
+
+        Args:
+            summarizer: ClaudeSummarizer providing prompts, cache and compaction
+            db: Database used for document texts, checkpoints and bulk writes
+            pdf_processor: Optional PDFProcessor for documents without stored page text
+            poll_interval: Seconds between batch status checks (BATCH_POLL_INTERVAL)
+            max_requests: Maximum requests per submitted batch (BATCH_MAX_REQUESTS)
+            client: Optional Anthropic client (e.g. pointed at a local fake endpoint)
+        """
+        self.summarizer = summarizer
+        self.db = db
+        self.pdf_processor = pdf_processor
+        self.poll_interval = (poll_interval if poll_interval is not None
+                              else int(os.getenv('BATCH_POLL_INTERVAL', 60)))
+        self.max_requests = max_requests or int(os.getenv('BATCH_MAX_REQUESTS', 10000))
+        self.client = client or getattr(summarizer, 'client', None)
+
+    @staticmethod
+    def _custom_id(document_id: int) -> str:
+        return f"doc-{document_id}"
+
+    @staticmethod
+    def _document_id(custom_id: str) -> int:
+        return int(custom_id.split('-', 1)[1])
+
+    def _document_text(self, document: Dict) -> Optional[str]:
+        """Stored page text, or freshly extracted text for older rows"""
+        return fetch_document_text(self.db, self.pdf_processor, document)
+
+    def submit(self, season: Optional[str] = None, missing_only: bool = True) -> List[str]:
+        """
+        Package documents into batch submissions
+
+        Summaries already in the summary cache are written immediately and
+        not submitted. Each batch is checkpointed in summary_batches right
+        after submission so an interrupted run can be resumed.
+
+        Args:
+            season: Only documents of this season
+            missing_only: Only documents without a summary
+
+        Returns:
+            List of submitted batch ids
+        """
+        documents = self.db.get_documents_for_summary(season=season, missing_only=missing_only)
+        logger.info(f"{len(documents)} document(s) selected for batch summarization")
+
+        requests_ = []
+        cached = []
+        cached_languages = []
+        for document in documents:
+            text = self._document_text(document)
+            if not text:
+                logger.warning(f"No text for document ID {document['id']}, skipping")
+                continue
+
+            # One request per document: long texts are truncated rather than map-reduced
+            request = self.summarizer.prepare_request(text, document['document_name'],
+                                                      allow_map_reduce=False, allow_fallback=False)
+            if request is None:
+                continue
+            if 'summary' in request:
+                cached.append((document['id'], request['summary'], request['strategy'],
+                               request['source'], 0, 0))
+                cached_languages.extend(language_summary_rows(document['id'], request))
+                continue
+
+            requests_.append({
+                'custom_id': self._custom_id(document['id']),
+                'params': request['params']
+            })
+
+        if cached:
+            self.db.update_summaries(cached, cached_languages)
+            logger.info(f"{len(cached)} summaries served from cache")
+
+        if requests_ and self.client is None:
+            logger.error("Anthropic client not available, cannot submit batch")
+            return []
+
+        batch_ids = []
+        for start in range(0, len(requests_), self.max_requests):
+            chunk = requests_[start:start + self.max_requests]
+            batch = _batches_api(self.client).create(requests=chunk)
+            self.db.create_summary_batch(batch.id, [self._document_id(r['custom_id']) for r in chunk])
+            batch_ids.append(batch.id)
+            logger.info(f"Submitted batch {batch.id} with {len(chunk)} request(s)")
+
+        return batch_ids
+
+    def wait(self, batch_id: str, timeout: Optional[int] = None) -> bool:
+        """
+        Poll a batch until it has ended
+
+        Args:
+            batch_id: Batch id
+            timeout: Optional maximum seconds to wait
+
+        Returns:
+            True if the batch ended, False on timeout
+        """
+        started = time.time()
+        while True:
+            batch = _batches_api(self.client).retrieve(batch_id)
+            counts = batch.request_counts
+            logger.info(
+                f"Batch {batch_id}: {batch.processing_status} "
+                f"(processing {counts.processing}, succeeded {counts.succeeded}, errored {counts.errored})"
+            )
+            if batch.processing_status == 'ended':
+                return True
+            if timeout is not None and time.time() - started >= timeout:
+                return False
+            time.sleep(self.poll_interval)
+
+    def collect(self, batch_id: str) -> int:
+        """
+        Write the results of an ended batch back in bulk
+
+        Args:
+            batch_id: Batch id
+
+        Returns:
+            Number of summaries written
+        """
+        summaries = []
+        language_summaries = []
+        failed = 0
+        entries = list(_batches_api(self.client).results(batch_id))
+        # Original texts, so batch results land in the summary cache as well
+        texts = self.db.get_texts_for_documents([self._document_id(e.custom_id) for e in entries])
+
+        for entry in entries:
+            if entry.result.type != 'succeeded':
+                failed += 1
+                continue
+            document_id = self._document_id(entry.custom_id)
+            text = texts.get(document_id)
+            message = entry.result.message
+            usage = self.summarizer.record_usage(message)
+            result = self.summarizer.finish(
+                {'strategy': self.summarizer.single_call_strategy(text), 'cache_text': text, 'batch': True},
+                self.summarizer.extract_text(message), [usage]
+            )
+            if result:
+                summaries.append((document_id, result['summary'], result['strategy'], result['source'],
+                                  result['input_tokens'], result['output_tokens']))
+                language_summaries.extend(language_summary_rows(document_id, result))
+
+        self.db.update_summaries(summaries, language_summaries)
+        self.db.set_summary_batch_status(batch_id, 'completed')
+        logger.info(f"Batch {batch_id}: {len(summaries)} summaries written, {failed} failed")
+        return len(summaries)
+
+    def resume(self) -> int:
+        """
+        Finish batches left open by an earlier run
+
+        Returns:
+            Number of summaries written
+        """
+        written = 0
+        for batch_id in self.db.get_open_summary_batches():
+            logger.info(f"Resuming batch {batch_id}")
+            if self.wait(batch_id):
+                written += self.collect(batch_id)
+        return written
+
+    def run(self, season: Optional[str] = None, missing_only: bool = True) -> int:
+        """
+        Resume open batches, submit new ones and wait for all of them
+
+        Returns:
+            Number of summaries written by batches
+        """
+        written = self.resume()
+        for batch_id in self.submit(season=season, missing_only=missing_only):
+            if self.wait(batch_id):
+                written += self.collect(batch_id)
+        return written
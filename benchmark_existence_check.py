@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-document existence checks vs one bulk lookup
+
+Compares the old process_documents pattern (document_exists + document_exists_by_hash
+for every scraped document, each checking out a pool connection) with
+Database.get_existing_documents for one cycle of N documents, reporting
+database round trips and wall time.
+
+By default the database is simulated: every statement costs --rtt
+milliseconds, like a network round trip to Postgres. With --real the
+configured database (DB_* variables) is used; the synthetic URLs and
+hashes do not exist there, which is the worst case for both paths.
+
+Usage:
+    python benchmark_existence_check.py [--documents 300] [--rtt 1.0] [--real]
+"""
+
+import sys
+import time
+import hashlib
+import logging
+import argparse
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+from old_database import Database
+
+logging.basicConfig(level=logging.WARNING)
+
+
+class CountingPool:
+    """Connection pool wrapper counting checkouts and statements"""
+
+    def __init__(self, pool, rtt=0.0):
+        self.pool = pool
+        self.rtt = rtt
+        self.checkouts = 0
+        self.statements = 0
+
+    def getconn(self):
+        self.checkouts += 1
+        return _CountingConnection(self.pool.getconn(), self)
+
+    def putconn(self, connection):
+        self.pool.putconn(connection.connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.getconn()
+        try:
+            yield connection
+        finally:
+            self.putconn(connection)
+
+    def closeall(self):
+        self.pool.closeall()
+
+
+class _CountingConnection:
+    def __init__(self, connection, counter):
+        self.connection = connection
+        self.counter = counter
+
+    def cursor(self, *args, **kwargs):
+        return _CountingCursor(self.connection.cursor(*args, **kwargs), self.counter)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+class _CountingCursor:
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cursor.close()
+
+    def execute(self, *args, **kwargs):
+        self.counter.statements += 1
+        if self.counter.rtt:
+            time.sleep(self.counter.rtt)
+        return self.cursor.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class SimulatedPool:
+    """Stands in for Postgres: every lookup finds nothing"""
+
+    class _Cursor:
+        def execute(self, *args, **kwargs):
+            pass
+
+        def fetchone(self):
+            return None
+
+        def fetchall(self):
+            return []
+
+        def close(self):
+            pass
+
+    class _Connection:
+        def cursor(self, *args, **kwargs):
+            return SimulatedPool._Cursor()
+
+        def rollback(self):
+            pass
+
+    def getconn(self):
+        return self._Connection()
+
+    def putconn(self, connection):
+        pass
+
+    def closeall(self):
+        pass
+
+
+def make_documents(count):
+    """Synthetic scraped documents"""
+    return [
+        {'url': f"https://example.invalid/benchmark/document-{i}.pdf",
+         'hash': hashlib.sha256(f"benchmark-{i}".encode()).hexdigest()}
+        for i in range(count)
+    ]
+
+
+def per_document_checks(db, documents):
+    """The old cycle: two queries per document"""
+    new = 0
+    for doc in documents:
+        if db.document_exists(doc['url']):
+            continue
+        if db.document_exists_by_hash(doc['hash']):
+            continue
+        new += 1
+    return new
+
+
+def bulk_check(db, documents):
+    """The new cycle: one query for all documents"""
+    known_urls, known_hashes = db.get_existing_documents(
+        [doc['url'] for doc in documents], [doc['hash'] for doc in documents]
+    )
+    return sum(1 for doc in documents if doc['url'] not in known_urls and doc['hash'] not in known_hashes)
+
+
+def run(db, pool, name, check, documents):
+    pool.checkouts = pool.statements = 0
+    started = time.perf_counter()
+    new = check(db, documents)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} {pool.statements:>12} {pool.checkouts:>10} {elapsed * 1000:>11.1f} ms   ({new} new)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark document existence checks')
+    parser.add_argument('--documents', type=int, default=300, help='Documents per scrape cycle')
+    parser.add_argument('--rtt', type=float, default=1.0, help='Simulated round trip in milliseconds')
+    parser.add_argument('--real', action='store_true', help='Use the configured database')
+    args = parser.parse_args()
+
+    if args.real:
+        load_dotenv()
+        db = Database()
+        pool = CountingPool(db.connection_pool)
+        print(f"Database: configured Postgres, {args.documents} documents")
+    else:
+        db = Database.__new__(Database)
+        pool = CountingPool(SimulatedPool(), rtt=args.rtt / 1000)
+        print(f"Database: simulated, {args.rtt} ms per round trip, {args.documents} documents")
+    db.connection_pool = pool
+
+    documents = make_documents(args.documents)
+    print(f"{'':<22} {'round trips':>12} {'checkouts':>10} {'wall time':>14}")
+    old = run(db, pool, 'per-document (2N)', per_document_checks, documents)
+    new = run(db, pool, 'bulk ANY(%s) (1)', bulk_check, documents)
+    print(f"Speedup: {old / new:.0f}x" if new else "")
+
+    pool.closeall()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
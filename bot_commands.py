@@ -6,21 +6,35 @@ Handles bot commands for controlling the FIA scraper
 
 import os
 import time
+import json
+import asyncio
 import logging
+from datetime import datetime, timedelta
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.constants import ParseMode
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 from old_database import Database
+from usage_tracker import month_start, governor_mode
+from telegram_notifier import TelegramNotifier, MESSAGE_LABELS
+from check_trigger import check_trigger
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds a Summarize tap waits for the summary before it is answered as pending
+CALLBACK_ANSWER_TIMEOUT = 8
+
 
 class BotCommandHandler:
     """Handles Telegram bot commands"""
 
-    def __init__(self, db: Database, allowed_chat_id: str):
+    def __init__(self, db: Database, allowed_chat_id: str, summary_worker=None):
         self.db = db
         self.allowed_chat_id = allowed_chat_id
+        self.summary_worker = summary_worker  # Summarizes documents on demand (Summarize button)
+        self.summarizing = set()  # Document IDs being summarized on demand
+        self.trigger = check_trigger(db)  # Wakes the scraper on /check and returns its results
+        self.check_reply_timeout = int(os.getenv('CHECK_REPLY_TIMEOUT', 900))
         logger.info(f"Bot command handler initialized for chat: {allowed_chat_id}")
 
     def is_authorized(self, update: Update) -> bool:
@@ -45,7 +59,8 @@ class BotCommandHandler:
             "  Примеры: 1800 = 30 мин, 3600 = 1 час\n\n"
             "📊 <b>Статистика:</b>\n"
             "/status - статус скрапера\n"
-            "/stats - статистика документов\n\n"
+            "/stats - статистика документов\n"
+            "/usage - расход токенов и бюджет API\n\n"
             "🔧 <b>Управление:</b>\n"
             "/check - принудительная проверка сейчас\n"
             "/enable - включить автоматический скрапинг\n"
@@ -137,9 +152,9 @@ class BotCommandHandler:
             enabled = self.db.get_setting('scraper_enabled', 'true')
             last_check = self.db.get_setting('last_check_time', '0')
 
-            # Get document count
-            docs = self.db.get_all_documents()
-            doc_count = len(docs)
+            # Get document count from the counters, latest document by index
+            doc_count = self.db.get_document_stats(days=1)['documents']
+            latest = self.db.get_latest_document()
 
             # Calculate time since last check
             last_check_int = int(last_check)
@@ -162,9 +177,10 @@ class BotCommandHandler:
             message += f"⏱ Интервал: {interval} сек ({int(interval)//60} мин)\n"
             message += f"🕐 Последняя проверка: {last_check_str}\n"
             message += f"📄 Документов в БД: {doc_count}\n"
+            message += self._format_circuit_state(self.db.get_setting('anthropic_circuit'))
+            message += self._format_pool_stats(self.db.pool_stats())
 
-            if docs and len(docs) > 0:
-                latest = docs[0]
+            if latest:
                 message += f"\n📌 Последний документ:\n"
                 message += f"   {latest['document_name'][:50]}..."
 
@@ -174,30 +190,76 @@ class BotCommandHandler:
             logger.error(f"Error getting status: {e}")
             await update.message.reply_text(f"❌ Ошибка получения статуса: {e}")
 
+    @staticmethod
+    def _format_pool_stats(stats) -> str:
+        """Line describing the database connection pool of this process"""
+        line = (f"🔌 Пул БД: {stats['in_use']}/{stats['size']} занято (макс. {stats['max']}), "
+                f"{stats['checkouts']} выдач, ожидание ср. {stats['avg_wait_ms']:.1f} мс / "
+                f"макс. {stats['max_wait_ms']:.0f} мс")
+        if stats['timeouts'] or stats['errors']:
+            line += f", таймаутов {stats['timeouts']}, ошибок {stats['errors']}"
+        return line + "\n"
+
+    @staticmethod
+    def _format_circuit_state(raw_state) -> str:
+        """Line describing the Anthropic API circuit breaker published by the scraper"""
+        if not raw_state:
+            return ""
+        try:
+            circuit = json.loads(raw_state)
+        except ValueError:
+            return ""
+
+        if circuit['state'] == 'closed':
+            return "🤖 Anthropic API: ✅ доступен\n"
+
+        line = f"🤖 Anthropic API: ⛔ {'открыт' if circuit['state'] == 'open' else 'проверка'}"
+        if circuit.get('error_class'):
+            line += f" ({circuit['error_class']})"
+        if circuit['state'] == 'open' and circuit.get('opened_at'):
+            retry_at = circuit['opened_at'] + circuit.get('cooldown', 0)
+            line += f", повтор через {max(int(retry_at - time.time()), 0) // 60} мин."
+        return line + "\n"
+
     async def cmd_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command - show statistics"""
         if not self.is_authorized(update):
             return
 
         try:
-            docs = self.db.get_all_documents()
-            doc_count = len(docs)
+            stats = self.db.get_document_stats(days=7)
+            doc_count = stats['documents']
 
             if doc_count == 0:
                 await update.message.reply_text("📊 В базе данных пока нет документов")
                 return
 
-            # Calculate statistics
-            total_size = sum(doc['file_size'] or 0 for doc in docs)
-            total_size_mb = total_size / (1024 * 1024)
+            total_size_mb = stats['total_size'] / (1024 * 1024)
 
             # Get latest document
-            latest = docs[0] if docs else None
+            latest = self.db.get_latest_document()
 
             message = f"📊 <b>Статистика документов</b>\n\n"
             message += f"📄 Всего документов: {doc_count}\n"
             message += f"💾 Общий размер: {total_size_mb:.2f} MB\n"
 
+            if len(stats['by_season']) > 1 or len(stats['by_type']) > 1:
+                message += "\n🏁 По сезонам: " + ", ".join(
+                    f"{row['key'] or '—'}: {row['documents']}" for row in stats['by_season']
+                ) + "\n"
+                message += "🗃 По типам: " + ", ".join(
+                    f"{row['key'] or '—'}: {row['documents']}" for row in stats['by_type']
+                ) + "\n"
+            if stats['by_day']:
+                message += "📅 За 7 дней: " + ", ".join(
+                    f"{row['key']:%d.%m} — {row['documents']}" for row in stats['by_day']
+                ) + "\n"
+
+            cache_stats = self.db.get_summary_cache_stats()
+            if cache_stats['entries']:
+                message += f"🗂 Кэш саммари: {cache_stats['entries']} записей, "
+                message += f"попаданий {cache_stats['hits']} ({cache_stats['hit_rate']:.0%})\n"
+
             if latest:
                 message += f"\n📌 Последний добавленный:\n"
                 message += f"   {latest['document_name'][:60]}\n"
@@ -209,6 +271,50 @@ class BotCommandHandler:
             logger.error(f"Error getting stats: {e}")
             await update.message.reply_text(f"❌ Ошибка получения статистики: {e}")
 
+    async def cmd_usage(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /usage command - show API token usage, cost and budget"""
+        if not self.is_authorized(update):
+            return
+
+        try:
+            now = datetime.now()
+            since_month = month_start(now)
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+            days = self.db.get_api_usage_summary(today - timedelta(days=6), 'day')
+            month_spent = self.db.get_api_cost_since(since_month)
+            today_spent = sum(day['cost_usd'] for day in days if day['key'] == today.date())
+
+            message = "💰 <b>Расход API</b>\n\n"
+            message += f"Сегодня: ${today_spent:.2f}\n"
+            message += f"С начала месяца: ${month_spent:.2f}\n"
+
+            budget = float(os.getenv('MONTHLY_BUDGET_USD', 0))
+            if budget:
+                mode = governor_mode(month_spent, budget, now)
+                modes = {'normal': '🟢 обычный', 'economy': '🟡 экономия', 'local': '🔴 только локальные саммари'}
+                message += f"Бюджет: ${budget:.2f} ({month_spent / budget:.0%}), режим {modes[mode]}\n"
+
+            if days:
+                message += "\n<b>По дням:</b>\n"
+                for day in days:
+                    message += (f"  {day['key']:%d.%m}: ${day['cost_usd']:.2f}, {day['calls']} вызовов, "
+                                f"{day['input_tokens']} / {day['output_tokens']} токенов\n")
+
+            for group_by, title in [('source', 'По источнику'), ('doc_type', 'По типу документа')]:
+                rows = self.db.get_api_usage_summary(since_month, group_by)
+                if rows:
+                    message += f"\n<b>{title} (месяц):</b>\n"
+                    for row in sorted(rows, key=lambda r: -r['cost_usd']):
+                        message += (f"  {row['key']}: ${row['cost_usd']:.2f}, {row['calls']} вызовов, "
+                                    f"{row['without_call']} без вызова\n")
+
+            await update.message.reply_text(message, parse_mode='HTML')
+
+        except Exception as e:
+            logger.error(f"Error getting API usage: {e}")
+            await update.message.reply_text(f"❌ Ошибка получения расхода API: {e}")
+
     async def cmd_enable(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /enable command - enable scraping"""
         if not self.is_authorized(update):
@@ -247,26 +353,122 @@ class BotCommandHandler:
         if not self.is_authorized(update):
             return
 
+        username = update.effective_user.username or update.effective_user.first_name
+        request_id = self.trigger.request(username)
         await update.message.reply_text(
             "🔄 Принудительная проверка запущена...\n"
-            "Результаты будут отправлены автоматически"
+            "Результаты будут отправлены по завершении"
         )
-        # Set a flag to trigger immediate check
-        self.db.set_setting('force_check', 'true', 'bot_command')
-        logger.info("Force check triggered")
+        logger.info(f"Force check triggered by {username}")
+
+        # Wait in a background task: other commands are handled meanwhile
+        context.application.create_task(self._reply_check_result(update, request_id), update=update)
+
+    async def _reply_check_result(self, update: Update, request_id: str):
+        """Reply to /check with the results of the check it triggered"""
+        requested = time.monotonic()
+        result = await asyncio.to_thread(self.trigger.wait_result, request_id, self.check_reply_timeout)
+        try:
+            await update.message.reply_text(
+                self._format_check_result(result, time.monotonic() - requested), parse_mode='HTML'
+            )
+        except Exception as e:
+            logger.error(f"Error sending check result: {e}")
+
+    def _format_check_result(self, result, elapsed) -> str:
+        """Message describing the outcome of a /check"""
+        if result is None:
+            return (f"⏳ Скрапер не ответил за {self.check_reply_timeout // 60} мин.\n"
+                    f"Проверка будет выполнена, как только он освободится")
+        if result.get('disabled'):
+            return "⏸ Скрапинг выключен, проверка не выполнена\nВключить: /enable"
+        if result.get('error'):
+            return f"❌ Проверка завершилась ошибкой: {result['error']}"
+
+        message = "✅ <b>Проверка завершена</b>\n\n"
+        message += f"📄 Найдено на сайте: {result['found']}\n"
+        message += f"🆕 Новых: {result['new']}\n"
+        message += f"⏭ Уже в БД: {result['existing']}\n"
+        if result['new']:
+            message += f"📢 Опубликовано: {result['posted']}, со сводкой: {result['summaries']}\n"
+        message += f"\n⏱ Скрапинг: {result['scrape_seconds']:.1f} сек, вся проверка: {result['seconds']:.1f} сек\n"
+        message += f"⌛ От команды до результата: {elapsed:.1f} сек"
+        return message
+
+
+    async def cb_summarize(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle Summarize button - summarize a posted document on first tap and edit the post"""
+        query = update.callback_query
+        # Any reader of the channel may ask; the summary is made once and then served from the database
+        try:
+            _, document_id, language = query.data.split(':')
+            document_id = int(document_id)
+        except ValueError:
+            await query.answer()
+            return
+
+        labels = MESSAGE_LABELS.get(language, MESSAGE_LABELS['en'])
+        if self.summary_worker is None:
+            await query.answer(labels['unavailable'])
+            return
+        if document_id in self.summarizing:
+            await query.answer(labels['pending'])
+            return
+
+        self.summarizing.add(document_id)
+        started = time.monotonic()
+        answered = False
+        try:
+            # Extraction and the API call block: keep the bot responsive meanwhile
+            task = asyncio.ensure_future(asyncio.to_thread(self.summary_worker.summarize_document, document_id))
+            try:
+                document = await asyncio.wait_for(asyncio.shield(task), CALLBACK_ANSWER_TIMEOUT)
+            except asyncio.TimeoutError:
+                # A tap must be answered within seconds: say it is coming, then keep waiting
+                await query.answer(labels['pending'])
+                answered = True
+                document = await task
+        except Exception as e:
+            logger.error(f"Error summarizing document {document_id} on demand: {e}")
+            document = None
+        finally:
+            self.summarizing.discard(document_id)
+
+        if not document:
+            logger.warning(f"No summary for document {document_id} on demand")
+            if not answered:
+                await query.answer(labels['unavailable'])
+            return
+        if not answered:
+            await query.answer()
+
+        # Languages without a summary (templates are Russian only) just lose the button
+        document['summary'] = document['summaries'].get(language)
+        try:
+            await query.edit_message_text(
+                TelegramNotifier.format_document_message(document, language=language),
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=False
+            )
+            logger.info(f"On-demand summary of document {document_id} ({language}) posted "
+                        f"in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Error editing message with on-demand summary: {e}")
 
 
-async def setup_bot_handlers(application: Application, db: Database, chat_id: str):
+async def setup_bot_handlers(application: Application, db: Database, chat_id: str, summary_worker=None):
     """Setup bot command handlers"""
-    handler = BotCommandHandler(db, chat_id)
+    handler = BotCommandHandler(db, chat_id, summary_worker)
 
     application.add_handler(CommandHandler("start", handler.cmd_start))
     application.add_handler(CommandHandler("help", handler.cmd_help))
     application.add_handler(CommandHandler("interval", handler.cmd_interval))
     application.add_handler(CommandHandler("status", handler.cmd_status))
     application.add_handler(CommandHandler("stats", handler.cmd_stats))
+    application.add_handler(CommandHandler("usage", handler.cmd_usage))
     application.add_handler(CommandHandler("enable", handler.cmd_enable))
     application.add_handler(CommandHandler("disable", handler.cmd_disable))
     application.add_handler(CommandHandler("check", handler.cmd_check))
+    application.add_handler(CallbackQueryHandler(handler.cb_summarize, pattern=r'^summarize:'))
 
     logger.info("Bot command handlers registered")
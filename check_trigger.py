@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Check Trigger Module
+
+Wakes the sleeping scraper loop the moment /check is sent and hands the
+results of that check back to the bot. Within one process (run_with_bot.py)
+a condition variable does it directly; between processes the request and
+the results travel as Postgres NOTIFY messages.
+"""
+
+import os
+import json
+import time
+import uuid
+import select
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channels: payload {"id", "by"} resp. {"ids", "result"}
+CHECK_CHANNEL = 'fia_check'
+CHECK_DONE_CHANNEL = 'fia_check_done'
+
+# Results kept for bots that have not picked them up yet
+MAX_RESULTS = 100
+
+
+class CheckTrigger:
+    """Check requests and results, shared by the scraper loop and the bot of a process"""
+
+    def __init__(self, db, listen: Optional[bool] = None, reconnect_delay: Optional[int] = None):
+        """
+        Initialize Check Trigger
+
+        Args:
+            db: Database providing notify/listen
+            listen: Receive requests and results of other processes via LISTEN (CHECK_LISTEN, default true)
+            reconnect_delay: Seconds before reopening a lost listener connection (CHECK_LISTEN_RECONNECT)
+        """
+        self.db = db
+        self.listen = listen if listen is not None else os.getenv('CHECK_LISTEN', 'true').lower() == 'true'
+        self.reconnect_delay = reconnect_delay or int(os.getenv('CHECK_LISTEN_RECONNECT', 30))
+
+        self._condition = threading.Condition()
+        self._pending = []           # Request ids not picked up by the scraper yet
+        self._seen = set()           # Request ids already queued (own NOTIFYs come back too)
+        self._results = OrderedDict()
+        self._thread = None
+        self._closed = False
+
+    def _start(self):
+        with self._condition:
+            if not self.listen or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._listen, name='check-trigger', daemon=True)
+        self._thread.start()
+
+    def _listen(self):
+        """Listener thread: turn NOTIFY messages into local requests and results"""
+        while not self._closed:
+            connection = None
+            try:
+                connection = self.db.listen(CHECK_CHANNEL, CHECK_DONE_CHANNEL)
+                logger.info("Listening for check requests")
+                while not self._closed:
+                    if select.select([connection], [], [], 60) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self._receive(notify.channel, notify.payload)
+            except Exception as e:
+                logger.warning(f"Check listener lost, reconnecting in {self.reconnect_delay}s: {e}")
+                time.sleep(self.reconnect_delay)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _receive(self, channel: str, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed {channel} notification")
+            return
+        with self._condition:
+            if channel == CHECK_CHANNEL:
+                if message['id'] not in self._seen:
+                    logger.info(f"Check requested by {message.get('by') or 'unknown'}")
+                    self._seen.add(message['id'])
+                    self._pending.append(message['id'])
+            else:
+                for request_id in message['ids']:
+                    self._store_result(request_id, message['result'])
+            self._condition.notify_all()
+
+    def _store_result(self, request_id: str, result: Dict):
+        self._results[request_id] = result
+        while len(self._results) > MAX_RESULTS:
+            self._results.popitem(last=False)
+
+    def request(self, requested_by: str) -> str:
+        """
+        Ask for an immediate check
+
+        Args:
+            requested_by: Name recorded in the log
+
+        Returns:
+            Request id to wait for the result with
+        """
+        self._start()
+        request_id = uuid.uuid4().hex[:12]
+        with self._condition:
+            self._seen.add(request_id)
+            self._pending.append(request_id)
+            self._condition.notify_all()
+        try:
+            self.db.notify(CHECK_CHANNEL, json.dumps({'id': request_id, 'by': requested_by}))
+        except Exception as e:
+            logger.warning(f"Could not notify other processes of the check request: {e}")
+        return request_id
+
+    def wait(self, timeout: float) -> List[str]:
+        """
+        Sleep until a check is requested or the timeout passes
+
+        Args:
+            timeout: Seconds to sleep at most
+
+        Returns:
+            Ids of the requests that ended the sleep (empty on timeout)
+        """
+        self._start()
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed, timeout)
+            request_ids, self._pending = self._pending, []
+            return request_ids
+
+    def publish(self, request_ids: List[str], result: Dict):
+        """
+        Hand the results of a check to the requests it served
+
+        Args:
+            request_ids: Ids returned by wait()
+            result: JSON-serializable summary of the check
+        """
+        if not request_ids:
+            return
+        with self._condition:
+            for request_id in request_ids:
+                self._store_result(request_id, result)
+            self._condition.notify_all()
+        try:
+            self.db.notify(CHECK_DONE_CHANNEL, json.dumps({'ids': request_ids, 'result': result}, default=str))
+        except Exception as e:
+            logger.warning(f"Could not notify other processes of the check result: {e}")
+
+    def wait_result(self, request_id: str, timeout: float) -> Optional[Dict]:
+        """
+        Wait for the result of a requested check
+
+        Returns:
+            Result passed to publish(), or None if none arrived in time
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: request_id in self._results or self._closed, timeout)
+            return self._results.pop(request_id, None)
+
+    def close(self):
+        """Wake all waiters and stop listening"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+_triggers = {}
+_triggers_lock = threading.Lock()
+
+
+def check_trigger(db) -> CheckTrigger:
+    """CheckTrigger shared by every caller in this process"""
+    with _triggers_lock:
+        trigger = _triggers.get(os.getpid())
+        if trigger is None:
+            trigger = CheckTrigger(db)
+            _triggers[os.getpid()] = trigger
+        return trigger
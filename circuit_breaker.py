@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker Module
+
+Stops calling the Anthropic API while it keeps failing for the same
+reason, and probes it again after a cooldown
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Optional, Dict, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Error classes that will not go away by retrying the next document:
+# the circuit opens on the first failure and stays open longer
+FATAL_CLASSES = ('auth', 'billing')
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while the circuit is open"""
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """
+    Error class of an API exception
+
+    Args:
+        error: Exception raised by the Anthropic client
+
+    Returns:
+        'auth', 'billing', 'rate_limit', 'overloaded', 'server' or
+        'connection', or None for errors specific to one request
+        (e.g. a malformed prompt) that must not trip the circuit
+    """
+    import anthropic
+
+    message = str(error).lower()
+    status = getattr(error, 'status_code', None)
+
+    if isinstance(error, (anthropic.AuthenticationError, anthropic.PermissionDeniedError)):
+        return 'auth'
+    if any(keyword in message for keyword in ['credit balance', 'billing', 'quota']):
+        return 'billing'
+    if isinstance(error, anthropic.RateLimitError):
+        return 'rate_limit'
+    if status == 529 or 'overloaded' in message:
+        return 'overloaded'
+    if isinstance(error, anthropic.InternalServerError) or (status is not None and status >= 500):
+        return 'server'
+    if isinstance(error, anthropic.APIConnectionError):  # Includes timeouts
+        return 'connection'
+    return None
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker keyed on the error class
+
+    Consecutive failures of one class open the circuit (immediately for
+    auth and billing errors). While open every call is rejected without
+    touching the network. After the cooldown a single probe call is let
+    through: success closes the circuit, failure reopens it with twice the
+    cooldown.
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, cooldown: Optional[int] = None,
+                 fatal_cooldown: Optional[int] = None, max_cooldown: Optional[int] = None,
+                 on_change: Optional[Callable[[Dict], None]] = None):
+        """
+        Initialize Circuit Breaker
+
+        Args:
+            failure_threshold: Consecutive failures of one class that open the circuit (CIRCUIT_FAILURE_THRESHOLD)
+            cooldown: Seconds before probing after transient errors (CIRCUIT_COOLDOWN)
+            fatal_cooldown: Seconds before probing after auth/billing errors (CIRCUIT_FATAL_COOLDOWN)
+            max_cooldown: Upper bound for the doubled cooldown (CIRCUIT_MAX_COOLDOWN)
+            on_change: Optional callback receiving status() on every state change
+        """
+        self.failure_threshold = failure_threshold or int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 3))
+        self.cooldown = cooldown or int(os.getenv('CIRCUIT_COOLDOWN', 120))
+        self.fatal_cooldown = fatal_cooldown or int(os.getenv('CIRCUIT_FATAL_COOLDOWN', 1800))
+        self.max_cooldown = max_cooldown or int(os.getenv('CIRCUIT_MAX_COOLDOWN', 3600))
+        self.on_change = on_change
+
+        self.state = CLOSED
+        self.error_class = None
+        self.last_error = None
+        self.failures = {}  # error class -> consecutive failures
+        self.opened_at = None
+        self.current_cooldown = 0
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> Optional[Dict]:
+        """Change the state (under _lock), returning the status for _notify() if it changed"""
+        if state == self.state:
+            return None
+        logger.warning(f"Anthropic API circuit {self.state} -> {state}"
+                       + (f" ({self.error_class}: {self.last_error})" if state == OPEN else ""))
+        self.state = state
+        return self._status() if self.on_change is not None else None
+
+    def _notify(self, status: Optional[Dict]):
+        """Pass a state change to on_change, called after _lock is released"""
+        if status is None:
+            return
+        try:
+            self.on_change(status)
+        except Exception as e:
+            logger.warning(f"Could not publish circuit state: {e}")
+
+    def _retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0
+        return max(self.opened_at + self.current_cooldown - time.time(), 0)
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not take the probe slot)"""
+        with self._lock:
+            if self.state == OPEN:
+                return self._retry_in() > 0
+            return self.state == HALF_OPEN and self.probe_in_flight
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed"""
+        with self._lock:
+            return self._retry_in()
+
+    def before_call(self):
+        """
+        Admit a call or reject it
+
+        Raises:
+            CircuitOpenError: if the circuit is open or a probe is already running
+        """
+        changed = None
+        try:
+            with self._lock:
+                if self.state == OPEN:
+                    if self._retry_in() > 0:
+                        raise CircuitOpenError(f"circuit open ({self.error_class}), "
+                                               f"next probe in {self._retry_in():.0f}s")
+                    changed = self._set_state(HALF_OPEN)
+
+                if self.state == HALF_OPEN:
+                    if self.probe_in_flight:
+                        raise CircuitOpenError("circuit half-open, probe in progress")
+                    self.probe_in_flight = True
+                    logger.info("Probing Anthropic API")
+        finally:
+            self._notify(changed)
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self.failures.clear()
+            self.probe_in_flight = False
+            self.current_cooldown = 0
+            changed = self._set_state(CLOSED)
+        self._notify(changed)
+
+    def record_failure(self, error: Exception) -> Optional[str]:
+        """
+        Count a failed call
+
+        Args:
+            error: Exception raised by the call
+
+        Returns:
+            Error class of the exception
+        """
+        error_class = classify_error(error)
+        changed = None
+
+        with self._lock:
+            was_probe = self.probe_in_flight
+            self.probe_in_flight = False
+
+            if error_class is None:
+                # Request-specific error: the API itself answered
+                if was_probe:
+                    self.failures.clear()
+                    changed = self._set_state(CLOSED)
+            else:
+                self.failures[error_class] = self.failures.get(error_class, 0) + 1
+                threshold = 1 if error_class in FATAL_CLASSES else self.failure_threshold
+
+                if was_probe or self.failures[error_class] >= threshold:
+                    base = self.fatal_cooldown if error_class in FATAL_CLASSES else self.cooldown
+                    self.current_cooldown = (min(self.current_cooldown * 2, self.max_cooldown)
+                                             if was_probe and self.current_cooldown else base)
+                    self.error_class = error_class
+                    self.last_error = str(error)[:200]
+                    self.opened_at = time.time()
+                    changed = self._set_state(OPEN)
+
+        self._notify(changed)
+        return error_class
+
+    def _status(self) -> Dict:
+        return {
+            'state': self.state,
+            'error_class': self.error_class,
+            'last_error': self.last_error,
+            'opened_at': self.opened_at,
+            'cooldown': self.current_cooldown,
+            'retry_in': round(self._retry_in()),
+            'failures': dict(self.failures)
+        }
+
+    def status(self) -> Dict:
+        """Current state, last error class and seconds until the next probe"""
+        with self._lock:
+            return self._status()
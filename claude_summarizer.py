@@ -6,17 +6,137 @@ Generates document summaries using Anthropic API
 """
 
 import os
+import re
+import json
+import time
 import logging
-from typing import Optional
+import threading
+from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+from text_compactor import estimate_tokens, split_into_chunks
+from circuit_breaker import CircuitBreaker, CircuitOpenError, classify_error
+from usage_tracker import MODE_NORMAL, MODE_ECONOMY, MODE_LOCAL
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt templates change: cached summaries of older
+# versions are then no longer matched
+PROMPT_VERSION = '3'
+DEFAULT_MODEL = 'claude-3-haiku-20240307'  # Fastest and cheapest model
+
+# Where a summary came from, by strategy; everything else is a model summary
+SUMMARY_SOURCES = {'template': 'template', 'extractive': 'extractive'}
+
+# Static instructions, sent as a cacheable system block
+FIA_INSTRUCTIONS = """Проанализируй технический документ FIA Formula 1 и создай краткое саммари на русском языке.
+
+ВАЖНО:
+- Саммари должно быть на РУССКОМ языке
+- Максимум 5-7 предложений
+- Выдели ключевые моменты и изменения
+- Укажи какие команды/пилоты затронуты (если применимо)
+- Используй технические термины корректно
+- Формат: краткий параграф без лишнего форматирования"""
+
+MAP_INSTRUCTIONS = """Ты получаешь одну часть длинного документа FIA Formula 1.
+Выпиши на русском языке ключевые моменты этой части: изменения правил, решения, штрафы,
+затронутые команды/пилоты, номера статей. Только факты из текста, без вступлений, кратким списком."""
+
+SHORT_INSTRUCTIONS = """Это типовой служебный документ FIA Formula 1.
+Опиши на русском языке в 1-2 предложениях, кого он касается и что в нём сказано. Без вступлений и форматирования."""
+
+DIGEST_INSTRUCTIONS = """Ты получаешь пачку документов стюардов FIA Formula 1 (решения, вызовы, нарушения), выпущенных после одной сессии.
+Составь на русском языке единую сводку:
+- Сгруппируй по машинам/пилотам: номер машины, пилот, в чём суть, решение (штраф, предупреждение, без последствий)
+- Вызовы к стюардам без решения перечисли отдельно
+- Только факты из документов, без вступлений; каждый пункт — одна строка, начинающаяся с «• »
+- Максимум 15 пунктов"""
+
+LARNAKA_INSTRUCTIONS = """Проанализируй культурное событие в Ларнаке (Кипр) и создай краткое описание на русском языке.
+
+ВАЖНО:
+- Описание должно быть на РУССКОМ языке (не на греческом или английском)
+- Максимум 3-5 предложений
+- Переведи название события на русский, если оно на другом языке
+- Опиши о чем событие простым и понятным языком
+- Укажи для кого это событие может быть интересно
+- Не используй избыточное форматирование
+- Пиши естественно и дружелюбно"""
+
+
+LANGUAGE_NAMES = {
+    'ru': 'русском', 'en': 'английском', 'de': 'немецком', 'fr': 'французском',
+    'es': 'испанском', 'it': 'итальянском', 'pt': 'португальском'
+}
+
+# Appended to the instructions when summaries in several languages come from one call
+LANGUAGES_INSTRUCTIONS = """ЯЗЫКИ: вместо одного саммари на русском напиши одно и то же саммари на каждом из языков: {languages}.
+Верни ТОЛЬКО JSON-объект без пояснений и markdown, с ключами {keys}, где значение — текст саммари на этом языке.
+Пример: {example}"""
+
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Ends of sentences, to cut a summary truncated at max_tokens back to its last full sentence
+SENTENCE_END_RE = re.compile(r'[.!?…](?=\s|$)|\n')
+
+
+def summary_languages() -> List[str]:
+    """Configured summary languages, primary first (SUMMARY_LANGUAGES)"""
+    languages = [code.strip().lower() for code in os.getenv('SUMMARY_LANGUAGES', 'ru').split(',') if code.strip()]
+    return languages or ['ru']
+
+
+def language_summary_rows(document_id: int, result: Dict) -> List[tuple]:
+    """(document_id, language, summary) rows of a summarizer result"""
+    return [(document_id, language, summary) for language, summary in result['summaries'].items()]
+
 
 class ClaudeSummarizer:
     """Generates summaries using Anthropic API"""
 
-    def __init__(self):
-        """Initialize Claude Summarizer"""
+    def __init__(self, compactor=None, cache=None, breaker=None, classifier=None, fallback=None,
+                 usage_tracker=None):
+        """
+        Initialize Claude Summarizer
+
+        Args:
+            compactor: Optional TextCompactor applied to document text before prompting
+            cache: Optional SummaryCache consulted before any API call
+            breaker: Optional CircuitBreaker guarding API calls
+            classifier: Optional DocumentClassifier providing templated summaries of formulaic documents
+            fallback: Optional ExtractiveSummarizer used when the API cannot be called
+            usage_tracker: Optional UsageTracker logging cost and enforcing the monthly budget
+        """
+        self.compactor = compactor
+        self.cache = cache
+        self.classifier = classifier
+        self.fallback = fallback
+        self.usage_tracker = usage_tracker
+        self.breaker = breaker or CircuitBreaker()
+        self.model = os.getenv('ANTHROPIC_MODEL', DEFAULT_MODEL)
+        self.max_tokens = 1024
+        self.short_max_tokens = int(os.getenv('SHORT_SUMMARY_MAX_TOKENS', 200))
+        self.digest_max_tokens = int(os.getenv('DIGEST_MAX_TOKENS', 1500))
+        self.economy_max_tokens = int(os.getenv('GOVERNOR_ECONOMY_MAX_TOKENS', 512))
+        self.single_pass_tokens = estimate_tokens('x' * 15000)  # What used to fit before truncation
+        self.chunk_tokens = int(os.getenv('SUMMARY_CHUNK_TOKENS', 3000))
+        self.map_max_tokens = int(os.getenv('SUMMARY_MAP_MAX_TOKENS', 400))
+        self.max_chunks = int(os.getenv('MAP_REDUCE_MAX_CHUNKS', 8))
+        self.max_document_tokens = int(os.getenv('MAP_REDUCE_MAX_TOKENS', 40000))
+        self.map_concurrency = int(os.getenv('SUMMARY_CONCURRENCY', 5))
+        self.languages = summary_languages()
+        self.primary_language = self.languages[0]
+        # The instructions are written for Russian; anything else goes through the JSON format
+        self.multilingual = self.languages != ['ru']
+        self.prompt_version = (f"{PROMPT_VERSION}:{','.join(self.languages)}" if self.multilingual
+                               else PROMPT_VERSION)
+        self.usage_totals = {
+            'calls': 0, 'input_tokens': 0, 'output_tokens': 0,
+            'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0, 'latency': 0.0
+        }
+        # Map calls, the summary worker and the async service record usage from several threads
+        self._usage_lock = threading.Lock()
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
         self.api_available = bool(self.api_key)
 
@@ -38,49 +158,35 @@ class ClaudeSummarizer:
                 logger.error(f"Error initializing Anthropic client: {e}")
                 self.api_available = False
 
-    def _create_summary_prompt(self, document_text: str, document_name: str) -> str:
+    @staticmethod
+    def _is_larnaka_event(document_text: str, document_name: str) -> bool:
+        """Check if this is a Larnaka event or FIA document"""
+        return "Larnaka Event" in document_name or "Событие:" in document_text
+
+    def _create_summary_prompt(self, document_text: str, document_name: str) -> Dict:
         """
         Create prompt for Claude to generate summary
 
+        The static instructions go into a system block marked for prompt
+        caching; only the document itself changes between calls.
+
         Args:
             document_text: Full text of the document
             document_name: Name of the document
 
         Returns:
-            Formatted prompt string
+            Dictionary with 'system' blocks and user 'messages'
         """
-        # Check if this is a Larnaka event or FIA document
-        is_larnaka_event = "Larnaka Event" in document_name or "Событие:" in document_text
-
-        if is_larnaka_event:
+        if self._is_larnaka_event(document_text, document_name):
             # Prompt for Larnaka cultural events
-            prompt = f"""Проанализируй это культурное событие в Ларнаке (Кипр) и создай краткое описание на русском языке.
-
-{document_text}
-
-ВАЖНО:
-- Описание должно быть на РУССКОМ языке (не на греческом или английском)
-- Максимум 3-5 предложений
-- Переведи название события на русский, если оно на другом языке
-- Опиши о чем событие простым и понятным языком
-- Укажи для кого это событие может быть интересно
-- Не используй избыточное форматирование
-- Пиши естественно и дружелюбно
+            instructions = LARNAKA_INSTRUCTIONS
+            content = f"""{document_text}
 
 Создай краткое описание этого события на русском языке:"""
         else:
             # Prompt for FIA technical documents
-            prompt = f"""Проанализируй этот технический документ FIA Formula 1 и создай краткое саммари на русском языке.
-
-Документ: {document_name}
-
-ВАЖНО:
-- Саммари должно быть на РУССКОМ языке
-- Максимум 5-7 предложений
-- Выдели ключевые моменты и изменения
-- Укажи какие команды/пилоты затронуты (если применимо)
-- Используй технические термины корректно
-- Формат: краткий параграф без лишнего форматирования
+            instructions = FIA_INSTRUCTIONS
+            content = f"""Документ: {document_name}
 
 Текст документа:
 ---
@@ -89,74 +195,530 @@ class ClaudeSummarizer:
 
 Создай краткое саммари этого документа на русском языке:"""
 
-        return prompt
+        return {
+            'system': self._system_blocks(instructions),
+            'messages': [
+                {"role": "user", "content": content}
+            ]
+        }
+
+    def _system_blocks(self, instructions: str) -> List[Dict]:
+        """System blocks for a final summary, asking for every configured language at once"""
+        blocks = [{"type": "text", "text": instructions}]
+        if self.multilingual:
+            blocks.append({"type": "text", "text": LANGUAGES_INSTRUCTIONS.format(
+                languages=', '.join(LANGUAGE_NAMES.get(code, code) for code in self.languages),
+                keys=', '.join(f'"{code}"' for code in self.languages),
+                example=json.dumps({code: '...' for code in self.languages})
+            )})
+        # Everything up to the last static block is cached
+        blocks[-1]["cache_control"] = {"type": "ephemeral"}
+        return blocks
+
+    def _output_tokens(self, max_tokens: int) -> int:
+        """max_tokens of a final summary: one summary's budget per language"""
+        return max_tokens * len(self.languages)
+
+    def parse_summaries(self, text: Optional[str]) -> Dict[str, str]:
+        """
+        Split a model response into summaries per language
+
+        Args:
+            text: Response text (a JSON object when several languages are configured)
 
-    def generate_summary(self, document_text: str, document_name: str = "FIA Document") -> Optional[str]:
+        Returns:
+            Dictionary mapping language code to summary. Broken or truncated
+            JSON is repaired where the values can be read; a plain text
+            response is taken as the primary language summary; otherwise empty
         """
-        Generate summary using Anthropic API
+        if not text:
+            return {}
+        if not self.multilingual:
+            return {self.primary_language: text}
+
+        match = JSON_OBJECT_RE.search(text)
+        try:
+            parsed = json.loads(match.group(0)) if match else {}
+        except ValueError:
+            parsed = {}
+        summaries = {
+            code: parsed[code].strip() for code in self.languages
+            if isinstance(parsed.get(code), str) and parsed[code].strip()
+        }
+        if self.primary_language in summaries:
+            return summaries
+
+        if '{' not in text:
+            logger.warning("Summary response is not JSON, using it as the primary language")
+            return {self.primary_language: text.strip()}
+
+        summaries = self._repair_summaries(text)
+        if self.primary_language in summaries:
+            logger.warning(f"Summary response is broken JSON, repaired languages: {', '.join(summaries)}")
+            return summaries
+        logger.warning("Summary response is broken JSON without a primary language summary")
+        return {}
+
+    def _repair_summaries(self, text: str) -> Dict[str, str]:
+        """Read the language values out of invalid JSON, e.g. a response cut off at max_tokens"""
+        summaries = {}
+        for code in self.languages:
+            match = re.search(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)(")?' % re.escape(code), text, re.DOTALL)
+            if not match:
+                continue
+            try:
+                # A value cut off inside an escape sequence loses it
+                value = json.loads('"' + match.group(1).rstrip('\\') + '"', strict=False).strip()
+            except ValueError:
+                continue
+            if not match.group(2):
+                # Unterminated: keep up to the last full sentence
+                ends = [m.end() for m in SENTENCE_END_RE.finditer(value)]
+                value = value[:ends[-1]].strip() if ends else ''
+            if value:
+                summaries[code] = value
+        return summaries
+
+    def _choose_strategy(self, document_text: str, allow_map_reduce: bool = True) -> Dict:
+        """
+        Decide how a (compacted) document is summarized
+
+        Documents that fit into one prompt are summarized directly. Longer
+        ones are chunked for map-reduce unless the estimated token cost of
+        doing so exceeds the per-document ceiling, in which case the text is
+        truncated as before.
+
+        Returns:
+            Dictionary with 'strategy' ('single', 'map_reduce' or 'truncated')
+            and 'chunks' for map-reduce
+        """
+        tokens = estimate_tokens(document_text)
+        if tokens <= self.single_pass_tokens:
+            return {'strategy': 'single'}
+
+        if not allow_map_reduce:
+            return {'strategy': 'truncated'}
+
+        chunks = split_into_chunks(document_text, self.chunk_tokens)
+        instruction_tokens = estimate_tokens(MAP_INSTRUCTIONS)
+        estimated_cost = (
+            tokens + len(chunks) * (instruction_tokens + self.map_max_tokens)  # map calls
+            + len(chunks) * self.map_max_tokens + self.max_tokens               # reduce call
+        )
+
+        if len(chunks) > self.max_chunks or estimated_cost > self.max_document_tokens:
+            logger.info(
+                f"Map-reduce over budget ({len(chunks)} chunks, ~{estimated_cost} tokens), "
+                f"falling back to truncation"
+            )
+            return {'strategy': 'truncated'}
+
+        logger.info(f"Long document (~{tokens} tokens): map-reduce over {len(chunks)} chunks")
+        return {'strategy': 'map_reduce', 'chunks': chunks}
+
+    def single_call_strategy(self, document_text: Optional[str]) -> str:
+        """Strategy label of a one-call summary ('single' or 'truncated')"""
+        if self.compactor is not None:
+            document_text = self.compactor.normalize(document_text)
+        return 'single' if estimate_tokens(document_text) <= self.single_pass_tokens else 'truncated'
+
+    def _params(self, prompt: Dict, max_tokens: int) -> Dict:
+        """Build messages.create kwargs from a prompt"""
+        return {
+            'model': self.model,
+            'max_tokens': max_tokens,
+            'system': prompt['system'],
+            'messages': prompt['messages']
+        }
+
+    def _create_map_prompt(self, chunk: str, document_name: str, part: int, total: int) -> Dict:
+        """Prompt extracting the key points of one chunk of a long document"""
+        return {
+            'system': [
+                {"type": "text", "text": MAP_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}
+            ],
+            'messages': [
+                {"role": "user", "content": f"""Документ: {document_name}
+Часть {part} из {total}
+
+---
+{chunk}
+---
+
+Выпиши ключевые моменты этой части:"""}
+            ]
+        }
+
+    def build_reduce_params(self, document_name: str, partial_summaries: List[str]) -> Dict:
+        """
+        Build the final call combining chunk summaries into one summary
+
+        Args:
+            document_name: Name of the document
+            partial_summaries: Key points of each chunk in document order
+
+        Returns:
+            messages.create kwargs
+        """
+        parts = "\n\n".join(
+            f"[Часть {i}]\n{summary}" for i, summary in enumerate(partial_summaries, 1) if summary
+        )
+        return self._params(
+            self._create_summary_prompt(parts, document_name), self._output_tokens(self.max_tokens)
+        )
+
+    def fallback_result(self, document_text: str, document_name: Optional[str] = None) -> Optional[Dict]:
+        """
+        Local extractive summary for when the API cannot be called
+
+        Args:
+            document_text: Full text of the document
+            document_name: Name of the document, for the usage log
+
+        Returns:
+            Result dict with strategy 'extractive', or None without a fallback
+        """
+        if self.fallback is None:
+            return None
+        try:
+            if self.compactor is not None:
+                document_text = self.compactor.compact(document_text)['text']
+            summary = self.fallback.summarize(document_text)
+            # Sentences quoted from the document serve every language
+            return self._build_result(summary, 'extractive', [], document_name,
+                                      summaries={code: summary for code in self.languages})
+        except Exception as e:
+            logger.error(f"Error generating extractive summary: {e}")
+            return None
+
+    def prepare_request(self, document_text: str, document_name: str = "FIA Document",
+                        allow_map_reduce: bool = True, allow_fallback: bool = True) -> Optional[Dict]:
+        """
+        Resolve everything that happens before the API call
+
+        Looks the document up in the summary cache, compacts the text,
+        chooses the summarization strategy and builds the request
+        parameters. Shared by the blocking, async and batch paths.
 
         Args:
             document_text: Full text of the document
             document_name: Name of the document
+            allow_map_reduce: False to truncate long documents instead
+                (batch submissions are single-call only)
+            allow_fallback: False to get None instead of an extractive
+                summary when the API cannot be called
 
         Returns:
-            Generated summary text or None if failed
+            None if no summary can be produced, a finished result on a cache
+            hit, template or extractive fallback, otherwise a dict with 'strategy', 'cache_text' and either
+            'params' (one call) or 'map_params' (map-reduce)
         """
+        if not document_text or not document_text.strip():
+            logger.warning("Empty document text, cannot generate summary")
+            return None
+
+        # Formulaic documents (classifications, entry lists, ...) need no model
+        route = self.classifier.route(document_name, document_text) if self.classifier else {}
+        if route.get('summary'):
+            # Templates are Russian; for other languages the title says as much. A primary
+            # language other than Russian has no template summary and needs the model.
+            summaries = {'ru': route['summary']} if 'ru' in self.languages else {}
+            if self.primary_language in summaries:
+                return self._build_result(None, 'template', [], document_name, route['type'],
+                                          summaries=summaries)
+
+        # Same content summarized before with the same prompt and model
+        if self.cache is not None:
+            cached = self.cache.get(document_text, self.prompt_version, self.model)
+            if cached:
+                return self._build_result(None, 'cached', [], document_name, route.get('type'),
+                                          summaries=self.parse_summaries(cached))
+
         if not self.api_available:
             logger.info("Anthropic API not available, skipping summary generation")
+            return self.fallback_result(document_text, document_name) if allow_fallback else None
+
+        if self.breaker.is_open():
+            logger.info(f"Anthropic API circuit open, skipping summary generation for: {document_name}")
+            return self.fallback_result(document_text, document_name) if allow_fallback else None
+
+        # Budget governor: cheaper paths as the monthly budget is consumed
+        mode = self.governor_mode()
+        if mode == MODE_LOCAL:
+            logger.info(f"Monthly API budget used up, skipping summary generation for: {document_name}")
+            return self.fallback_result(document_text, document_name) if allow_fallback else None
+        max_tokens = self.max_tokens
+        if mode == MODE_ECONOMY:
+            max_tokens = self.economy_max_tokens
+            allow_map_reduce = False
+
+        logger.info(f"Generating summary for: {document_name}")
+        cache_text = document_text
+
+        # Strip whitespace noise and learned boilerplate before prompting
+        if self.compactor is not None:
+            document_text = self.compactor.compact(document_text)['text']
+
+        request = {'cache_text': cache_text, 'document_name': document_name, 'doc_type': route.get('type')}
+
+        # Formulaic documents whose fields could not be read get a small budget
+        if route.get('short'):
+            request['strategy'] = 'short'
+            request['params'] = self._params({
+                'system': self._system_blocks(SHORT_INSTRUCTIONS),
+                'messages': [{"role": "user", "content": f"Документ: {document_name}\n\n{document_text[:4000]}"}]
+            }, self._output_tokens(self.short_max_tokens))
+            return request
+
+        # Larnaka events are short and always go in one call
+        if self._is_larnaka_event(document_text, document_name):
+            plan = {'strategy': 'single'}
+        else:
+            plan = self._choose_strategy(document_text, allow_map_reduce)
+        request['strategy'] = plan['strategy']
+
+        if plan['strategy'] == 'map_reduce':
+            chunks = plan['chunks']
+            request['map_params'] = [
+                self._params(self._create_map_prompt(chunk, document_name, i, len(chunks)), self.map_max_tokens)
+                for i, chunk in enumerate(chunks, 1)
+            ]
+        else:
+            request['params'] = self._params(
+                self._create_summary_prompt(document_text, document_name), self._output_tokens(max_tokens)
+            )
+
+        return request
+
+    def record_usage(self, message, latency: Optional[float] = None) -> Dict:
+        """
+        Record token usage of a response, including prompt cache reads/writes
+
+        Args:
+            message: Anthropic Message object
+            latency: Optional call duration in seconds
+
+        Returns:
+            Dictionary with the token counts of this call
+        """
+        usage = getattr(message, 'usage', None)
+        call_usage = {
+            'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+            'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+            'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+            'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0
+        }
+
+        with self._usage_lock:
+            self.usage_totals['calls'] += 1
+            for key, value in call_usage.items():
+                self.usage_totals[key] += value
+            if latency is not None:
+                self.usage_totals['latency'] += latency
+
+        latency_str = f", {latency:.2f}s" if latency is not None else ""
+        logger.info(
+            f"Usage: {call_usage['input_tokens']} in / {call_usage['output_tokens']} out, "
+            f"prompt cache {call_usage['cache_read_input_tokens']} read / "
+            f"{call_usage['cache_creation_input_tokens']} written{latency_str}"
+        )
+        return call_usage
+
+    @staticmethod
+    def extract_text(message) -> Optional[str]:
+        """
+        Extract the generated text from an API response
+
+        Args:
+            message: Anthropic Message object
+
+        Returns:
+            Text or None
+        """
+        if message.content and len(message.content) > 0:
+            text = message.content[0].text.strip()
+            if text:
+                return text
+            logger.warning("API returned empty response")
             return None
 
-        if not document_text or not document_text.strip():
-            logger.warning("Empty document text, cannot generate summary")
+        logger.warning("API returned no content")
+        return None
+
+    def _build_result(self, summary: Optional[str], strategy: str, usages: List[Dict],
+                      document_name: Optional[str] = None, doc_type: Optional[str] = None,
+                      batch: bool = False, summaries: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Result of one summarization with the strategy and summed token counts, logged with its cost"""
+        if summaries is None:
+            summaries = {self.primary_language: summary} if summary else {}
+        summary = summary or summaries.get(self.primary_language)
+        source = SUMMARY_SOURCES.get(strategy, 'llm')
+        cost = 0.0
+        if self.usage_tracker is not None and (summary or usages):
+            cost = self.usage_tracker.record(self.model, source, strategy, usages,
+                                             document_name, doc_type, batch)
+        if not summary:
             return None
+        return {
+            'summary': summary,
+            'summaries': summaries,
+            'strategy': strategy,
+            'source': source,
+            'input_tokens': sum(u['input_tokens'] + u['cache_creation_input_tokens']
+                                + u['cache_read_input_tokens'] for u in usages),
+            'output_tokens': sum(u['output_tokens'] for u in usages),
+            'cost_usd': cost
+        }
+
+    def finish(self, request: Dict, summary: Optional[str], usages: List[Dict]) -> Optional[Dict]:
+        """
+        Store a generated summary in the cache and build the result
 
+        Args:
+            request: Request returned by prepare_request
+            summary: Final response text (None if generation failed)
+            usages: Usage dicts of every call made for this document
+
+        Returns:
+            Dictionary with 'summary' (primary language), 'summaries' (per
+            language), 'strategy', 'input_tokens', 'output_tokens' and
+            'cost_usd', or None
+        """
+        summaries = self.parse_summaries(summary)
+        if summaries:
+            logger.info(f"Summary generated successfully ({len(summary)} chars, {request['strategy']}, "
+                        f"languages: {', '.join(summaries)})")
+            if self.cache is not None and request.get('cache_text') is not None:
+                self.cache.put(request['cache_text'], self.prompt_version, self.model, summary)
+        result = self._build_result(None, request['strategy'], usages, request.get('document_name'),
+                                    request.get('doc_type'), request.get('batch', False), summaries)
+        if result is None and summary and request.get('cache_text'):
+            # Unusable response (the calls are recorded above): never post raw JSON
+            return self.fallback_result(request['cache_text'], request.get('document_name'))
+        return result
+
+    def handle_error(self, e: Exception):
+        """Log an API error by category"""
+        if isinstance(e, CircuitOpenError):
+            logger.info(f"Summary skipped: {e}")
+            return
+
+        error_class = classify_error(e)
+        if error_class == 'billing':
+            logger.warning(f"API quota/billing issue: {e}")
+        elif error_class == 'auth':
+            logger.error(f"API authentication error: {e}")
+        elif error_class:
+            logger.warning(f"API unavailable ({error_class}): {e}")
+        else:
+            logger.error(f"Error generating summary: {e}")
+
+    def _call(self, params: Dict):
+        """Blocking API call through the circuit breaker, returning (message, usage)"""
+        self.breaker.before_call()
+        started = time.monotonic()
         try:
-            logger.info(f"Generating summary for: {document_name}")
+            message = self.client.messages.create(**params)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return message, self.record_usage(message, time.monotonic() - started)
+
+    def summarize(self, document_text: str, document_name: str = "FIA Document") -> Optional[Dict]:
+        """
+        Generate summary using Anthropic API, with strategy and token counts
+
+        Args:
+            document_text: Full text of the document
+            document_name: Name of the document
 
-            # Create prompt
-            prompt = self._create_summary_prompt(document_text, document_name)
+        Returns:
+            Dictionary with 'summary', 'strategy', 'source', 'input_tokens'
+            and 'output_tokens', or None if failed
+        """
+        try:
+            request = self.prepare_request(document_text, document_name)
+            if request is None or 'summary' in request:
+                return request
+
+            usages = []
+            params = request.get('params')
+
+            if request['strategy'] == 'map_reduce':
+                # Chunk summaries run concurrently, then one reduce call
+                with ThreadPoolExecutor(max_workers=self.map_concurrency) as pool:
+                    mapped = list(pool.map(self._call, request['map_params']))
+                usages.extend(usage for _, usage in mapped)
+                params = self.build_reduce_params(
+                    document_name, [self.extract_text(message) for message, _ in mapped]
+                )
 
             # Call Anthropic API
-            message = self.client.messages.create(
-                model="claude-3-haiku-20240307",  # Fastest and cheapest model
-                max_tokens=1024,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            message, usage = self._call(params)
+            usages.append(usage)
 
             # Extract summary from response
-            if message.content and len(message.content) > 0:
-                summary = message.content[0].text.strip()
-
-                if summary:
-                    logger.info(f"Summary generated successfully ({len(summary)} chars)")
-                    return summary
-                else:
-                    logger.warning("API returned empty response")
-                    return None
-            else:
-                logger.warning("API returned no content")
-                return None
+            return self.finish(request, self.extract_text(message), usages)
 
         except Exception as e:
-            error_msg = str(e).lower()
+            self.handle_error(e)
+            return self.fallback_result(document_text, document_name)
+
+    def summarize_digest(self, title: str, entries: List[tuple]) -> Optional[Dict]:
+        """
+        Summarize a group of stewards' documents in one call
+
+        Args:
+            title: Event the documents belong to
+            entries: (document name, summary or text) per document
+
+        Returns:
+            Result dictionary like summarize() with strategy 'digest', or
+            None if the API cannot be called
+        """
+        if not entries or not self.is_available() or self.governor_mode() == MODE_LOCAL:
+            return None
 
-            # Check for specific error types
-            if any(keyword in error_msg for keyword in ['quota', 'limit', 'billing', 'credit']):
-                logger.warning(f"API quota/billing issue: {e}")
-            elif 'authentication' in error_msg or 'api key' in error_msg:
-                logger.error(f"API authentication error: {e}")
-            else:
-                logger.error(f"Error generating summary: {e}")
+        content = "\n\n".join(
+            f"[{i}] {name}\n{text}" for i, (name, text) in enumerate(entries, 1)
+        )
+        params = self._params({
+            'system': self._system_blocks(DIGEST_INSTRUCTIONS),
+            'messages': [{"role": "user", "content": f"Этап: {title}\n\n{content}\n\nСоставь сводку:"}]
+        }, self._output_tokens(self.digest_max_tokens))
+        request = {'strategy': 'digest', 'document_name': title, 'doc_type': 'digest'}
 
+        try:
+            message, usage = self._call(params)
+            return self.finish(request, self.extract_text(message), [usage])
+        except Exception as e:
+            self.handle_error(e)
             return None
 
+    def generate_summary(self, document_text: str, document_name: str = "FIA Document") -> Optional[str]:
+        """
+        Generate summary using Anthropic API
+
+        Args:
+            document_text: Full text of the document
+            document_name: Name of the document
+
+        Returns:
+            Generated summary text or None if failed
+        """
+        result = self.summarize(document_text, document_name)
+        return result['summary'] if result else None
+
+    def governor_mode(self) -> str:
+        """Current budget governor mode ('normal' without a usage tracker)"""
+        return self.usage_tracker.mode() if self.usage_tracker is not None else MODE_NORMAL
+
     def is_available(self) -> bool:
         """
         Check if summarizer is available
 
         Returns:
-            True if Anthropic API is available, False otherwise
+            True if Anthropic API is available and its circuit is not open, False otherwise
         """
-        return self.api_available
+        return self.api_available and not self.breaker.is_open()
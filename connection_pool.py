@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Module
+
+Thread-safe PostgreSQL connection pool shared by every Database of a
+process (the scraper thread and the bot handlers of run_with_bot.py),
+with health checks on checkout and usage metrics
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Blocking connection pool
+
+    getconn() waits up to the timeout for a free connection instead of
+    failing at once when all are checked out. A connection that sat idle
+    longer than the health check interval is tested with SELECT 1 before
+    it is handed out and replaced if the server dropped it.
+    """
+
+    def __init__(self, minconn: Optional[int] = None, maxconn: Optional[int] = None,
+                 timeout: Optional[float] = None, health_check_interval: Optional[float] = None,
+                 **connect_kwargs):
+        """
+        Initialize Connection Pool
+
+        Args:
+            minconn: Connections opened up front and kept open (DB_POOL_MIN)
+            maxconn: Most connections open at once (DB_POOL_MAX)
+            timeout: Seconds getconn() waits for a free connection (DB_POOL_TIMEOUT)
+            health_check_interval: Idle seconds after which a connection is tested
+                on checkout, 0 to test every checkout (DB_POOL_HEALTH_CHECK)
+            **connect_kwargs: Arguments for psycopg2.connect
+        """
+        self.minconn = minconn if minconn is not None else int(os.getenv('DB_POOL_MIN', 1))
+        self.maxconn = maxconn or int(os.getenv('DB_POOL_MAX', 10))
+        self.timeout = timeout if timeout is not None else float(os.getenv('DB_POOL_TIMEOUT', 30))
+        self.health_check_interval = (health_check_interval if health_check_interval is not None
+                                      else float(os.getenv('DB_POOL_HEALTH_CHECK', 30)))
+        self.connect_kwargs = connect_kwargs
+
+        self._idle = []      # (connection, returned at), most recently returned last
+        self._in_use = set()
+        self._pending = 0    # Connections being checked or opened outside the lock
+        self._condition = threading.Condition()
+        self.closed = False
+        self.users = 0       # Database objects sharing the pool (see shared_pool)
+
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.errors = 0
+        self.replaced = 0
+
+        for _ in range(self.minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        return psycopg2.connect(**self.connect_kwargs)
+
+    def _healthy(self, connection, idle_since: float) -> bool:
+        if connection.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Check out a connection
+
+        Args:
+            timeout: Seconds to wait for a free connection (default: the pool timeout)
+
+        Returns:
+            psycopg2 connection
+
+        Raises:
+            PoolError: if the pool is closed or no connection became free in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._condition:
+            while True:
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    connection, idle_since = self._idle.pop()
+                    break
+                if len(self._in_use) + self._pending < self.maxconn:
+                    connection, idle_since = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolError(f"connection pool exhausted: no connection free "
+                                    f"within {timeout:g}s ({self.maxconn} in use)")
+                self._condition.wait(remaining)
+            self._pending += 1
+
+        # Health check and connect outside the lock: other threads keep going
+        try:
+            if connection is not None and not self._healthy(connection, idle_since):
+                logger.warning("Replacing broken database connection from the pool")
+                self._close(connection)
+                connection = None
+                with self._condition:
+                    self.replaced += 1
+            if connection is None:
+                connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._pending -= 1
+                self.errors += 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._pending -= 1
+            if self.closed:
+                self._close(connection)
+                self._condition.notify()
+                raise PoolError("connection pool is closed")
+            self._in_use.add(connection)
+            waited = time.monotonic() - started
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+            return connection
+
+    def putconn(self, connection, close: bool = False):
+        """
+        Return a checked-out connection
+
+        An open transaction is rolled back; broken connections (or close=True)
+        are closed instead of being kept.
+
+        Args:
+            connection: Connection from getconn()
+            close: Close the connection instead of keeping it idle
+        """
+        if not close and not connection.closed:
+            try:
+                status = connection.info.transaction_status
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    close = True
+                elif status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._condition:
+            self._in_use.discard(connection)
+            if close or connection.closed or self.closed:
+                self._close(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of a with block
+
+        An exception leaving the block rolls the transaction back (and
+        closes the connection if it is broken) before it propagates.
+        Committing stays the caller's job.
+        """
+        connection = self.getconn()
+        try:
+            yield connection
+        except BaseException as e:
+            # Also GeneratorExit/KeyboardInterrupt: the connection must go back either way
+            if isinstance(e, Exception):
+                with self._condition:
+                    self.errors += 1
+            broken = connection.closed or isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not broken:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    broken = True
+            self.putconn(connection, close=broken)
+            raise
+        else:
+            self.putconn(connection)
+
+    def closeall(self):
+        """Close every connection; checked-out ones are closed when returned"""
+        with self._condition:
+            self.closed = True
+            for connection, _ in self._idle:
+                self._close(connection)
+            self._idle = []
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Pool size, usage and error counters"""
+        with self._condition:
+            return {
+                'size': len(self._idle) + len(self._in_use),
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'max': self.maxconn,
+                'checkouts': self.checkouts,
+                'avg_wait_ms': self.wait_time / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait * 1000,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'replaced': self.replaced,
+            }
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def shared_pool(**connect_kwargs) -> ConnectionPool:
+    """
+    Pool for the given connection settings, shared within the process
+
+    Every call registers one more user; release_pool() closes the pool
+    once the last user is gone.
+
+    Args:
+        **connect_kwargs: Arguments for psycopg2.connect
+
+    Returns:
+        ConnectionPool
+    """
+    key = (os.getpid(), tuple(sorted(connect_kwargs.items())))
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool.closed:
+            pool = ConnectionPool(**connect_kwargs)
+            _shared_pools[key] = pool
+            logger.info(f"Database connection pool created ({pool.minconn}-{pool.maxconn} connections)")
+        pool.users += 1
+        return pool
+
+
+def release_pool(pool: ConnectionPool):
+    """Drop one user of a shared pool, closing it when it was the last"""
+    with _shared_lock:
+        pool.users -= 1
+        if pool.users > 0:
+            return
+        for key, shared in list(_shared_pools.items()):
+            if shared is pool:
+                del _shared_pools[key]
+    pool.closeall()
+    logger.info("All database connections closed")
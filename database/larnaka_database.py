@@ -3,7 +3,7 @@ Database operations for Larnaka events
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import logging
 from datetime import datetime
 
@@ -76,6 +76,20 @@ class LarnakaDatabase:
             logger.error(f"Error checking event existence by hash: {e}")
             return False
 
+    @staticmethod
+    def _event_row(event_data):
+        """Column values of an event, in larnaka_events insert order"""
+        return (
+            event_data.get('title', ''),
+            event_data.get('url', ''),
+            event_data.get('hash', ''),
+            event_data.get('date'),
+            event_data.get('time', ''),
+            event_data.get('location', ''),
+            event_data.get('description', ''),
+            event_data.get('summary', '')
+        )
+
     def insert_event(self, event_data):
         """
         Insert new event into database
@@ -97,16 +111,7 @@ class LarnakaDatabase:
                 RETURNING id
             """
 
-            cursor.execute(query, (
-                event_data.get('title', ''),
-                event_data.get('url', ''),
-                event_data.get('hash', ''),
-                event_data.get('date'),
-                event_data.get('time', ''),
-                event_data.get('location', ''),
-                event_data.get('description', ''),
-                event_data.get('summary', '')
-            ))
+            cursor.execute(query, self._event_row(event_data))
 
             event_id = cursor.fetchone()[0]
             self.conn.commit()
@@ -120,6 +125,54 @@ class LarnakaDatabase:
             self.conn.rollback()
             return None
 
+    def insert_events(self, events, page_size=500):
+        """
+        Insert many events in one transaction
+
+        Args:
+            events: list of event dicts as for insert_event
+            page_size: Rows per INSERT statement
+
+        Returns:
+            list: IDs in the order of events; None for events whose URL or hash
+            already exists (or is repeated within events). Empty list on failure
+        """
+        if not events:
+            return []
+
+        seen = set()
+        rows = []
+        for event in events:
+            if event.get('url', '') not in seen:
+                seen.add(event.get('url', ''))
+                rows.append(self._event_row(event))
+
+        try:
+            cursor = self.conn.cursor()
+
+            query = """
+                INSERT INTO larnaka_events
+                (event_title, event_url, event_hash, event_date, event_time,
+                 event_location, event_description, summary)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+                RETURNING event_url, id
+            """
+
+            inserted = execute_values(cursor, query, rows, page_size=page_size, fetch=True)
+            self.conn.commit()
+            cursor.close()
+
+            ids_by_url = dict(inserted)
+            logger.info(f"Inserted {len(ids_by_url)} of {len(events)} events")
+            # Repeated URLs map to the first occurrence only
+            return [ids_by_url.pop(event.get('url', ''), None) for event in events]
+
+        except Exception as e:
+            logger.error(f"Error inserting events: {e}")
+            self.conn.rollback()
+            return []
+
     def update_event_summary(self, event_id, summary):
         """Update event summary"""
         try:
@@ -143,6 +196,49 @@ class LarnakaDatabase:
             self.conn.rollback()
             return False
 
+    def get_cached_summary(self, text_hash, prompt_version, model):
+        """Get cached summary and count the hit"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                UPDATE summary_cache
+                SET hit_count = hit_count + 1, last_hit_at = CURRENT_TIMESTAMP
+                WHERE text_hash = %s AND prompt_version = %s AND model = %s
+                RETURNING summary
+                """,
+                (text_hash, prompt_version, model)
+            )
+            result = cursor.fetchone()
+            self.conn.commit()
+            cursor.close()
+            return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Error reading summary cache: {e}")
+            self.conn.rollback()
+            return None
+
+    def save_cached_summary(self, text_hash, prompt_version, model, summary):
+        """Store summary in cache"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO summary_cache (text_hash, prompt_version, model, summary)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (text_hash, prompt_version, model)
+                DO UPDATE SET summary = EXCLUDED.summary
+                """,
+                (text_hash, prompt_version, model, summary)
+            )
+            self.conn.commit()
+            cursor.close()
+            return True
+        except Exception as e:
+            logger.error(f"Error writing summary cache: {e}")
+            self.conn.rollback()
+            return False
+
     def get_event_by_id(self, event_id):
         """Get event by ID"""
         try:
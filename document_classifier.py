@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Document Classifier Module
+
+Recognizes formulaic FIA document types (classifications, entry lists,
+timetables, ...) whose summary follows from the title, so they can be
+summarized from a template instead of a model call
+"""
+
+import os
+import re
+import logging
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Only the header of the first page is inspected: its first non-empty lines
+HEADER_LINES = 6
+HEADER_CHARS = 400
+
+# Titles that say nothing about the document: numbers, dates, "Doc 12", "2025_045_v2"
+UNINFORMATIVE_TITLE_RE = re.compile(r'^[\d\W_]*((doc(ument)?|no|nr|v(ersion)?)(?![^\d\W_])[\d\W_]*)*$',
+                                     re.IGNORECASE)
+
+# Titles (or first page headers) that always need the model, whatever else they contain
+NEEDS_MODEL_RE = re.compile(
+    r'\b(decisions?|offence|penalty|regulations?|directive|protest|appeal|right of review|'
+    r'reprimand|disqualifi\w*)\b',
+    re.IGNORECASE
+)
+
+CLASSIFICATION_RE = re.compile(
+    r'\b(provisional|final|official)\s+(.*?)\s*classification\b', re.IGNORECASE
+)
+STARTING_GRID_RE = re.compile(r'\b(provisional|final|official)?\s*starting\s+grid\b', re.IGNORECASE)
+ENTRY_LIST_RE = re.compile(r'\bentry\s+list\b', re.IGNORECASE)
+TIMETABLE_RE = re.compile(r'\b(timetable|schedule\s+of\s+events)\b', re.IGNORECASE)
+CAR_PRESENTATION_RE = re.compile(r'\bcar\s+presentation(\s+submissions?)?\b', re.IGNORECASE)
+SUMMONS_RE = re.compile(r'\bsummons\b', re.IGNORECASE)
+
+TYPE_PATTERNS = [
+    ('summons', SUMMONS_RE),
+    ('classification', CLASSIFICATION_RE),
+    ('starting_grid', STARTING_GRID_RE),
+    ('entry_list', ENTRY_LIST_RE),
+    ('timetable', TIMETABLE_RE),
+    ('car_presentation', CAR_PRESENTATION_RE),
+]
+
+# Fields of a stewards' summons
+SUMMONS_DRIVER_RE = re.compile(r'No\s*/\s*Driver\s+(\d{1,2}\s*[-–]\s*[^\n]+)', re.IGNORECASE)
+SUMMONS_COMPETITOR_RE = re.compile(r'Competitor\s+([^\n]+)', re.IGNORECASE)
+SUMMONS_FACT_RE = re.compile(r'(?:Fact|Alleged breach)\s*:?\s+([^\n]+)', re.IGNORECASE)
+SUMMONS_TIME_RE = re.compile(r'Time\s+(\d{1,2}:\d{2})', re.IGNORECASE)
+
+SESSIONS = [
+    (re.compile(r'sprint\s+(qualifying|shootout)', re.IGNORECASE), 'спринт-квалификации'),
+    (re.compile(r'sprint', re.IGNORECASE), 'спринта'),
+    (re.compile(r'qualifying', re.IGNORECASE), 'квалификации'),
+    (re.compile(r'(practice|fp)\s*1|first practice', re.IGNORECASE), 'первой тренировки'),
+    (re.compile(r'(practice|fp)\s*2|second practice', re.IGNORECASE), 'второй тренировки'),
+    (re.compile(r'(practice|fp)\s*3|third practice', re.IGNORECASE), 'третьей тренировки'),
+    (re.compile(r'race', re.IGNORECASE), 'гонки'),
+]
+
+CLASSIFICATION_STAGES = {
+    'provisional': 'Предварительная',
+    'final': 'Окончательная',
+    'official': 'Официальная',
+}
+
+
+def _header(text: str) -> str:
+    """First lines of the extracted text, where the document title is printed"""
+    lines = [line.strip() for line in (text or '')[:HEADER_CHARS * 4].splitlines() if line.strip()]
+    return '\n'.join(lines[:HEADER_LINES])[:HEADER_CHARS]
+
+
+def _session(text: str) -> Optional[str]:
+    """Russian genitive name of the session mentioned in text"""
+    for pattern, name in SESSIONS:
+        if pattern.search(text):
+            return name
+    return None
+
+
+class DocumentClassifier:
+    """Classifies documents by title and first page header and writes templated summaries"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Initialize Document Classifier
+
+        Args:
+            enabled: Use templates for formulaic documents (RULE_SUMMARIES_ENABLED)
+        """
+        self.enabled = (enabled if enabled is not None
+                        else os.getenv('RULE_SUMMARIES_ENABLED', 'true').lower() == 'true')
+        self.counts = {'documents': 0, 'template': 0, 'short': 0}
+
+    @staticmethod
+    def _title(document_name: str) -> str:
+        """Document name with file name separators turned into spaces"""
+        return re.sub(r'[_\s]+', ' ', re.sub(r'\.pdf$', '', document_name or '', flags=re.IGNORECASE))
+
+    def classify(self, document_name: str, document_text: str = '') -> Optional[str]:
+        """
+        Detect a formulaic document type
+
+        Args:
+            document_name: Document title or file name
+            document_text: Extracted text (only the first page header is used)
+
+        Returns:
+            'classification', 'starting_grid', 'entry_list', 'timetable',
+            'car_presentation', 'summons' or None for documents that need the model
+        """
+        title = self._title(document_name)
+        if SUMMONS_RE.search(title):
+            return 'summons'
+        if NEEDS_MODEL_RE.search(title):
+            return None
+
+        doc_type = self._match_type(title)
+        if doc_type is not None:
+            return doc_type
+
+        # Titles that are just file names or numbers: fall back to the first page header.
+        # A descriptive title that matched nothing is an ordinary document, whatever its body mentions.
+        if not UNINFORMATIVE_TITLE_RE.match(title.strip()):
+            return None
+        header = _header(document_text)
+        if NEEDS_MODEL_RE.search(header):
+            return None
+        return self._match_type(header)
+
+    @staticmethod
+    def _match_type(text: str) -> Optional[str]:
+        """First formulaic type whose pattern matches text"""
+        for doc_type, pattern in TYPE_PATTERNS:
+            if pattern.search(text):
+                return doc_type
+        return None
+
+    def _summons_summary(self, text: str) -> Optional[str]:
+        """Who is summoned, why and when, or None if the fields cannot be read"""
+        driver = SUMMONS_DRIVER_RE.search(text)
+        fact = SUMMONS_FACT_RE.search(text)
+        if not driver or not fact:
+            return None
+
+        summary = f"Стюарды вызывают пилота машины №{driver.group(1).strip()}"
+        competitor = SUMMONS_COMPETITOR_RE.search(text)
+        if competitor:
+            summary += f" ({competitor.group(1).strip()})"
+        summary += f". Причина: {fact.group(1).strip()}."
+        times = SUMMONS_TIME_RE.findall(text[driver.end():])
+        if times:
+            summary += f" Явка к стюардам в {times[0]}."
+        return summary
+
+    def template_summary(self, doc_type: str, document_name: str, document_text: str = '') -> Optional[str]:
+        """
+        Deterministic summary of a formulaic document
+
+        Args:
+            doc_type: Type returned by classify()
+            document_name: Document title
+            document_text: Extracted text
+
+        Returns:
+            Summary text, or None if the document still needs the model
+        """
+        title = self._title(document_name)
+        header = _header(document_text)
+        session = _session(title) or _session(header)
+        session_suffix = f" {session}" if session else ""
+
+        if doc_type == 'classification':
+            match = CLASSIFICATION_RE.search(title) or CLASSIFICATION_RE.search(header)
+            stage = CLASSIFICATION_STAGES[match.group(1).lower()]
+            return f"{stage} классификация{session_suffix}. Документ содержит итоговые позиции и время пилотов."
+        if doc_type == 'starting_grid':
+            match = STARTING_GRID_RE.search(title) or STARTING_GRID_RE.search(header)
+            stage = CLASSIFICATION_STAGES.get((match.group(1) or '').lower())
+            prefix = f"{stage} стартовая решётка" if stage else "Стартовая решётка"
+            return f"{prefix}{session_suffix}. Документ содержит порядок пилотов на старте."
+        if doc_type == 'entry_list':
+            return "Список участников этапа: пилоты, номера машин и команды."
+        if doc_type == 'timetable':
+            return "Расписание этапа: время сессий и официальных мероприятий."
+        if doc_type == 'car_presentation':
+            return ("Представление автомобилей (Car Presentation): команды перечисляют новые "
+                    "и изменённые элементы машин на этом этапе.")
+        if doc_type == 'summons':
+            return self._summons_summary(document_text or '')
+        return None
+
+    def route(self, document_name: str, document_text: str) -> Dict:
+        """
+        Decide whether a document needs a model call
+
+        Args:
+            document_name: Document title
+            document_text: Extracted text
+
+        Returns:
+            Dictionary with 'type' (None for ordinary documents) and either
+            'summary' (templated, no call), 'short' True (formulaic but
+            needs a small max_tokens call), or neither (full model call)
+        """
+        self.counts['documents'] += 1
+        if not self.enabled:
+            return {'type': None}
+
+        doc_type = self.classify(document_name, document_text)
+        if doc_type is None:
+            return {'type': None}
+
+        summary = self.template_summary(doc_type, document_name, document_text)
+        if summary:
+            self.counts['template'] += 1
+            logger.info(f"Formulaic document ({doc_type}), templated summary: {document_name}")
+            return {'type': doc_type, 'summary': summary}
+
+        self.counts['short'] += 1
+        logger.info(f"Formulaic document ({doc_type}), short model call: {document_name}")
+        return {'type': doc_type, 'short': True}
+
+    def avoided_share(self) -> float:
+        """Share of routed documents summarized without a model call"""
+        return self.counts['template'] / self.counts['documents'] if self.counts['documents'] else 0.0
+
+    def stats(self) -> Dict:
+        """Routing counts and share of calls avoided in this process"""
+        return dict(self.counts, avoided_share=self.avoided_share())
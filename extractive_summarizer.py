@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Extractive Summarizer Module
+
+Local TextRank summary used when the Anthropic API cannot be called:
+sentences are ranked by centrality in their TF-IDF cosine similarity graph
+and the top ones are returned in document order
+"""
+
+import os
+import re
+import time
+import logging
+from typing import Optional, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends followed by the start of a new sentence, or a paragraph break
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-ZА-ЯЁ0-9"«(])|\n{2,}')
+WORD_RE = re.compile(r'[^\W\d_]{2,}')
+
+STOPWORDS = frozenset("""
+a an and are as at be been by for from has have in is it its of on or that the this to was were
+will with which who whom not no shall may must any all such than then there these those their
+he she they his her them we our you your i me my also into out over under after before during
+""".split())
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+
+
+def split_sentences(text: str, min_chars: int = 25, max_chars: int = 400) -> List[str]:
+    """
+    Split text into sentences usable in a summary
+
+    Args:
+        text: Normalized document text
+        min_chars: Shorter fragments (headings, table cells) are dropped
+        max_chars: Longer fragments (run-on tables) are dropped
+
+    Returns:
+        Sentences in document order
+    """
+    sentences = []
+    for fragment in SENTENCE_SPLIT_RE.split(text or ''):
+        sentence = ' '.join(fragment.split())
+        if min_chars <= len(sentence) <= max_chars:
+            sentences.append(sentence)
+    return sentences
+
+
+def _tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """L2-normalized TF-IDF rows, one per sentence"""
+    tokenized = [
+        [word for word in WORD_RE.findall(sentence.lower()) if word not in STOPWORDS]
+        for sentence in sentences
+    ]
+    vocabulary = {}
+    for words in tokenized:
+        for word in words:
+            vocabulary.setdefault(word, len(vocabulary))
+
+    counts = np.zeros((len(sentences), len(vocabulary)))
+    for row, words in enumerate(tokenized):
+        for word in words:
+            counts[row, vocabulary[word]] += 1
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    matrix = counts * idf
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def textrank_scores(matrix: np.ndarray) -> np.ndarray:
+    """
+    PageRank over the cosine similarity graph of the rows
+
+    Args:
+        matrix: L2-normalized sentence vectors
+
+    Returns:
+        Score per sentence
+    """
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+
+    # Row-stochastic transition matrix; isolated sentences jump uniformly
+    n = similarity.shape[0]
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(row_sums > 0, similarity / np.where(row_sums > 0, row_sums, 1), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+class ExtractiveSummarizer:
+    """TextRank summary of a document without any API call"""
+
+    def __init__(self, min_sentences: Optional[int] = None, max_sentences: Optional[int] = None,
+                 max_input_sentences: Optional[int] = None):
+        """
+        Initialize Extractive Summarizer
+
+        Args:
+            min_sentences: Sentences in a summary of a short document (EXTRACTIVE_MIN_SENTENCES)
+            max_sentences: Sentences in a summary of a long document (EXTRACTIVE_MAX_SENTENCES)
+            max_input_sentences: Only the first sentences are ranked, bounding the O(n^2) graph
+                (EXTRACTIVE_MAX_INPUT_SENTENCES)
+        """
+        self.min_sentences = min_sentences or int(os.getenv('EXTRACTIVE_MIN_SENTENCES', 3))
+        self.max_sentences = max_sentences or int(os.getenv('EXTRACTIVE_MAX_SENTENCES', 5))
+        self.max_input_sentences = max_input_sentences or int(os.getenv('EXTRACTIVE_MAX_INPUT_SENTENCES', 400))
+
+    def summarize(self, document_text: str) -> Optional[str]:
+        """
+        Pick the most central sentences of a document
+
+        Args:
+            document_text: Normalized document text
+
+        Returns:
+            3-5 sentences in document order, or None if the text has no usable sentences
+        """
+        started = time.monotonic()
+        sentences = split_sentences(document_text)[:self.max_input_sentences]
+        if not sentences:
+            return None
+
+        count = min(max(self.min_sentences, len(sentences) // 10), self.max_sentences)
+        if len(sentences) <= count:
+            return ' '.join(sentences)
+
+        scores = textrank_scores(_tfidf_matrix(sentences))
+        chosen = sorted(np.argsort(-scores, kind='stable')[:count])
+        summary = ' '.join(sentences[i] for i in chosen)
+
+        logger.info(f"Extractive summary: {count} of {len(sentences)} sentences "
+                    f"in {(time.monotonic() - started) * 1000:.0f} ms")
+        return summary
@@ -9,14 +9,29 @@ if they don't already exist.
 
 import os
 import sys
+import csv
+import json
 import time
 import logging
 from dotenv import load_dotenv
-from old_database import Database
+from old_database import Database, upcoming_seasons
 from scraper import FIAScraper
 from telegram_notifier import TelegramNotifier
 from pdf_processor import PDFProcessor
+from ocr_processor import OCRProcessor
 from claude_summarizer import ClaudeSummarizer
+from text_compactor import TextCompactor
+from summary_cache import SummaryCache
+from circuit_breaker import CircuitBreaker
+from document_classifier import DocumentClassifier
+from extractive_summarizer import ExtractiveSummarizer
+from async_summarizer import AsyncSummarizationService
+from batch_summarizer import BatchSummarizer
+from summary_worker import SummaryJobWorker, PRIORITY_NEW, PRIORITY_BACKFILL
+from usage_tracker import UsageTracker
+from stewards_digest import StewardsDigest
+from settings_cache import SettingsCache
+from check_trigger import check_trigger
 
 # Load environment variables
 load_dotenv()
@@ -39,6 +54,9 @@ class FIADocumentService:
 
     def __init__(self):
         self.db = Database()
+        self.settings = SettingsCache(self.db)  # bot_settings served from memory, refreshed on change
+        self.trigger = check_trigger(self.db)  # /check wake-ups and their results
+        self.last_cycle = None  # Results and timings of the last process_documents()
         self.fia_url = os.getenv(
             'FIA_URL',
             'https://www.fia.com/documents/championships/fia-formula-one-world-championship-14/season/season-2025-2071'
@@ -46,45 +64,41 @@ class FIADocumentService:
         self.scraper = FIAScraper(self.fia_url)
         self.check_interval = int(os.getenv('CHECK_INTERVAL', 3600))  # Default: 1 hour
         self.telegram = TelegramNotifier()  # Initialize Telegram notifier
-        self.pdf_processor = PDFProcessor()  # Initialize PDF processor
-        self.summarizer = ClaudeSummarizer()  # Initialize Claude summarizer
+        self.pdf_processor = PDFProcessor(ocr=OCRProcessor())  # Initialize PDF processor with OCR fallback
+        self.compactor = TextCompactor(self.db)  # Learned boilerplate stripping
+        self.summary_cache = SummaryCache(self.db)  # Summaries keyed by content, prompt version and model
+        self.classifier = DocumentClassifier()  # Templated summaries for formulaic documents
+        self.usage_tracker = UsageTracker(self.db)  # Per-call cost log and monthly budget governor
+        self.summarizer = ClaudeSummarizer(
+            compactor=self.compactor, cache=self.summary_cache,
+            breaker=CircuitBreaker(on_change=self.publish_circuit_state),
+            classifier=self.classifier,
+            fallback=ExtractiveSummarizer(),  # Local TextRank summary when the API is down
+            usage_tracker=self.usage_tracker
+        )
+        self.summary_service = AsyncSummarizationService(self.summarizer)  # Concurrent, rate-paced summaries
+        self.summary_worker = SummaryJobWorker(
+            self.db, self.summary_service, pdf_processor=self.pdf_processor, telegram=self.telegram
+        )  # Durable summary_jobs queue
+        self.digest = StewardsDigest(
+            self.db, self.summarizer, telegram=self.telegram, pdf_processor=self.pdf_processor
+        )  # One post and one call per burst of stewards' decisions
 
     def get_check_interval(self):
         """Get current check interval from database or environment"""
-        try:
-            interval_str = self.db.get_setting('check_interval', str(self.check_interval))
-            return int(interval_str)
-        except Exception as e:
-            logger.warning(f"Could not get interval from DB, using default: {e}")
-            return self.check_interval
+        return self.settings.get_int('check_interval', self.check_interval)
 
     def is_scraper_enabled(self):
         """Check if scraper is enabled"""
-        try:
-            enabled = self.db.get_setting('scraper_enabled', 'true')
-            return enabled.lower() == 'true'
-        except Exception as e:
-            logger.warning(f"Could not get enabled status, assuming true: {e}")
-            return True
-
-    def check_force_flag(self):
-        """Check and reset force check flag"""
-        try:
-            force = self.db.get_setting('force_check', 'false')
-            if force == 'true':
-                self.db.set_setting('force_check', 'false', 'system')
-                return True
-            return False
-        except Exception as e:
-            logger.warning(f"Could not check force flag: {e}")
-            return False
+        return self.settings.get_bool('scraper_enabled', True)
 
     def update_last_check_time(self):
         """Update last check timestamp"""
-        try:
-            self.db.set_setting('last_check_time', str(int(time.time())), 'system')
-        except Exception as e:
-            logger.warning(f"Could not update last check time: {e}")
+        self.settings.set('last_check_time', int(time.time()), 'system')
+
+    def publish_circuit_state(self, status):
+        """Store the Anthropic API circuit state for /status"""
+        self.settings.set('anthropic_circuit', json.dumps(status), 'system')
 
     def initialize(self):
         """Initialize the service"""
@@ -99,107 +113,250 @@ class FIADocumentService:
             logger.error(f"Failed to initialize database: {e}")
             raise
 
+        # Replace the circuit state left by a previous run
+        self.publish_circuit_state(self.summarizer.breaker.status())
+
+    def _attach_page_change_map(self, doc, pages):
+        """Compare pages with the closest stored version and attach the change map to doc"""
+        page_hashes = [page['hash'] for page in pages]
+        previous = self.db.find_previous_version(page_hashes)
+        if not previous:
+            return
+
+        previous_id, previous_hashes = previous
+        change_map = self.pdf_processor.build_change_map(previous_hashes, page_hashes)
+        doc['previous_version_id'] = previous_id
+        doc['page_change_map'] = change_map
+        logger.info(
+            f"Revision of document ID {previous_id}: "
+            f"changed pages {change_map['changed_pages'] or 'none'}, "
+            f"{change_map['removed_pages']} removed"
+        )
+
+    def _extract_document(self, doc):
+        """
+        Download a document and extract its text
+
+        Returns:
+            Tuple (text or None, list of pages or None)
+        """
+        pdf_path = None
+        try:
+            result = self.pdf_processor.process_pdf(
+                doc['url'], text_lookup=self.db.get_page_texts_by_hash
+            )
+            pdf_path = result.get('pdf_path')
+            pdf_text = result.get('text')
+            pages = result.get('pages')
+
+            if pages:
+                self._attach_page_change_map(doc, pages)
+
+            if pdf_text:
+                logger.info(f"PDF text extracted ({len(pdf_text)} chars)")
+                self.compactor.learn(pdf_text)
+            else:
+                logger.warning("Could not extract text from PDF")
+
+            return pdf_text, pages
+
+        except Exception as e:
+            logger.warning(f"Error extracting document text: {e}")
+            return None, None
+        finally:
+            # Clean up temp PDF file
+            if pdf_path:
+                self.pdf_processor.cleanup_temp_file(pdf_path)
+
     def process_documents(self):
         """Scrape documents and save new ones to database"""
         try:
             logger.info("="*60)
             logger.info("Starting document processing...")
+            started = time.monotonic()
 
             # Scrape documents from FIA website
             documents = self.scraper.scrape_documents()
+            scrape_seconds = time.monotonic() - started
 
             if not documents:
                 logger.warning("No documents found on the page")
+                self.last_cycle = {'found': 0, 'new': 0, 'existing': 0, 'posted': 0, 'summaries': 0,
+                                   'scrape_seconds': scrape_seconds, 'seconds': time.monotonic() - started}
                 return 0
 
+            detected_at = time.monotonic()
+
             # Process each document
             new_documents_count = 0
             existing_documents_count = 0
+            posted = []
+            post_latencies = []
+            summary_latencies = []
+
+            # The new year's partition exists before its first document (no-op once known)
+            self.db.ensure_season_partitions(upcoming_seasons())
+
+            # One lookup for the whole page instead of two queries per document
+            known_urls, known_hashes = self.db.get_existing_documents(
+                [doc['url'] for doc in documents], [doc['hash'] for doc in documents]
+            )
 
+            # Store and announce new documents first: the channel post must not
+            # wait for download, extraction and summarization
             for doc in documents:
                 try:
-                    # Check if document already exists by URL
-                    if self.db.document_exists(doc['url']):
+                    if doc['url'] in known_urls:
                         existing_documents_count += 1
-                        logger.info(f"Document already exists (skipping): {doc['name']}")
+                        logger.debug(f"Document already exists (skipping): {doc['name']}")
                         continue
 
-                    # Check if document with same hash exists
-                    if self.db.document_exists_by_hash(doc['hash']):
+                    if doc['hash'] in known_hashes:
                         existing_documents_count += 1
                         logger.info(f"Document with same content exists (skipping): {doc['name']}")
                         continue
 
-                    # Try to generate summary if Claude Code is available
-                    summary = None
-                    pdf_path = None
+                    # Insert new document (summary is filled in later); ON CONFLICT
+                    # covers another instance inserting it since the lookup
+                    document_id = self.db.insert_document(doc)
+                    if not document_id:
+                        existing_documents_count += 1
+                        continue
+                    known_urls.add(doc['url'])
+                    known_hashes.add(doc['hash'])
+
+                    new_documents_count += 1
+                    logger.info(f"NEW DOCUMENT ADDED: {doc['name']} (ID: {document_id})")
+                    logger.info(f"  URL: {doc['url']}")
+                    logger.info(f"  Size: {doc['size']} bytes" if doc['size'] else "  Size: Unknown")
+
+                    if self.digest.replaces_post(doc['name']):
+                        # Covered by the stewards' digest once the burst is over
+                        logger.info(f"Stewards' document left for the digest: {doc['name']}")
+                        posted.append((doc, document_id, None))
+                        continue
+
+                    # Queue the summary durably before any work is done on it
+                    # (lazy mode: only when a reader asks for it)
+                    if not self.telegram.lazy_summaries:
+                        self.db.enqueue_summary_jobs([document_id], priority=PRIORITY_NEW)
+
+                    # Send Telegram notification with a pending summary
+                    messages = {}
                     try:
-                        if self.summarizer.is_available():
-                            logger.info(f"Attempting to generate summary for: {doc['name']}")
-
-                            # Download and extract text from PDF
-                            result = self.pdf_processor.process_pdf(doc['url'])
-                            pdf_path = result.get('pdf_path')
-                            pdf_text = result.get('text')
-
-                            if pdf_text:
-                                logger.info(f"PDF text extracted ({len(pdf_text)} chars)")
-
-                                # Generate summary
-                                summary = self.summarizer.generate_summary(pdf_text, doc['name'])
-
-                                if summary:
-                                    logger.info(f"✓ Summary generated successfully")
-                                    doc['summary'] = summary
-                                else:
-                                    logger.info("No summary generated (quota/error)")
-                            else:
-                                logger.warning("Could not extract text from PDF")
+                        messages = self.telegram.post_document(doc, document_id)
+                        if messages:
+                            post_latencies.append(time.monotonic() - detected_at)
+                            primary = messages.get(self.summarizer.primary_language)
+                            if primary:
+                                self.db.set_telegram_message_id(document_id, primary[1])
+                            self.db.set_language_messages(document_id, messages)
+                            logger.info(f"Telegram notification sent for: {doc['name']} "
+                                        f"({post_latencies[-1]:.1f}s after detection)")
+                            # Delay to prevent connection pool exhaustion
+                            time.sleep(0.5)
                         else:
-                            logger.info("Claude Code not available, skipping summary")
+                            logger.warning(f"Failed to send Telegram notification for: {doc['name']}")
                     except Exception as e:
-                        logger.warning(f"Error generating summary: {e}")
-                    finally:
-                        # Clean up temp PDF file
-                        if pdf_path:
-                            self.pdf_processor.cleanup_temp_file(pdf_path)
+                        logger.error(f"Error sending Telegram notification: {e}")
 
-                    # Insert new document (with summary if available)
-                    document_id = self.db.insert_document(doc)
-
-                    if document_id:
-                        new_documents_count += 1
-                        logger.info(f"NEW DOCUMENT ADDED: {doc['name']} (ID: {document_id})")
-                        logger.info(f"  URL: {doc['url']}")
-                        logger.info(f"  Size: {doc['size']} bytes" if doc['size'] else "  Size: Unknown")
-                        if summary:
-                            logger.info(f"  Summary: ✓ Generated")
-
-                        # Send Telegram notification
-                        try:
-                            if self.telegram.notify_new_document(doc):
-                                logger.info(f"Telegram notification sent for: {doc['name']}")
-                                # Delay to prevent connection pool exhaustion
-                                time.sleep(2)
-                            else:
-                                logger.warning(f"Failed to send Telegram notification for: {doc['name']}")
-                        except Exception as e:
-                            logger.error(f"Error sending Telegram notification: {e}")
-                    else:
-                        existing_documents_count += 1
+                    posted.append((doc, document_id, messages))
 
                 except Exception as e:
                     logger.error(f"Error processing document {doc.get('name', 'Unknown')}: {e}")
                     continue
 
+            # Download PDFs and extract text, reusing pages known from previous versions.
+            # Pointless while the API circuit is open: the jobs stay queued and the
+            # worker extracts the text once the API is back.
+            if posted and self.summarizer.breaker.is_open():
+                logger.warning(f"Anthropic API circuit open, skipping extraction of {len(posted)} "
+                               f"document(s); summaries stay queued")
+                posted_for_extraction = []
+            else:
+                posted_for_extraction = posted
+
+            for doc, document_id, _ in posted_for_extraction:
+                try:
+                    _, pages = self._extract_document(doc)
+                    if pages:
+                        self.db.save_document_pages(document_id, pages)
+                    if doc.get('previous_version_id'):
+                        self.db.set_previous_version(document_id, doc['previous_version_id'],
+                                                     doc.get('page_change_map'))
+                except Exception as e:
+                    logger.error(f"Error extracting document {doc.get('name', 'Unknown')}: {e}")
+
+            # Summarize the new documents (queued with the highest priority) plus one round
+            # of due retries; the rest of the backlog is left to summary-worker. Jobs left
+            # unfinished stay queued and survive a restart.
+            summaries = {}
+            pending = set() if self.telegram.lazy_summaries else {
+                document_id for _, document_id, messages in posted if messages is not None
+            }
+            while True:
+                try:
+                    done = self.summary_worker.run_once()
+                except Exception as e:
+                    logger.warning(f"Error generating summaries: {e}")
+                    break
+                summaries.update(done)
+                pending -= done.keys()
+                # Stop once a round claimed none of them (deferred or left to another worker)
+                if not pending or not self.summary_worker.last_claimed & pending:
+                    break
+
+            for doc, document_id, messages in posted:
+                if document_id in summaries and messages:
+                    summary_latencies.append(time.monotonic() - detected_at)
+                    logger.info(f"Summary posted for: {doc['name']} "
+                                f"({summary_latencies[-1]:.1f}s after detection)")
+
+            # Post digests of stewards' document bursts that have ended
+            self.run_digests()
+
             # Summary
             logger.info("="*60)
             logger.info(f"Processing completed:")
             logger.info(f"  Total documents found: {len(documents)}")
             logger.info(f"  New documents added: {new_documents_count}")
             logger.info(f"  Existing documents skipped: {existing_documents_count}")
+            if post_latencies:
+                logger.info(f"  Detection to first post: avg {sum(post_latencies) / len(post_latencies):.1f}s, "
+                            f"max {max(post_latencies):.1f}s")
+            if summary_latencies:
+                logger.info(f"  Detection to summary: avg {sum(summary_latencies) / len(summary_latencies):.1f}s, "
+                            f"max {max(summary_latencies):.1f}s")
+            cache_stats = self.summary_cache.stats()
+            if cache_stats['hits'] or cache_stats['misses']:
+                logger.info(f"  Summary cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                            f"({cache_stats['hit_rate']:.0%} hit rate)")
+            routing = self.classifier.stats()
+            if routing['documents']:
+                logger.info(f"  Rule-based summaries since start: {routing['template']} of {routing['documents']} "
+                            f"documents ({routing['avoided_share']:.0%} of model calls avoided), "
+                            f"{routing['short']} short calls")
+            usage = self.summarizer.usage_totals
+            if usage['calls']:
+                logger.info(f"  API usage since start: {usage['calls']} calls, "
+                            f"{usage['input_tokens']} in / {usage['output_tokens']} out tokens, "
+                            f"prompt cache {usage['cache_read_input_tokens']} read / "
+                            f"{usage['cache_creation_input_tokens']} written, "
+                            f"avg latency {usage['latency'] / usage['calls']:.2f}s")
+            if self.usage_tracker.monthly_budget:
+                logger.info(f"  API spend this month: ${self.usage_tracker.month_spent:.2f} of "
+                            f"${self.usage_tracker.monthly_budget:.2f} (governor: {self.usage_tracker.mode()})")
             logger.info("="*60)
 
+            self.last_cycle = {
+                'found': len(documents),
+                'new': new_documents_count,
+                'existing': existing_documents_count,
+                'posted': len(post_latencies),
+                'summaries': len(summary_latencies),
+                'scrape_seconds': scrape_seconds,
+                'seconds': time.monotonic() - started,
+            }
             return new_documents_count
 
         except Exception as e:
@@ -217,44 +374,106 @@ class FIADocumentService:
             logger.error(f"Error running service: {e}")
             raise
         finally:
+            self.pdf_processor.close()
             self.db.close_all_connections()
 
-    def run_continuous(self):
-        """Run the service continuously with dynamic interval from database"""
+    def run_digests(self):
+        """Post digests of stewards' document bursts that have ended"""
+        try:
+            self.digest.run_once()
+        except Exception as e:
+            logger.warning(f"Error posting stewards' digests: {e}")
+
+    def next_digest_in(self):
+        """Seconds until an open stewards' burst closes and its digest is due, or None"""
+        if not self.is_scraper_enabled():
+            return None
+        try:
+            seconds = self.digest.next_run_in()
+        except Exception as e:
+            logger.warning(f"Error scheduling stewards' digests: {e}")
+            return None
+        # A moment past the gap, so the group counts as closed when the loop wakes
+        return seconds + 1 if seconds is not None else None
+
+    def run_check(self, request_ids=()):
+        """
+        Run one check and report it to the /check requests it serves
+
+        Args:
+            request_ids: Ids of the /check requests that triggered the check
+
+        Returns:
+            Number of new documents
+        """
+        if not self.is_scraper_enabled():
+            logger.info("Scraping is disabled, skipping check...")
+            self.trigger.publish(request_ids, {'disabled': True})
+            return 0
+
+        try:
+            new_docs = self.process_documents()
+        except Exception as e:
+            self.trigger.publish(request_ids, {'error': str(e)})
+            raise
+        self.update_last_check_time()
+        self.trigger.publish(request_ids, self.last_cycle)
+
+        if new_docs > 0:
+            logger.info(f"Added {new_docs} new document(s)")
+        return new_docs
+
+    def close(self):
+        """Close the settings listener, PDF processor and database connections"""
+        self.settings.close()
+        self.pdf_processor.close()
+        self.db.close_all_connections()
+
+    def run_continuous(self, close_on_exit=True):
+        """
+        Run the service continuously with dynamic interval from database
+
+        Args:
+            close_on_exit: Close the service when the loop stops; False when
+                other threads (the bot) keep using it and close it at shutdown
+        """
         try:
             self.initialize()
 
             initial_interval = self.get_check_interval()
             logger.info(f"Starting continuous monitoring (initial interval: {initial_interval} seconds)")
 
+            request_ids = []
+            next_check = 0.0
             while True:
                 try:
-                    # Get current interval from database (allows dynamic updates)
-                    current_interval = self.get_check_interval()
-
-                    # Check if scraping is enabled
-                    if not self.is_scraper_enabled():
-                        logger.info("Scraping is disabled, skipping check...")
-                    else:
-                        # Process documents
-                        new_docs = self.process_documents()
-                        self.update_last_check_time()
-
-                        if new_docs > 0:
-                            logger.info(f"Added {new_docs} new document(s)")
+                    if request_ids or time.monotonic() >= next_check:
+                        # Get current interval from database (allows dynamic updates)
+                        current_interval = self.get_check_interval()
 
-                    logger.info(f"Waiting {current_interval} seconds until next check...")
+                        served, request_ids = request_ids, []
+                        self.run_check(served)
 
-                    # Sleep in smaller intervals to check for force flag
-                    sleep_time = 0
-                    while sleep_time < current_interval:
-                        time.sleep(10)  # Check every 10 seconds
-                        sleep_time += 10
+                        # While disabled, look at the setting again every 30 seconds
+                        if not self.is_scraper_enabled():
+                            current_interval = min(current_interval, 30)
+                        next_check = time.monotonic() + current_interval
+                    else:
+                        # Woken because a stewards' burst has ended
+                        self.run_digests()
+
+                    wait = next_check - time.monotonic()
+                    digest_in = self.next_digest_in()
+                    if digest_in is not None and digest_in < wait:
+                        wait = digest_in
+                        logger.info(f"Waiting {wait:.0f} seconds until the stewards' digest is due...")
+                    else:
+                        logger.info(f"Waiting {wait:.0f} seconds until next check...")
 
-                        # Check for force check flag
-                        if self.check_force_flag():
-                            logger.info("Force check triggered!")
-                            break
+                    # Sleep until the interval is over, a digest is due or /check wakes the loop
+                    request_ids = self.trigger.wait(max(wait, 1))
+                    if request_ids:
+                        logger.info("Force check triggered!")
 
                 except KeyboardInterrupt:
                     logger.info("Received interrupt signal. Shutting down...")
@@ -262,36 +481,139 @@ class FIADocumentService:
                 except Exception as e:
                     logger.error(f"Error in continuous run: {e}")
                     logger.info("Waiting 60 seconds before retry...")
-                    time.sleep(60)
+                    request_ids = self.trigger.wait(60)
 
         except Exception as e:
             logger.error(f"Fatal error in continuous mode: {e}")
             raise
         finally:
-            self.db.close_all_connections()
+            if close_on_exit:
+                self.close()
             logger.info("Service stopped")
 
-    def list_documents(self):
-        """List all documents in database"""
+    def list_documents(self, output_format='text', output=None, season=None, limit=None, after=None):
+        """
+        List documents in database, newest first, in constant memory
+
+        Args:
+            output_format: 'text', 'jsonl' (one JSON object per line) or 'csv'
+            output: File to write to (default stdout)
+            season: Only documents of this season
+            limit: Print one page of this many documents instead of all (keyset pagination)
+            after: Page token printed for the previous page ("<created_at>,<id>")
+        """
+        stream = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
         try:
             self.initialize()
-            documents = self.db.get_all_documents()
+            if limit:
+                if after:
+                    created_at, document_id = after.rsplit(',', 1)
+                    after = (created_at, int(document_id))
+                documents, next_page = self.db.get_documents_page(after, limit, season)
+            else:
+                documents, next_page = self.db.iter_documents(season), None
+
+            if output_format == 'jsonl':
+                count = 0
+                for count, doc in enumerate(documents, 1):
+                    stream.write(json.dumps(doc, default=str, ensure_ascii=False) + "\n")
+            elif output_format == 'csv':
+                writer = csv.DictWriter(stream, fieldnames=self.db.LIST_COLUMNS)
+                writer.writeheader()
+                count = 0
+                for count, doc in enumerate(documents, 1):
+                    writer.writerow(doc)
+            else:
+                print("\n" + "="*80, file=stream)
+                count = 0
+                for count, doc in enumerate(documents, 1):
+                    print(f"\n{count}. {doc['document_name']}", file=stream)
+                    print(f"   URL: {doc['document_url']}", file=stream)
+                    print(f"   Added: {doc['created_at']}", file=stream)
+                    print(f"   Size: {doc['file_size']} bytes" if doc['file_size'] else "   Size: Unknown",
+                          file=stream)
+                print("\n" + "="*80, file=stream)
+                print(f"Documents listed: {count}", file=stream)
+                print("="*80, file=stream)
+
+            logger.info(f"Listed {count} document(s)")
+            if next_page:
+                logger.info(f"Next page: --limit {limit} --after '{next_page[0].isoformat()},{next_page[1]}'")
 
-            print("\n" + "="*80)
-            print(f"Total documents in database: {len(documents)}")
-            print("="*80)
+        except Exception as e:
+            logger.error(f"Error listing documents: {e}")
+            raise
+        finally:
+            if output:
+                stream.close()
+            self.db.close_all_connections()
 
-            for idx, doc in enumerate(documents, 1):
-                print(f"\n{idx}. {doc['document_name']}")
-                print(f"   URL: {doc['document_url']}")
-                print(f"   Added: {doc['created_at']}")
-                print(f"   Size: {doc['file_size']} bytes" if doc['file_size'] else "   Size: Unknown")
+    def seed_documents(self):
+        """Store every scraped document not in the database yet, without posting or summarizing"""
+        try:
+            self.initialize()
+            documents = self.scraper.scrape_documents()
+            known_urls, known_hashes = self.db.get_existing_documents(
+                [doc['url'] for doc in documents], [doc['hash'] for doc in documents]
+            )
+            new = [doc for doc in documents if doc['url'] not in known_urls and doc['hash'] not in known_hashes]
+            ids = self.db.insert_documents(new)
+            inserted = sum(1 for document_id in ids if document_id)
+            print(f"Seeded {inserted} of {len(documents)} scraped documents "
+                  f"({len(documents) - len(new)} already stored)")
+            return inserted
+        except Exception as e:
+            logger.error(f"Error seeding documents: {e}")
+            raise
+        finally:
+            self.db.close_all_connections()
 
-            print("\n" + "="*80)
+    def learn_boilerplate(self):
+        """Build the boilerplate frequency index from all stored documents"""
+        try:
+            self.initialize()
+            count = self.compactor.learn_corpus(self.db.get_document_texts())
+            self.compactor.refresh(force=True)
+            print(f"Learned boilerplate from {count} documents, "
+                  f"{len(self.compactor.boilerplate)} lines will be stripped")
+        except Exception as e:
+            logger.error(f"Error learning boilerplate: {e}")
+            raise
+        finally:
+            self.db.close_all_connections()
 
+    def batch_summarize(self, season=None, missing_only=True):
+        """Summarize stored documents in bulk through the Message Batches API"""
+        try:
+            self.initialize()
+            batch = BatchSummarizer(self.summarizer, self.db, pdf_processor=self.pdf_processor)
+            written = batch.run(season=season, missing_only=missing_only)
+            logger.info(f"Batch summarization completed. {written} summaries written.")
+            return written
         except Exception as e:
-            logger.error(f"Error listing documents: {e}")
+            logger.error(f"Error in batch summarization: {e}")
             raise
+        finally:
+            self.pdf_processor.close()
+            self.db.close_all_connections()
+
+    def run_summary_worker(self):
+        """Drain the summary job queue until interrupted (can run in several processes)"""
+        try:
+            self.initialize()
+            self.summary_worker.run()
+        finally:
+            self.pdf_processor.close()
+            self.db.close_all_connections()
+
+    def backfill_summaries(self, retry_failed=False):
+        """Queue every stored document without a summary"""
+        try:
+            self.initialize()
+            queued = self.db.enqueue_missing_summaries(priority=PRIORITY_BACKFILL, retry_failed=retry_failed)
+            print(f"Queued {queued} document(s) for summarization. "
+                  f"Queue: {self.db.get_summary_job_stats()}")
+            return queued
         finally:
             self.db.close_all_connections()
 
@@ -333,14 +655,14 @@ class FIADocumentService:
             application = Application.builder().token(bot_token).build()
 
             # Setup command handlers
-            asyncio.run(setup_bot_handlers(application, self.db, chat_id))
+            asyncio.run(setup_bot_handlers(application, self.db, chat_id, self.summary_worker))
 
             # Start bot in background
             logger.info("Starting Telegram bot...")
-            application.run_polling(drop_pending_updates=True, allowed_updates=['message'])
+            application.run_polling(drop_pending_updates=True, allowed_updates=['message', 'callback_query'])
 
             # This won't be reached while bot is running
-            # The continuous monitoring happens in parallel through force_check flags
+            # The continuous monitoring runs in another process; /check reaches it via NOTIFY
 
         except Exception as e:
             logger.error(f"Error in bot mode: {e}")
@@ -356,14 +678,36 @@ def main():
     parser = argparse.ArgumentParser(description='FIA Documents Scraper Service')
     parser.add_argument(
         'mode',
-        choices=['once', 'continuous', 'list', 'test-telegram', 'bot'],
+        choices=['once', 'continuous', 'list', 'test-telegram', 'bot', 'learn-boilerplate',
+                 'batch-summarize', 'summary-worker', 'summary-backfill', 'seed'],
         help='Run mode: once (single run), continuous (periodic checks with dynamic interval), '
              'list (show all documents), test-telegram (test Telegram connection), '
-             'bot (run with Telegram bot command handling)'
+             'bot (run with Telegram bot command handling), '
+             'learn-boilerplate (rebuild boilerplate index from stored documents), '
+             'batch-summarize (backfill/re-summarize stored documents via batch API, resumable), '
+             'summary-worker (process queued summary jobs), '
+             'summary-backfill (queue stored documents without a summary), '
+             'seed (store scraped documents in bulk without posting them)'
     )
+    parser.add_argument('--season', help='batch-summarize, list: only documents of this season')
+    parser.add_argument('--format', choices=['text', 'jsonl', 'csv'], default='text',
+                        help='list: output format')
+    parser.add_argument('--output', help='list: write to this file instead of stdout')
+    parser.add_argument('--limit', type=int, help='list: print one page of this many documents')
+    parser.add_argument('--after', help='list: page token printed after the previous page')
+    parser.add_argument('--all', action='store_true',
+                        help='batch-summarize: re-summarize documents that already have a summary')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='summary-backfill: also requeue jobs that exhausted their attempts')
 
     args = parser.parse_args()
 
+    if args.mode == 'list' and args.format != 'text' and not args.output:
+        # Keep stdout machine-readable: log to stderr
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and getattr(handler, 'stream', None) is sys.stdout:
+                handler.setStream(sys.stderr)
+
     service = FIADocumentService()
 
     try:
@@ -372,11 +716,22 @@ def main():
         elif args.mode == 'continuous':
             service.run_continuous()
         elif args.mode == 'list':
-            service.list_documents()
+            service.list_documents(output_format=args.format, output=args.output, season=args.season,
+                                   limit=args.limit, after=args.after)
         elif args.mode == 'test-telegram':
             service.test_telegram()
         elif args.mode == 'bot':
             service.run_with_bot()
+        elif args.mode == 'learn-boilerplate':
+            service.learn_boilerplate()
+        elif args.mode == 'batch-summarize':
+            service.batch_summarize(season=args.season, missing_only=not args.all)
+        elif args.mode == 'summary-worker':
+            service.run_summary_worker()
+        elif args.mode == 'summary-backfill':
+            service.backfill_summaries(retry_failed=args.retry_failed)
+        elif args.mode == 'seed':
+            service.seed_documents()
     except KeyboardInterrupt:
         logger.info("Service interrupted by user")
         sys.exit(0)
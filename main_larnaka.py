@@ -14,6 +14,7 @@ from database.larnaka_database import LarnakaDatabase
 from formatters.larnaka_formatter import format_larnaka_event_post
 from telegram_notifier import TelegramNotifier
 from claude_summarizer import ClaudeSummarizer
+from summary_cache import SummaryCache
 from config import Config
 
 # Load environment variables
@@ -49,12 +50,10 @@ def process_new_event(event, db, telegram, admin_chat_id):
 
         # Generate AI summary
         logger.info("Generating AI summary...")
-        summarizer = ClaudeSummarizer()
-        summary = None
-        if summarizer.is_available():
-            summary = summarizer.generate_summary(event_info, "Larnaka Event")
-        else:
-            logger.warning("Claude summarizer not available")
+        summarizer = ClaudeSummarizer(cache=SummaryCache(db))
+        if not summarizer.is_available():
+            logger.warning("Claude summarizer not available, only cached summaries can be used")
+        summary = summarizer.generate_summary(event_info, "Larnaka Event")
 
         if summary:
             logger.info(f"Summary generated: {summary[:100]}...")
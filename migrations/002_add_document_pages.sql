@@ -0,0 +1,24 @@
+-- Migration: Add per-page hashes for republished documents
+-- Created: 2026-10-19
+
+-- Link a document to the stored version it revises and keep the page change map
+ALTER TABLE fia_documents
+    ADD COLUMN IF NOT EXISTS previous_version_id INTEGER,
+    ADD COLUMN IF NOT EXISTS page_change_map JSONB;
+
+-- Create document_pages table
+CREATE TABLE IF NOT EXISTS document_pages (
+    id SERIAL PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    page_number INTEGER NOT NULL,
+    page_hash VARCHAR(64) NOT NULL,
+    page_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (document_id, page_number)
+);
+
+-- Lookups of already extracted pages go by hash
+CREATE INDEX IF NOT EXISTS idx_document_pages_hash ON document_pages(page_hash);
+
+COMMENT ON COLUMN document_pages.page_hash IS 'SHA256 of the raw page content stream and XObjects';
+COMMENT ON COLUMN fia_documents.page_change_map IS 'Per-page statuses compared to previous_version_id';
@@ -0,0 +1,17 @@
+-- Migration: Add boilerplate line frequency index for prompt compaction
+-- Created: 2026-10-19
+
+-- One row per normalized line, counted once per document it appears in
+CREATE TABLE IF NOT EXISTS boilerplate_lines (
+    line_hash VARCHAR(40) PRIMARY KEY,
+    line_text TEXT NOT NULL,
+    doc_count INTEGER NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Number of documents counted in the index
+INSERT INTO bot_settings (setting_key, setting_value, description, updated_by)
+VALUES ('boilerplate_corpus_docs', '0', 'Documents counted in the boilerplate index', 'system')
+ON CONFLICT (setting_key) DO NOTHING;
+
+COMMENT ON COLUMN boilerplate_lines.line_hash IS 'SHA1 of the lowercased line with digits masked';
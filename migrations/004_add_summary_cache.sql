@@ -0,0 +1,18 @@
+-- Migration: Add persistent summary cache
+-- Created: 2026-10-19
+
+-- Summaries keyed by normalized-text hash, prompt template version and model.
+-- Bumping PROMPT_VERSION in claude_summarizer.py makes old entries unreachable.
+CREATE TABLE IF NOT EXISTS summary_cache (
+    text_hash VARCHAR(64) NOT NULL,
+    prompt_version VARCHAR(20) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    summary TEXT NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP,
+    PRIMARY KEY (text_hash, prompt_version, model)
+);
+
+-- Lifetime hit rate
+-- SELECT SUM(hit_count)::FLOAT / NULLIF(SUM(hit_count) + COUNT(*), 0) AS hit_rate FROM summary_cache;
@@ -0,0 +1,11 @@
+-- Migration: Add checkpoints for batch summarization
+-- Created: 2026-10-19
+
+-- One row per submitted Message Batch; 'submitted' batches are resumed on the next run
+CREATE TABLE IF NOT EXISTS summary_batches (
+    batch_id VARCHAR(100) PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'submitted',
+    document_ids INTEGER[] NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,10 @@
+-- Migration: Record how summaries were produced
+-- Created: 2026-10-19
+
+-- single, map_reduce, truncated or cached, plus the tokens spent on the summary
+ALTER TABLE fia_documents
+    ADD COLUMN IF NOT EXISTS summary_strategy VARCHAR(20),
+    ADD COLUMN IF NOT EXISTS summary_input_tokens INTEGER,
+    ADD COLUMN IF NOT EXISTS summary_output_tokens INTEGER;
+
+COMMENT ON COLUMN fia_documents.summary_strategy IS 'single, map_reduce, truncated or cached';
@@ -0,0 +1,8 @@
+-- Migration: Keep the channel message of each document
+-- Created: 2026-10-19
+
+-- Documents are posted before their summary exists; the message is edited in place later
+ALTER TABLE fia_documents
+    ADD COLUMN IF NOT EXISTS telegram_message_id BIGINT;
+
+COMMENT ON COLUMN fia_documents.telegram_message_id IS 'Message in TELEGRAM_CHAT_ID to edit when the summary is ready';
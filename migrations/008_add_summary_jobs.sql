@@ -0,0 +1,27 @@
+-- Migration: Add durable summarization job queue
+-- Created: 2026-10-19
+
+-- One job per document; workers claim due jobs with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS summary_jobs (
+    id SERIAL PRIMARY KEY,
+    document_id INTEGER NOT NULL UNIQUE,
+    state VARCHAR(20) NOT NULL DEFAULT 'pending',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_summary_jobs_due ON summary_jobs(state, priority DESC, next_run_at);
+
+COMMENT ON COLUMN summary_jobs.state IS 'pending, running, done or failed';
+COMMENT ON COLUMN summary_jobs.next_run_at IS 'Earliest time of the next attempt (exponential backoff)';
+
+-- Backfill: documents stored without a summary
+INSERT INTO summary_jobs (document_id, priority)
+SELECT id, -10 FROM fia_documents WHERE summary IS NULL
+ON CONFLICT (document_id) DO NOTHING;
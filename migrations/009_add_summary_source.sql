@@ -0,0 +1,12 @@
+-- Migration: Record the source of each summary
+-- Created: 2026-10-19
+
+-- llm, extractive (local TextRank fallback) or template (formulaic documents)
+ALTER TABLE fia_documents
+    ADD COLUMN IF NOT EXISTS summary_source VARCHAR(20);
+
+UPDATE fia_documents
+SET summary_source = CASE WHEN summary_strategy = 'template' THEN 'template' ELSE 'llm' END
+WHERE summary IS NOT NULL AND summary_source IS NULL;
+
+COMMENT ON COLUMN fia_documents.summary_source IS 'llm, extractive or template';
@@ -0,0 +1,24 @@
+-- Migration: Log token usage and cost of every summary
+-- Created: 2026-10-19
+
+-- One row per API call; summaries made without a call (template,
+-- extractive, cache hit) are logged as a single row without a model
+CREATE TABLE IF NOT EXISTS api_usage (
+    id SERIAL PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    document_name TEXT,
+    doc_type VARCHAR(30) NOT NULL DEFAULT 'other',
+    source VARCHAR(20) NOT NULL,
+    strategy VARCHAR(20) NOT NULL,
+    model VARCHAR(100),
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_creation_input_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_input_tokens INTEGER NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(12, 6) NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_usage_created_at ON api_usage(created_at);
+
+COMMENT ON TABLE api_usage IS 'Per-call token usage and cost of summaries';
+COMMENT ON COLUMN api_usage.doc_type IS 'Formulaic document type from the classifier, or other';
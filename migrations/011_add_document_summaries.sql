@@ -0,0 +1,16 @@
+-- Migration: Summaries and channel posts per language
+-- Created: 2026-10-19
+
+-- fia_documents.summary keeps the primary language summary; every
+-- configured language (primary included) gets a row here
+CREATE TABLE IF NOT EXISTS document_summaries (
+    document_id INTEGER NOT NULL REFERENCES fia_documents(id) ON DELETE CASCADE,
+    language VARCHAR(10) NOT NULL,
+    summary TEXT,
+    chat_id VARCHAR(100),
+    message_id BIGINT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (document_id, language)
+);
+
+COMMENT ON TABLE document_summaries IS 'Summary and Telegram post of a document per language';
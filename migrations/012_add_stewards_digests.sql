@@ -0,0 +1,18 @@
+-- Migration: Stewards' digests summarizing a burst of decisions in one call
+-- Created: 2026-10-19
+
+CREATE TABLE IF NOT EXISTS stewards_digests (
+    id SERIAL PRIMARY KEY,
+    event VARCHAR(300) NOT NULL,
+    document_count INTEGER NOT NULL,
+    summary TEXT,
+    summaries JSONB,
+    summary_source VARCHAR(20),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE fia_documents
+    ADD COLUMN IF NOT EXISTS digest_id INTEGER REFERENCES stewards_digests(id);
+
+COMMENT ON TABLE stewards_digests IS 'One summary of the stewards documents of an event and session window';
+COMMENT ON COLUMN fia_documents.digest_id IS 'Digest covering this document, if any';
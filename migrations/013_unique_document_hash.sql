@@ -0,0 +1,18 @@
+-- Migration: Unique content hash, so document inserts can use ON CONFLICT DO NOTHING
+-- Created: 2026-10-19
+
+-- Later documents with the content of an earlier one point to it and keep their hash
+ALTER TABLE fia_documents ADD COLUMN IF NOT EXISTS duplicate_of INTEGER;
+
+UPDATE fia_documents d
+SET duplicate_of = (
+    SELECT MIN(o.id) FROM fia_documents o WHERE o.document_hash = d.document_hash
+)
+WHERE d.duplicate_of IS NULL AND EXISTS (
+    SELECT 1 FROM fia_documents o
+    WHERE o.document_hash = d.document_hash AND o.id < d.id
+);
+
+-- Duplicates are left out of the unique index; idx_document_hash still finds them by hash
+CREATE UNIQUE INDEX IF NOT EXISTS idx_document_hash_unique
+    ON fia_documents(document_hash) WHERE duplicate_of IS NULL;
@@ -0,0 +1,56 @@
+-- Migration: Document counters maintained by a trigger, so /status and /stats
+-- do not read the whole fia_documents table
+-- Created: 2026-10-19
+
+CREATE TABLE IF NOT EXISTS document_stats (
+    season VARCHAR(20) NOT NULL,
+    document_type VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    documents INTEGER NOT NULL DEFAULT 0,
+    total_size BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (season, document_type, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_document_stats_day ON document_stats(day);
+
+-- Latest document without sorting the table
+CREATE INDEX IF NOT EXISTS idx_created_at ON fia_documents(created_at DESC);
+
+CREATE OR REPLACE FUNCTION update_document_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE document_stats
+        SET documents = documents - 1,
+            total_size = total_size - COALESCE(OLD.file_size, 0)
+        WHERE season = COALESCE(OLD.season, '')
+          AND document_type = COALESCE(OLD.document_type, '')
+          AND day = COALESCE(OLD.created_at::date, CURRENT_DATE);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO document_stats (season, document_type, day, documents, total_size)
+        VALUES (COALESCE(NEW.season, ''), COALESCE(NEW.document_type, ''),
+                COALESCE(NEW.created_at::date, CURRENT_DATE), 1, COALESCE(NEW.file_size, 0))
+        ON CONFLICT (season, document_type, day) DO UPDATE
+        SET documents = document_stats.documents + 1,
+            total_size = document_stats.total_size + EXCLUDED.total_size;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_document_stats ON fia_documents;
+CREATE TRIGGER update_document_stats
+    AFTER INSERT OR DELETE OR UPDATE OF season, document_type, file_size, created_at ON fia_documents
+    FOR EACH ROW
+    EXECUTE FUNCTION update_document_stats();
+
+-- Counters for the documents stored so far
+INSERT INTO document_stats (season, document_type, day, documents, total_size)
+SELECT COALESCE(season, ''), COALESCE(document_type, ''), COALESCE(created_at::date, CURRENT_DATE),
+       COUNT(*), COALESCE(SUM(file_size), 0)
+FROM fia_documents
+WHERE NOT EXISTS (SELECT 1 FROM document_stats)
+GROUP BY 1, 2, 3;
+
+COMMENT ON TABLE document_stats IS 'Document count and size per season, type and day, kept current by trigger update_document_stats';
@@ -0,0 +1,8 @@
+-- Migration: (created_at, id) index for keyset pagination of document listings
+-- Created: 2026-10-19
+
+-- Newest first; id breaks ties between documents stored in the same transaction
+CREATE INDEX IF NOT EXISTS idx_created_at_id ON fia_documents(created_at DESC, id DESC);
+
+-- Covered by idx_created_at_id
+DROP INDEX IF EXISTS idx_created_at;
@@ -0,0 +1,152 @@
+-- Migration: Partition fia_documents by season
+-- Created: 2026-10-19
+--
+-- Requires PostgreSQL 13+ (BEFORE UPDATE trigger on a partitioned table).
+-- Stop the scraper and the bot first: the table is copied in one transaction.
+--
+-- Every unique key of a partitioned table must contain the partition key, so
+-- the primary key becomes (id, season), document_url and document_hash are
+-- unique per season (Database.insert_document looks known URLs and hashes up
+-- across all seasons under an advisory lock) and the foreign key from document_summaries is
+-- dropped. Documents of a season without a partition go to fia_documents_default
+-- until create_season_partition() moves them out.
+
+BEGIN;
+
+LOCK TABLE fia_documents IN ACCESS EXCLUSIVE MODE;
+
+-- The id sequence moves over to the new table, ids are kept
+ALTER SEQUENCE fia_documents_id_seq OWNED BY NONE;
+
+CREATE TABLE fia_documents_partitioned (
+    id INTEGER NOT NULL DEFAULT nextval('fia_documents_id_seq'),
+    document_name VARCHAR(500) NOT NULL,
+    document_url VARCHAR(1000) NOT NULL,
+    document_hash VARCHAR(80) NOT NULL,
+    file_size BIGINT,
+    document_type VARCHAR(50),
+    season VARCHAR(20) NOT NULL DEFAULT '',
+    summary TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    previous_version_id INTEGER,
+    page_change_map JSONB,
+    summary_strategy VARCHAR(20),
+    summary_input_tokens INTEGER,
+    summary_output_tokens INTEGER,
+    summary_source VARCHAR(20),
+    telegram_message_id BIGINT,
+    digest_id INTEGER,
+    duplicate_of INTEGER
+) PARTITION BY LIST (season);
+
+CREATE TABLE fia_documents_default PARTITION OF fia_documents_partitioned DEFAULT;
+
+-- One partition per stored season
+DO $$
+DECLARE
+    s TEXT;
+BEGIN
+    FOR s IN SELECT DISTINCT season FROM fia_documents WHERE season <> '' LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF fia_documents_partitioned FOR VALUES IN (%L)',
+                       'fia_documents_' || regexp_replace(lower(s), '[^a-z0-9]+', '_', 'g'), s);
+    END LOOP;
+END $$;
+
+-- Copied before keys, indexes and triggers exist: indexes are built once per
+-- partition and document_stats already counts these rows
+INSERT INTO fia_documents_partitioned (
+    id, document_name, document_url, document_hash, file_size, document_type, season, summary,
+    created_at, updated_at, previous_version_id, page_change_map,
+    summary_strategy, summary_input_tokens, summary_output_tokens, summary_source,
+    telegram_message_id, digest_id, duplicate_of
+)
+SELECT
+    id, document_name, document_url, document_hash, file_size, document_type, COALESCE(season, ''), summary,
+    created_at, updated_at, previous_version_id, page_change_map,
+    summary_strategy, summary_input_tokens, summary_output_tokens, summary_source,
+    telegram_message_id, digest_id, duplicate_of
+FROM fia_documents;
+
+-- Also drops document_summaries_document_id_fkey and the old triggers
+DROP TABLE fia_documents CASCADE;
+
+ALTER TABLE fia_documents_partitioned RENAME TO fia_documents;
+ALTER SEQUENCE fia_documents_id_seq OWNED BY fia_documents.id;
+
+ALTER TABLE fia_documents
+    ADD PRIMARY KEY (id, season),
+    ADD UNIQUE (document_url, season),
+    ADD FOREIGN KEY (digest_id) REFERENCES stewards_digests(id);
+
+-- Partitioned indexes: each partition gets its own, new partitions inherit them
+CREATE UNIQUE INDEX idx_document_hash_unique ON fia_documents(document_hash, season)
+    WHERE duplicate_of IS NULL;
+CREATE INDEX idx_document_hash ON fia_documents(document_hash);
+CREATE INDEX idx_created_at_id ON fia_documents(created_at DESC, id DESC);
+
+CREATE TRIGGER update_document_stats
+    AFTER INSERT OR DELETE OR UPDATE OF season, document_type, file_size, created_at ON fia_documents
+    FOR EACH ROW
+    EXECUTE FUNCTION update_document_stats();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'update_updated_at_column') THEN
+        CREATE TRIGGER update_fia_documents_updated_at
+            BEFORE UPDATE ON fia_documents
+            FOR EACH ROW
+            EXECUTE FUNCTION update_updated_at_column();
+    END IF;
+END $$;
+
+-- Creates the partition of a season, moving its rows out of the default partition;
+-- false if it already exists. The application calls it for the current and next season.
+CREATE OR REPLACE FUNCTION create_season_partition(p_season TEXT)
+RETURNS BOOLEAN AS $$
+DECLARE
+    partition_name TEXT := 'fia_documents_' || regexp_replace(lower(p_season), '[^a-z0-9]+', '_', 'g');
+    moved INTEGER;
+BEGIN
+    -- Scraper and bot may start at the same time
+    PERFORM pg_advisory_xact_lock(hashtext('create_season_partition'));
+
+    IF EXISTS (
+        SELECT 1 FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'fia_documents'::regclass
+          AND c.relname = partition_name
+    ) THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE fia_documents INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM fia_documents_default WHERE season = %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved', p_season, partition_name);
+    GET DIAGNOSTICS moved = ROW_COUNT;
+    EXECUTE format('ALTER TABLE fia_documents ATTACH PARTITION %I FOR VALUES IN (%L)',
+                   partition_name, p_season);
+
+    -- The DELETE above took the moved rows out of document_stats: count them again
+    IF moved > 0 THEN
+        EXECUTE format(
+            'INSERT INTO document_stats (season, document_type, day, documents, total_size) '
+            'SELECT season, COALESCE(document_type, ''''), COALESCE(created_at::date, CURRENT_DATE), '
+            '       COUNT(*), COALESCE(SUM(file_size), 0) '
+            'FROM %I GROUP BY 1, 2, 3 '
+            'ON CONFLICT (season, document_type, day) DO UPDATE '
+            'SET documents = document_stats.documents + EXCLUDED.documents, '
+            '    total_size = document_stats.total_size + EXCLUDED.total_size', partition_name);
+    END IF;
+
+    RETURN TRUE;
+END;
+$$ language 'plpgsql';
+
+SELECT create_season_partition(EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER::TEXT);
+SELECT create_season_partition((EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1)::TEXT);
+
+COMMIT;
+
+ANALYZE fia_documents;
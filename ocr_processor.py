@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+OCR Processor Module
+
+OCR fallback for scanned PDF pages that have no text layer
+"""
+
+import os
+import shutil
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(niceness: int):
+    """Lower the priority of an OCR worker process so the scraper keeps its CPU"""
+    try:
+        if niceness:
+            os.nice(niceness)
+    except (AttributeError, OSError) as e:
+        logger.debug(f"Could not change OCR worker priority: {e}")
+
+
+def _ocr_page(pdf_path: str, page_index: int, dpi: int, lang: str) -> str:
+    """
+    Render a single page and run tesseract on it (executed in a worker process)
+
+    Args:
+        pdf_path: Path to PDF file
+        page_index: Zero-based page index
+        dpi: Rendering resolution
+        lang: Tesseract language(s), e.g. 'eng' or 'eng+fra'
+
+    Returns:
+        Recognized text
+    """
+    import pypdfium2 as pdfium
+    import pytesseract
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        image = pdf[page_index].render(scale=dpi / 72).to_pil()
+    finally:
+        pdf.close()
+
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+class OCRProcessor:
+    """Runs tesseract OCR on PDF pages in a bounded, low-priority process pool"""
+
+    def __init__(self, max_workers: Optional[int] = None, niceness: Optional[int] = None,
+                 dpi: Optional[int] = None, lang: Optional[str] = None,
+                 page_timeout: Optional[int] = None, cache_size: int = 256):
+        """
+        Initialize OCR Processor
+
+        Args:
+            max_workers: Maximum number of concurrent OCR processes (OCR_MAX_WORKERS)
+            niceness: Niceness increment applied to worker processes (OCR_NICE)
+            dpi: Page rendering resolution (OCR_DPI)
+            lang: Tesseract language(s) (OCR_LANG)
+            page_timeout: Seconds to wait for a single page (OCR_PAGE_TIMEOUT)
+            cache_size: Number of page results kept in memory, keyed by page hash
+        """
+        self.enabled = os.getenv('OCR_ENABLED', 'true').lower() == 'true'
+        self.max_workers = max_workers or int(os.getenv('OCR_MAX_WORKERS', 1))
+        self.niceness = niceness if niceness is not None else int(os.getenv('OCR_NICE', 10))
+        self.dpi = dpi or int(os.getenv('OCR_DPI', 200))
+        self.lang = lang or os.getenv('OCR_LANG', 'eng')
+        self.page_timeout = page_timeout or int(os.getenv('OCR_PAGE_TIMEOUT', 120))
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._executor = None
+        self._available = None
+
+    def is_available(self) -> bool:
+        """
+        Check if OCR can run
+
+        Returns:
+            True if OCR is enabled and tesseract with its Python bindings is installed
+        """
+        if self._available is None:
+            if not self.enabled:
+                self._available = False
+            elif not shutil.which('tesseract'):
+                logger.warning("tesseract binary not found, OCR fallback disabled")
+                self._available = False
+            else:
+                try:
+                    import pytesseract  # noqa: F401
+                    import pypdfium2  # noqa: F401
+                    self._available = True
+                except ImportError:
+                    logger.warning("pytesseract/pypdfium2 not installed, OCR fallback disabled")
+                    self._available = False
+
+        return self._available
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            # spawn: workers must not inherit the parent's DB pools, threads and event loops
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.niceness,)
+            )
+            logger.info(f"OCR pool started (workers={self.max_workers}, nice={self.niceness})")
+        return self._executor
+
+    def _cache_get(self, page_hash: str) -> Optional[str]:
+        if page_hash in self._cache:
+            self._cache.move_to_end(page_hash)
+            return self._cache[page_hash]
+        return None
+
+    def _cache_put(self, page_hash: str, text: str):
+        self._cache[page_hash] = text
+        self._cache.move_to_end(page_hash)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def ocr_pages(self, pdf_path: str, pages: List[Dict]) -> Dict[int, str]:
+        """
+        OCR the given pages of a PDF
+
+        Args:
+            pdf_path: Path to PDF file
+            pages: List of dicts with 'page_number' (1-based) and 'hash' keys
+
+        Returns:
+            Dictionary mapping page number to recognized text
+        """
+        results = {}
+        if not pages or not self.is_available():
+            return results
+
+        pending = {}
+        for page in pages:
+            cached = self._cache_get(page['hash'])
+            if cached is not None:
+                results[page['page_number']] = cached
+            else:
+                pending[page['page_number']] = page['hash']
+
+        if not pending:
+            return results
+
+        logger.info(f"Running OCR on {len(pending)} page(s) ({len(results)} cached)...")
+
+        try:
+            queue = list(pending)
+            while queue:
+                executor = self._get_executor()
+                futures = {
+                    page_number: executor.submit(_ocr_page, pdf_path, page_number - 1, self.dpi, self.lang)
+                    for page_number in queue
+                }
+                queue = []
+
+                handled = set()
+                for page_number, future in futures.items():
+                    handled.add(page_number)
+                    try:
+                        text = (future.result(timeout=self.page_timeout) or '').strip()
+                        results[page_number] = text
+                        self._cache_put(pending[page_number], text)
+                    except FutureTimeoutError:
+                        # cancel() cannot stop a running page: the hung worker would keep its slot
+                        logger.warning(f"OCR timed out on page {page_number}, restarting the OCR pool")
+                        self._recycle_executor()
+                        # Keep what finished before the restart, submit the rest again
+                        for other, other_future in futures.items():
+                            if other in handled:
+                                continue
+                            if other_future.done() and not other_future.cancelled() \
+                                    and other_future.exception() is None:
+                                results[other] = (other_future.result() or '').strip()
+                                self._cache_put(pending[other], results[other])
+                            else:
+                                queue.append(other)
+                        break
+                    except Exception as e:
+                        logger.error(f"OCR failed on page {page_number}: {e}")
+
+        except Exception as e:
+            logger.error(f"Error running OCR: {e}")
+
+        return results
+
+    def _recycle_executor(self):
+        """Kill the worker processes and start a new pool on next use"""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.debug("OCR pool stopped")
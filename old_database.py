@@ -1,35 +1,46 @@
 import psycopg2
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, Json, execute_values
 import os
 from dotenv import load_dotenv
 import logging
+from datetime import date
+
+from connection_pool import shared_pool, release_pool
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# NOTIFY channel announcing bot_settings changes (payload: setting key)
+SETTINGS_CHANNEL = 'bot_settings'
+
+
+def upcoming_seasons(today=None):
+    """Seasons that need a fia_documents partition now: the current and the next year"""
+    year = (today or date.today()).year
+    return [str(year), str(year + 1)]
+
 
 class Database:
     """Database connection and operations handler"""
 
     def __init__(self):
         self.connection_pool = None
+        self.partitioned = None         # fia_documents partitioned by season (known after the first check)
+        self.season_partitions = set()  # Seasons whose partition is known to exist
         self._initialize_pool()
 
     def _initialize_pool(self):
-        """Initialize connection pool"""
+        """Attach to the process-wide connection pool (sized by DB_POOL_MIN/DB_POOL_MAX)"""
         try:
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                1, 10,
+            self.connection_pool = shared_pool(
                 host=os.getenv('DB_HOST', 'localhost'),
                 port=os.getenv('DB_PORT', '5432'),
                 database=os.getenv('DB_NAME', 'fia_documents'),
                 user=os.getenv('DB_USER', 'postgres'),
                 password=os.getenv('DB_PASSWORD', '')
             )
-            logger.info("Database connection pool created successfully")
         except Exception as e:
             logger.error(f"Error creating connection pool: {e}")
             raise
@@ -42,303 +53,1655 @@ class Database:
         """Return connection to pool"""
         self.connection_pool.putconn(connection)
 
+    def connection(self):
+        """Context manager checking out a connection, rolled back if the block raises"""
+        return self.connection_pool.connection()
+
+    def pool_stats(self):
+        """Connection pool usage: size, in_use, checkouts, wait times, timeouts, errors"""
+        return self.connection_pool.stats()
+
     def create_tables(self):
         """Create necessary database tables"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
+            with self.connection() as connection, connection.cursor() as cursor:
+                # Create documents table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS fia_documents (
+                        id SERIAL,
+                        document_name VARCHAR(500) NOT NULL,
+                        document_url VARCHAR(1000) NOT NULL,
+                        document_hash VARCHAR(80) NOT NULL,
+                        file_size BIGINT,
+                        document_type VARCHAR(50),
+                        season VARCHAR(20) NOT NULL DEFAULT '',
+                        summary TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (id, season),
+                        UNIQUE (document_url, season)
+                    ) PARTITION BY LIST (season);
+                """)
 
-            # Create documents table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS fia_documents (
-                    id SERIAL PRIMARY KEY,
-                    document_name VARCHAR(500) NOT NULL,
-                    document_url VARCHAR(1000) NOT NULL UNIQUE,
-                    document_hash VARCHAR(64) NOT NULL,
-                    file_size BIGINT,
-                    document_type VARCHAR(50),
-                    season VARCHAR(20),
-                    summary TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Create index on document_url for faster lookups
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_document_url
-                ON fia_documents(document_url);
-            """)
+                # Unique index on document_hash (per season, as every unique key of the partitioned
+                # table must contain the partition key), so concurrent inserts of the same content
+                # resolve with ON CONFLICT. Older duplicates keep their hash and point to the first
+                # document with it through duplicate_of, which leaves them out of the index. These
+                # steps scan or rewrite the whole table, so they only run until the partial index exists.
+                cursor.execute("""
+                    SELECT indpred IS NOT NULL FROM pg_index
+                    WHERE indexrelid = to_regclass('idx_document_hash_unique');
+                """)
+                result = cursor.fetchone()
+                if not (result and result[0]):
+                    cursor.execute("""
+                        ALTER TABLE fia_documents ADD COLUMN IF NOT EXISTS duplicate_of INTEGER;
+                    """)
+                    cursor.execute("DROP INDEX IF EXISTS idx_document_hash_unique;")
+                    # Earlier versions of this step suffixed duplicate hashes with ':<id>'
+                    cursor.execute("""
+                        UPDATE fia_documents
+                        SET document_hash = split_part(document_hash, ':', 1)
+                        WHERE document_hash LIKE '%:' || id;
+                    """)
+                    cursor.execute("""
+                        UPDATE fia_documents d
+                        SET duplicate_of = (
+                            SELECT MIN(o.id) FROM fia_documents o WHERE o.document_hash = d.document_hash
+                        )
+                        WHERE d.duplicate_of IS NULL AND EXISTS (
+                            SELECT 1 FROM fia_documents o
+                            WHERE o.document_hash = d.document_hash AND o.id < d.id
+                        );
+                    """)
+                    cursor.execute("""
+                        CREATE UNIQUE INDEX idx_document_hash_unique
+                        ON fia_documents(document_hash, season) WHERE duplicate_of IS NULL;
+                    """)
 
-            # Create index on document_hash
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_document_hash
-                ON fia_documents(document_hash);
-            """)
+                # Content lookups cover duplicates too
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_document_hash ON fia_documents(document_hash);
+                """)
+
+                # Link to the previous version of a republished document
+                cursor.execute("""
+                    ALTER TABLE fia_documents
+                    ADD COLUMN IF NOT EXISTS previous_version_id INTEGER,
+                    ADD COLUMN IF NOT EXISTS page_change_map JSONB;
+                """)
+
+                # How each summary was produced and what it cost
+                cursor.execute("""
+                    ALTER TABLE fia_documents
+                    ADD COLUMN IF NOT EXISTS summary_strategy VARCHAR(20),
+                    ADD COLUMN IF NOT EXISTS summary_input_tokens INTEGER,
+                    ADD COLUMN IF NOT EXISTS summary_output_tokens INTEGER,
+                    ADD COLUMN IF NOT EXISTS summary_source VARCHAR(20);
+                """)
+
+                # Channel post of the document, edited once the summary is ready
+                cursor.execute("""
+                    ALTER TABLE fia_documents
+                    ADD COLUMN IF NOT EXISTS telegram_message_id BIGINT;
+                """)
+
+                # Create per-page hashes table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS document_pages (
+                        id SERIAL PRIMARY KEY,
+                        document_id INTEGER NOT NULL,
+                        page_number INTEGER NOT NULL,
+                        page_hash VARCHAR(64) NOT NULL,
+                        page_text TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE (document_id, page_number)
+                    );
+                """)
+
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_document_pages_hash
+                    ON document_pages(page_hash);
+                """)
+
+                # Create summary cache
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS summary_cache (
+                        text_hash VARCHAR(64) NOT NULL,
+                        prompt_version VARCHAR(20) NOT NULL,
+                        model VARCHAR(100) NOT NULL,
+                        summary TEXT NOT NULL,
+                        hit_count INTEGER NOT NULL DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_hit_at TIMESTAMP,
+                        PRIMARY KEY (text_hash, prompt_version, model)
+                    );
+                """)
+
+                # Create batch summarization checkpoints
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS summary_batches (
+                        batch_id VARCHAR(100) PRIMARY KEY,
+                        status VARCHAR(20) NOT NULL DEFAULT 'submitted',
+                        document_ids INTEGER[] NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+
+                # Create durable summarization job queue
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS summary_jobs (
+                        id SERIAL PRIMARY KEY,
+                        document_id INTEGER NOT NULL UNIQUE,
+                        state VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        priority INTEGER NOT NULL DEFAULT 0,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        locked_by VARCHAR(100),
+                        locked_at TIMESTAMP,
+                        last_error TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_summary_jobs_due
+                    ON summary_jobs(state, priority DESC, next_run_at);
+                """)
+
+                # Create per-language summaries and channel posts
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS document_summaries (
+                        document_id INTEGER NOT NULL,
+                        language VARCHAR(10) NOT NULL,
+                        summary TEXT,
+                        chat_id VARCHAR(100),
+                        message_id BIGINT,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (document_id, language)
+                    );
+                """)
+
+                # Create stewards' digests; member documents point to their digest
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS stewards_digests (
+                        id SERIAL PRIMARY KEY,
+                        event VARCHAR(300) NOT NULL,
+                        document_count INTEGER NOT NULL,
+                        summary TEXT,
+                        summaries JSONB,
+                        summary_source VARCHAR(20),
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+
+                cursor.execute("""
+                    ALTER TABLE fia_documents
+                    ADD COLUMN IF NOT EXISTS digest_id INTEGER REFERENCES stewards_digests(id);
+                """)
+
+                # Create per-call API usage and cost log
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS api_usage (
+                        id SERIAL PRIMARY KEY,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        document_name TEXT,
+                        doc_type VARCHAR(30) NOT NULL DEFAULT 'other',
+                        source VARCHAR(20) NOT NULL,
+                        strategy VARCHAR(20) NOT NULL,
+                        model VARCHAR(100),
+                        input_tokens INTEGER NOT NULL DEFAULT 0,
+                        output_tokens INTEGER NOT NULL DEFAULT 0,
+                        cache_creation_input_tokens INTEGER NOT NULL DEFAULT 0,
+                        cache_read_input_tokens INTEGER NOT NULL DEFAULT 0,
+                        cost_usd NUMERIC(12, 6) NOT NULL DEFAULT 0
+                    );
+                """)
+
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_api_usage_created_at
+                    ON api_usage(created_at);
+                """)
 
-            connection.commit()
-            logger.info("Database tables created successfully")
+                # Create document counters for /status and /stats, kept current by a trigger
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS document_stats (
+                        season VARCHAR(20) NOT NULL,
+                        document_type VARCHAR(50) NOT NULL,
+                        day DATE NOT NULL,
+                        documents INTEGER NOT NULL DEFAULT 0,
+                        total_size BIGINT NOT NULL DEFAULT 0,
+                        PRIMARY KEY (season, document_type, day)
+                    );
+                """)
+
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_document_stats_day
+                    ON document_stats(day);
+                """)
+
+                # Newest first, with id as tie-breaker for keyset pagination
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_created_at_id
+                    ON fia_documents(created_at DESC, id DESC);
+                """)
+                cursor.execute("DROP INDEX IF EXISTS idx_created_at;")
+
+                cursor.execute("""
+                    CREATE OR REPLACE FUNCTION update_document_stats()
+                    RETURNS TRIGGER AS $$
+                    BEGIN
+                        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                            UPDATE document_stats
+                            SET documents = documents - 1,
+                                total_size = total_size - COALESCE(OLD.file_size, 0)
+                            WHERE season = COALESCE(OLD.season, '')
+                              AND document_type = COALESCE(OLD.document_type, '')
+                              AND day = COALESCE(OLD.created_at::date, CURRENT_DATE);
+                        END IF;
+                        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                            INSERT INTO document_stats (season, document_type, day, documents, total_size)
+                            VALUES (COALESCE(NEW.season, ''), COALESCE(NEW.document_type, ''),
+                                    COALESCE(NEW.created_at::date, CURRENT_DATE), 1, COALESCE(NEW.file_size, 0))
+                            ON CONFLICT (season, document_type, day) DO UPDATE
+                            SET documents = document_stats.documents + 1,
+                                total_size = document_stats.total_size + EXCLUDED.total_size;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ language 'plpgsql';
+                """)
+
+                cursor.execute("""
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1 FROM pg_trigger
+                            WHERE tgname = 'update_document_stats'
+                              AND tgrelid = 'fia_documents'::regclass
+                        ) THEN
+                            CREATE TRIGGER update_document_stats
+                                AFTER INSERT OR DELETE OR UPDATE OF season, document_type, file_size, created_at
+                                ON fia_documents
+                                FOR EACH ROW
+                                EXECUTE FUNCTION update_document_stats();
+                        END IF;
+                    END $$;
+                """)
+
+                # Counters for documents stored before the trigger existed
+                cursor.execute("""
+                    INSERT INTO document_stats (season, document_type, day, documents, total_size)
+                    SELECT COALESCE(season, ''), COALESCE(document_type, ''),
+                           COALESCE(created_at::date, CURRENT_DATE), COUNT(*), COALESCE(SUM(file_size), 0)
+                    FROM fia_documents
+                    WHERE NOT EXISTS (SELECT 1 FROM document_stats)
+                    GROUP BY 1, 2, 3;
+                """)
+
+                # One partition per season; documents of seasons without one land in the default partition
+                cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'fia_documents'::regclass;")
+                self.partitioned = cursor.fetchone()[0] == 'p'
+                if self.partitioned:
+                    cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS fia_documents_default
+                        PARTITION OF fia_documents DEFAULT;
+                    """)
+                    cursor.execute(self.CREATE_SEASON_PARTITION_SQL)
+                    for season in upcoming_seasons():
+                        cursor.execute("SELECT create_season_partition(%s);", (season,))
+                        self.season_partitions.add(season)
+                else:
+                    logger.warning("fia_documents is not partitioned by season, "
+                                   "apply migrations/016_partition_fia_documents.sql")
+
+                # Create boilerplate line frequency index
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS boilerplate_lines (
+                        line_hash VARCHAR(40) PRIMARY KEY,
+                        line_text TEXT NOT NULL,
+                        doc_count INTEGER NOT NULL DEFAULT 1,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+
+                connection.commit()
+                logger.info("Database tables created successfully")
 
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
-            if connection:
-                connection.rollback()
             raise
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
 
     def document_exists(self, document_url):
         """Check if document already exists in database"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id FROM fia_documents WHERE document_url = %s",
+                    (document_url,)
+                )
 
-            cursor.execute(
-                "SELECT id FROM fia_documents WHERE document_url = %s",
-                (document_url,)
-            )
+                result = cursor.fetchone()
+                exists = result is not None
 
-            result = cursor.fetchone()
-            exists = result is not None
+                if exists:
+                    logger.info(f"Document already exists: {document_url}")
 
-            if exists:
-                logger.info(f"Document already exists: {document_url}")
-
-            return exists
+                return exists
 
         except Exception as e:
             logger.error(f"Error checking document existence: {e}")
             raise
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
 
     def document_exists_by_hash(self, document_hash):
         """Check if document with same hash already exists"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-
-            cursor.execute(
-                "SELECT id, document_url FROM fia_documents WHERE document_hash = %s",
-                (document_hash,)
-            )
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id, document_url FROM fia_documents WHERE document_hash = %s",
+                    (document_hash,)
+                )
 
-            result = cursor.fetchone()
+                result = cursor.fetchone()
 
-            if result:
-                logger.info(f"Document with same hash exists: {result[1]}")
-                return True
+                if result:
+                    logger.info(f"Document with same hash exists: {result[1]}")
+                    return True
 
-            return False
+                return False
 
         except Exception as e:
             logger.error(f"Error checking document hash: {e}")
             raise
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
+
+    def get_existing_documents(self, document_urls, document_hashes):
+        """
+        Look up many documents by URL or content hash in one query
+
+        Args:
+            document_urls: URLs to check
+            document_hashes: Content hashes to check
+
+        Returns:
+            (known URLs, known hashes) as sets
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT document_url, document_hash FROM fia_documents
+                    WHERE document_url = ANY(%s) OR document_hash = ANY(%s)
+                """, (list(document_urls), list(document_hashes)))
+
+                rows = cursor.fetchall()
+                return {row[0] for row in rows}, {row[1] for row in rows}
+
+        except Exception as e:
+            logger.error(f"Error checking document existence: {e}")
+            raise
+
+    # Creates the partition of a season, moving its rows out of the default partition;
+    # false if it already exists. Same definition as in migration 016.
+    CREATE_SEASON_PARTITION_SQL = """
+        CREATE OR REPLACE FUNCTION create_season_partition(p_season TEXT)
+        RETURNS BOOLEAN AS $$
+        DECLARE
+            partition_name TEXT := 'fia_documents_' || regexp_replace(lower(p_season), '[^a-z0-9]+', '_', 'g');
+            moved INTEGER;
+        BEGIN
+            -- Scraper and bot may start at the same time
+            PERFORM pg_advisory_xact_lock(hashtext('create_season_partition'));
+
+            IF EXISTS (
+                SELECT 1 FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'fia_documents'::regclass
+                  AND c.relname = partition_name
+            ) THEN
+                RETURN FALSE;
+            END IF;
+
+            EXECUTE format('CREATE TABLE %I (LIKE fia_documents INCLUDING DEFAULTS)', partition_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM fia_documents_default WHERE season = %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved', p_season, partition_name);
+            GET DIAGNOSTICS moved = ROW_COUNT;
+            EXECUTE format('ALTER TABLE fia_documents ATTACH PARTITION %I FOR VALUES IN (%L)',
+                           partition_name, p_season);
+
+            -- The DELETE above took the moved rows out of document_stats: count them again
+            IF moved > 0 THEN
+                EXECUTE format(
+                    'INSERT INTO document_stats (season, document_type, day, documents, total_size) '
+                    'SELECT season, COALESCE(document_type, ''''), COALESCE(created_at::date, CURRENT_DATE), '
+                    '       COUNT(*), COALESCE(SUM(file_size), 0) '
+                    'FROM %I GROUP BY 1, 2, 3 '
+                    'ON CONFLICT (season, document_type, day) DO UPDATE '
+                    'SET documents = document_stats.documents + EXCLUDED.documents, '
+                    '    total_size = document_stats.total_size + EXCLUDED.total_size', partition_name);
+            END IF;
+
+            RETURN TRUE;
+        END;
+        $$ language 'plpgsql';
+    """
+
+    def ensure_season_partitions(self, seasons):
+        """
+        Create the fia_documents partitions of these seasons if they do not exist yet
+
+        Seasons already seen by this Database cost no round trip. A season
+        without a partition is still stored (in the default partition), so
+        failures are only logged.
+
+        Args:
+            seasons: Season names, e.g. ['2025', '2026']
+
+        Returns:
+            List of seasons whose partition was created
+        """
+        missing = sorted({season for season in seasons if season} - self.season_partitions)
+        if not missing or self.partitioned is False:
+            return []
+
+        created = []
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                if self.partitioned is None:
+                    cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'fia_documents'::regclass;")
+                    self.partitioned = cursor.fetchone()[0] == 'p'
+                    if not self.partitioned:
+                        return []
+                for season in missing:
+                    cursor.execute("SELECT create_season_partition(%s);", (season,))
+                    if cursor.fetchone()[0]:
+                        created.append(season)
+                connection.commit()
+        except Exception as e:
+            logger.warning(f"Could not create partitions for seasons {', '.join(missing)}: {e}")
+            return []
+
+        self.season_partitions.update(missing)
+        for season in created:
+            logger.info(f"Created fia_documents partition for season {season}")
+        return created
+
+    INSERT_DOCUMENT_SQL = """
+        INSERT INTO fia_documents
+        (document_name, document_url, document_hash, file_size, document_type, season, summary,
+         previous_version_id, page_change_map,
+         summary_strategy, summary_source, summary_input_tokens, summary_output_tokens)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+    """
+
+    @staticmethod
+    def _document_row(document_data):
+        """Column values of a document for INSERT_DOCUMENT_SQL (a tuple adapts to one VALUES row)"""
+        change_map = document_data.get('page_change_map')
+        return (
+            document_data['name'],
+            document_data['url'],
+            document_data['hash'],
+            document_data.get('size'),
+            document_data.get('type', 'PDF'),
+            document_data.get('season', '2025'),
+            document_data.get('summary'),
+            document_data.get('previous_version_id'),
+            Json(change_map) if change_map is not None else None,
+            document_data.get('summary_strategy'),
+            document_data.get('summary_source'),
+            document_data.get('summary_input_tokens'),
+            document_data.get('summary_output_tokens')
+        )
+
+    @staticmethod
+    def _unknown_rows(cursor, rows):
+        """
+        Rows of INSERT_DOCUMENT_SQL whose URL and content hash are not stored in any season
+
+        The unique keys of the partitioned table only hold within one season.
+        The lookup runs in the insert transaction under an advisory lock kept
+        until commit, so concurrent writers cannot add the same document to
+        two seasons in between.
+        """
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext('insert_document'))")
+        cursor.execute("""
+            SELECT document_url, document_hash FROM fia_documents
+            WHERE document_url = ANY(%s) OR document_hash = ANY(%s)
+        """, ([row[1] for row in rows], [row[2] for row in rows]))
+
+        known = cursor.fetchall()
+        known_urls = {url for url, _ in known}
+        known_hashes = {document_hash for _, document_hash in known}
+        return [row for row in rows if row[1] not in known_urls and row[2] not in known_hashes]
 
     def insert_document(self, document_data):
-        """Insert new document into database"""
-        connection = None
+        """Insert new document into database, returning None if its URL or hash is already known"""
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
+            row = self._document_row(document_data)
+            self.ensure_season_partitions([row[5]])
+            with self.connection() as connection, connection.cursor() as cursor:
+                if self._unknown_rows(cursor, [row]):
+                    cursor.execute(self.INSERT_DOCUMENT_SQL + " RETURNING id", (row,))
+                    row = cursor.fetchone()
+                else:
+                    row = None
+                connection.commit()
 
-            cursor.execute("""
-                INSERT INTO fia_documents
-                (document_name, document_url, document_hash, file_size, document_type, season, summary)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                document_data['name'],
-                document_data['url'],
-                document_data['hash'],
-                document_data.get('size'),
-                document_data.get('type', 'PDF'),
-                document_data.get('season', '2025'),
-                document_data.get('summary')
-            ))
-
-            document_id = cursor.fetchone()[0]
-            connection.commit()
-
-            logger.info(f"Document inserted successfully: {document_data['name']} (ID: {document_id})")
-            return document_id
+                if row is None:
+                    logger.info(f"Document already exists (same URL or content): {document_data['url']}")
+                    return None
+                document_id = row[0]
+                logger.info(f"Document inserted successfully: {document_data['name']} (ID: {document_id})")
+                return document_id
 
         except psycopg2.IntegrityError as e:
             logger.warning(f"Document already exists (integrity error): {document_data['url']}")
-            if connection:
-                connection.rollback()
             return None
         except Exception as e:
             logger.error(f"Error inserting document: {e}")
-            if connection:
-                connection.rollback()
             raise
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
 
-    def get_all_documents(self):
-        """Retrieve all documents from database"""
-        connection = None
+    def insert_documents(self, documents, page_size=500):
+        """
+        Insert many documents in one transaction (seeding a season, importing an archive)
+
+        Args:
+            documents: Document dictionaries as for insert_document
+            page_size: Rows per INSERT statement
+
+        Returns:
+            List of new document IDs in the order of documents; None where the URL
+            or content hash was already known in any season (or repeated within documents)
+        """
+        if not documents:
+            return []
+
+        seen = set()
+        rows = []
+        for document in documents:
+            if document['url'] not in seen and document['hash'] not in seen:
+                seen.update((document['url'], document['hash']))
+                rows.append(self._document_row(document))
+
+        self.ensure_season_partitions({row[5] for row in rows})
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                rows = self._unknown_rows(cursor, rows)
+                inserted = execute_values(
+                    cursor, self.INSERT_DOCUMENT_SQL + " RETURNING document_url, id",
+                    rows, page_size=page_size, fetch=True
+                ) if rows else []
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error inserting documents: {e}")
+            raise
+
+        ids_by_url = dict(inserted)
+        logger.info(f"Inserted {len(ids_by_url)} of {len(documents)} documents")
+        # Repeated URLs map to the first occurrence only
+        return [ids_by_url.pop(document['url'], None) for document in documents]
+
+    def get_page_texts_by_hash(self, page_hashes):
+        """Get previously extracted page texts for the given page hashes"""
+        if not page_hashes:
+            return {}
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(cursor_factory=RealDictCursor)
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT DISTINCT ON (page_hash) page_hash, page_text
+                    FROM document_pages
+                    WHERE page_hash = ANY(%s) AND page_text <> ''
+                    ORDER BY page_hash, id DESC
+                """, (list(page_hashes),))
+
+                return {row[0]: row[1] for row in cursor.fetchall()}
+
+        except Exception as e:
+            logger.error(f"Error getting page texts: {e}")
+            return {}
+
+    def find_previous_version(self, page_hashes, min_shared=0.5):
+        """
+        Find the stored document sharing the most pages with the given hashes
 
+        A single common page (a blank page, a standard cover) does not make a
+        revision: the match has to cover at least min_shared of the new pages.
+
+        Args:
+            page_hashes: Page hashes of the new document in page order
+            min_shared: Share of the new document's distinct pages found in the match
+
+        Returns:
+            Tuple (document_id, page hashes in page order) or None
+        """
+        if not page_hashes:
+            return None
+
+        distinct_hashes = set(page_hashes)
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT document_id, COUNT(DISTINCT page_hash)
+                    FROM document_pages
+                    WHERE page_hash = ANY(%s)
+                    GROUP BY document_id
+                    ORDER BY COUNT(DISTINCT page_hash) DESC, document_id DESC
+                    LIMIT 1
+                """, (list(distinct_hashes),))
+
+                result = cursor.fetchone()
+                if not result or result[1] < min_shared * len(distinct_hashes):
+                    return None
+
+                document_id = result[0]
+                cursor.execute("""
+                    SELECT page_hash FROM document_pages
+                    WHERE document_id = %s
+                    ORDER BY page_number
+                """, (document_id,))
+
+                return document_id, [row[0] for row in cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Error finding previous document version: {e}")
+            return None
+
+    def save_document_pages(self, document_id, pages):
+        """Store per-page hashes and texts of a document"""
+        if not pages:
+            return True
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.executemany("""
+                    INSERT INTO document_pages (document_id, page_number, page_hash, page_text)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (document_id, page_number) DO UPDATE SET
+                        page_hash = EXCLUDED.page_hash,
+                        page_text = EXCLUDED.page_text
+                """, [
+                    (document_id, page['page_number'], page['hash'], page.get('text'))
+                    for page in pages
+                ])
+
+                connection.commit()
+                logger.info(f"Stored {len(pages)} page hashes for document ID: {document_id}")
+                return True
+
+        except Exception as e:
+            logger.error(f"Error saving document pages: {e}")
+            return False
+
+    def get_document_texts(self):
+        """Get the stored page text of every document, joined per document"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT string_agg(page_text, E'\\n\\n' ORDER BY page_number)
+                    FROM document_pages
+                    GROUP BY document_id
+                    ORDER BY document_id
+                """)
+
+                return [row[0] for row in cursor.fetchall() if row[0]]
+
+        except Exception as e:
+            logger.error(f"Error retrieving document texts: {e}")
+            raise
+
+    def update_boilerplate_index(self, lines):
+        """
+        Count one more document for each line of the boilerplate index
+
+        Args:
+            lines: dict mapping line hash to line text (unique lines of one document)
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.executemany("""
+                    INSERT INTO boilerplate_lines (line_hash, line_text)
+                    VALUES (%s, %s)
+                    ON CONFLICT (line_hash) DO UPDATE SET
+                        doc_count = boilerplate_lines.doc_count + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                """, list(lines.items()))
+
+                cursor.execute("""
+                    INSERT INTO bot_settings (setting_key, setting_value, description, updated_by)
+                    VALUES ('boilerplate_corpus_docs', '1', 'Documents counted in the boilerplate index', 'system')
+                    ON CONFLICT (setting_key) DO UPDATE SET
+                        setting_value = (bot_settings.setting_value::INTEGER + 1)::TEXT,
+                        updated_at = CURRENT_TIMESTAMP
+                """)
+
+                connection.commit()
+                return True
+
+        except Exception as e:
+            logger.error(f"Error updating boilerplate index: {e}")
+            return False
+
+    def replace_boilerplate_index(self, lines, corpus_docs):
+        """
+        Replace the whole boilerplate index in one transaction (rebuild from stored documents)
+
+        Args:
+            lines: dict mapping line hash to (line text, number of documents containing it)
+            corpus_docs: Number of documents counted
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("DELETE FROM boilerplate_lines")
+                execute_values(cursor, """
+                    INSERT INTO boilerplate_lines (line_hash, line_text, doc_count)
+                    VALUES %s
+                """, [(line_hash, text, count) for line_hash, (text, count) in lines.items()], page_size=1000)
+
+                cursor.execute("""
+                    INSERT INTO bot_settings (setting_key, setting_value, description, updated_by)
+                    VALUES ('boilerplate_corpus_docs', %s, 'Documents counted in the boilerplate index', 'system')
+                    ON CONFLICT (setting_key) DO UPDATE SET
+                        setting_value = EXCLUDED.setting_value,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (str(corpus_docs),))
+
+                connection.commit()
+                return True
+
+        except Exception as e:
+            logger.error(f"Error replacing boilerplate index: {e}")
+            raise
+
+    def get_boilerplate_lines(self, min_documents, min_ratio):
+        """Get hashes of lines frequent enough across the corpus to be boilerplate"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT line_hash FROM boilerplate_lines
+                    WHERE doc_count >= GREATEST(%s, %s * COALESCE((
+                        SELECT setting_value::INTEGER FROM bot_settings
+                        WHERE setting_key = 'boilerplate_corpus_docs'
+                    ), 0))
+                """, (min_documents, min_ratio))
+
+                return {row[0] for row in cursor.fetchall()}
+
+        except Exception as e:
+            logger.error(f"Error getting boilerplate lines: {e}")
+            return set()
+
+    def get_cached_summary(self, text_hash, prompt_version, model):
+        """Get cached summary and count the hit"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE summary_cache
+                    SET hit_count = hit_count + 1, last_hit_at = CURRENT_TIMESTAMP
+                    WHERE text_hash = %s AND prompt_version = %s AND model = %s
+                    RETURNING summary
+                """, (text_hash, prompt_version, model))
+
+                result = cursor.fetchone()
+                connection.commit()
+                return result[0] if result else None
+
+        except Exception as e:
+            logger.error(f"Error reading summary cache: {e}")
+            return None
+
+    def save_cached_summary(self, text_hash, prompt_version, model, summary):
+        """Store summary in cache"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO summary_cache (text_hash, prompt_version, model, summary)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (text_hash, prompt_version, model)
+                    DO UPDATE SET summary = EXCLUDED.summary
+                """, (text_hash, prompt_version, model, summary))
+
+                connection.commit()
+                return True
+
+        except Exception as e:
+            logger.error(f"Error writing summary cache: {e}")
+            return False
+
+    def get_summary_cache_stats(self):
+        """Get summary cache size and lifetime hit rate"""
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT COUNT(*) AS entries, COALESCE(SUM(hit_count), 0) AS hits
+                    FROM summary_cache
+                """)
+
+                stats = dict(cursor.fetchone())
+                lookups = stats['entries'] + stats['hits']
+                stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+                return stats
+
+        except Exception as e:
+            logger.error(f"Error getting summary cache stats: {e}")
+            return {'entries': 0, 'hits': 0, 'hit_rate': 0.0}
+
+    def get_documents_for_summary(self, season=None, missing_only=True):
+        """Get documents to (re-)summarize with their stored page text"""
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT d.id, d.document_name, d.document_url, t.text
+                    FROM fia_documents d
+                    LEFT JOIN (
+                        SELECT document_id, string_agg(page_text, E'\\n\\n' ORDER BY page_number) AS text
+                        FROM document_pages
+                        GROUP BY document_id
+                    ) t ON t.document_id = d.id
+                    WHERE (NOT %(missing_only)s OR d.summary IS NULL)
+                      AND (%(season)s::VARCHAR IS NULL OR d.season = %(season)s)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM summary_batches b
+                          WHERE b.status = 'submitted' AND d.id = ANY(b.document_ids)
+                      )
+                    ORDER BY d.id
+                """, {'missing_only': missing_only, 'season': season})
+
+                return cursor.fetchall()
+
+        except Exception as e:
+            logger.error(f"Error retrieving documents for summary: {e}")
+            raise
+
+    def get_texts_for_documents(self, document_ids):
+        """Get stored page text joined per document for the given ids"""
+        if not document_ids:
+            return {}
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT document_id, string_agg(page_text, E'\\n\\n' ORDER BY page_number)
+                    FROM document_pages
+                    WHERE document_id = ANY(%s)
+                    GROUP BY document_id
+                """, (list(document_ids),))
+
+                return {row[0]: row[1] for row in cursor.fetchall()}
+
+        except Exception as e:
+            logger.error(f"Error retrieving document texts: {e}")
+            return {}
+
+    def update_summaries(self, summaries, language_summaries=None):
+        """
+        Write many summaries in one statement
+
+        Args:
+            summaries: list of (document_id, summary, strategy, source, input_tokens, output_tokens) tuples
+            language_summaries: optional list of (document_id, language, summary) tuples
+                written to document_summaries in the same transaction
+        """
+        if not summaries:
+            return 0
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                execute_values(cursor, """
+                    UPDATE fia_documents AS d
+                    SET summary = v.summary,
+                        summary_strategy = v.strategy,
+                        summary_source = v.source,
+                        summary_input_tokens = v.input_tokens,
+                        summary_output_tokens = v.output_tokens,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM (VALUES %s) AS v(id, summary, strategy, source, input_tokens, output_tokens)
+                    WHERE d.id = v.id
+                """, summaries, template="(%s, %s, %s, %s, %s::integer, %s::integer)")
+                updated = cursor.rowcount
+
+                if language_summaries:
+                    execute_values(cursor, """
+                        INSERT INTO document_summaries (document_id, language, summary)
+                        VALUES %s
+                        ON CONFLICT (document_id, language) DO UPDATE
+                        SET summary = EXCLUDED.summary, updated_at = CURRENT_TIMESTAMP
+                    """, language_summaries)
+
+                connection.commit()
+                logger.info(f"Updated {updated} summaries")
+                return updated
+
+        except Exception as e:
+            logger.error(f"Error updating summaries: {e}")
+            raise
+
+    def set_telegram_message_id(self, document_id, message_id):
+        """Remember the channel message posted for a document"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE fia_documents
+                    SET telegram_message_id = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (message_id, document_id))
+
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error saving Telegram message id: {e}")
+            raise
+
+    def get_document_post(self, document_id):
+        """Get the posted fields of a document with its summary in every language"""
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT d.id, d.document_name, d.document_url, d.file_size, d.season,
+                           d.summary, d.summary_source,
+                           COALESCE((
+                               SELECT jsonb_object_agg(s.language, s.summary)
+                               FROM document_summaries s
+                               WHERE s.document_id = d.id AND s.summary IS NOT NULL
+                           ), '{}') AS summaries
+                    FROM fia_documents d
+                    WHERE d.id = %s
+                """, (document_id,))
+                return cursor.fetchone()
+
+        except Exception as e:
+            logger.error(f"Error retrieving document {document_id}: {e}")
+            return None
+
+    def set_language_messages(self, document_id, messages):
+        """
+        Remember the channel message posted for a document in each language
+
+        Args:
+            document_id: Document ID
+            messages: dict mapping language to (chat_id, message_id)
+        """
+        if not messages:
+            return
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO document_summaries (document_id, language, chat_id, message_id)
+                    VALUES %s
+                    ON CONFLICT (document_id, language) DO UPDATE
+                    SET chat_id = EXCLUDED.chat_id, message_id = EXCLUDED.message_id,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [(document_id, language, str(chat_id), message_id)
+                      for language, (chat_id, message_id) in messages.items()])
+
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error saving Telegram message ids: {e}")
+
+    def get_language_messages(self, document_ids):
+        """Get {document_id: {language: (chat_id, message_id)}} of posted documents"""
+        if not document_ids:
+            return {}
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT document_id, language, chat_id, message_id
+                    FROM document_summaries
+                    WHERE document_id = ANY(%s) AND message_id IS NOT NULL
+                """, (list(document_ids),))
+
+                messages = {}
+                for document_id, language, chat_id, message_id in cursor.fetchall():
+                    messages.setdefault(document_id, {})[language] = (chat_id, message_id)
+                return messages
+
+        except Exception as e:
+            logger.error(f"Error retrieving Telegram message ids: {e}")
+            return {}
+
+    def set_previous_version(self, document_id, previous_version_id, page_change_map):
+        """Link an already inserted document to the version it revises"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE fia_documents
+                    SET previous_version_id = %s, page_change_map = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (previous_version_id, Json(page_change_map) if page_change_map is not None else None,
+                      document_id))
+
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error saving previous version: {e}")
+            raise
+
+    def enqueue_summary_jobs(self, document_ids, priority=0):
+        """
+        Queue documents for summarization
+
+        Jobs that already finished or gave up are reset to pending; queued
+        jobs keep their state and get the higher of the two priorities.
+        """
+        if not document_ids:
+            return 0
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO summary_jobs (document_id, priority)
+                    VALUES %s
+                    ON CONFLICT (document_id) DO UPDATE SET
+                        priority = GREATEST(summary_jobs.priority, EXCLUDED.priority),
+                        state = CASE WHEN summary_jobs.state IN ('done', 'failed')
+                                     THEN 'pending' ELSE summary_jobs.state END,
+                        attempts = CASE WHEN summary_jobs.state IN ('done', 'failed')
+                                        THEN 0 ELSE summary_jobs.attempts END,
+                        next_run_at = CASE WHEN summary_jobs.state IN ('done', 'failed')
+                                           THEN CURRENT_TIMESTAMP ELSE summary_jobs.next_run_at END,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [(document_id, priority) for document_id in document_ids])
+
+                connection.commit()
+                return len(document_ids)
+
+        except Exception as e:
+            logger.error(f"Error enqueuing summary jobs: {e}")
+            raise
+
+    def enqueue_missing_summaries(self, priority=-10, retry_failed=False):
+        """Queue every document without a model summary that has no job yet (backfill)"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO summary_jobs (document_id, priority)
+                    SELECT d.id, %(priority)s
+                    FROM fia_documents d
+                    WHERE d.summary IS NULL OR d.summary_source = 'extractive'
+                    ON CONFLICT (document_id) DO UPDATE SET
+                        state = 'pending', attempts = 0, priority = EXCLUDED.priority,
+                        next_run_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                    WHERE summary_jobs.state = 'done'
+                       OR (%(retry_failed)s AND summary_jobs.state = 'failed')
+                """, {'priority': priority, 'retry_failed': retry_failed})
+
+                queued = cursor.rowcount
+                connection.commit()
+                logger.info(f"Queued {queued} document(s) without summary")
+                return queued
+
+        except Exception as e:
+            logger.error(f"Error queuing missing summaries: {e}")
+            raise
+
+    def claim_summary_jobs(self, worker_id, limit, lease_seconds):
+        """
+        Claim due jobs for one worker
+
+        Rows are locked with FOR UPDATE SKIP LOCKED, so concurrent workers
+        never claim the same job. Running jobs whose lease expired (worker
+        died) are claimed again.
+        """
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    WITH due AS (
+                        SELECT id FROM summary_jobs
+                        WHERE (state = 'pending' AND next_run_at <= CURRENT_TIMESTAMP)
+                           OR (state = 'running'
+                               AND locked_at < CURRENT_TIMESTAMP - make_interval(secs => %(lease)s))
+                        ORDER BY priority DESC, next_run_at
+                        LIMIT %(limit)s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    UPDATE summary_jobs j
+                    SET state = 'running', locked_by = %(worker)s, locked_at = CURRENT_TIMESTAMP,
+                        attempts = j.attempts + 1, updated_at = CURRENT_TIMESTAMP
+                    FROM due, fia_documents d
+                    WHERE j.id = due.id AND d.id = j.document_id
+                    RETURNING j.id, j.document_id, j.attempts, j.priority,
+                              d.document_name, d.document_url, d.file_size, d.season, d.telegram_message_id,
+                              d.summary_source
+                """, {'worker': worker_id, 'limit': limit, 'lease': lease_seconds})
+
+                jobs = cursor.fetchall()
+                connection.commit()
+                return jobs
+
+        except Exception as e:
+            logger.error(f"Error claiming summary jobs: {e}")
+            raise
+
+    def complete_summary_jobs(self, job_ids):
+        """Mark jobs as done"""
+        if not job_ids:
+            return
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE summary_jobs
+                    SET state = 'done', locked_by = NULL, locked_at = NULL, last_error = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY(%s)
+                """, (list(job_ids),))
+
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error completing summary jobs: {e}")
+            raise
+
+    def fail_summary_job(self, job_id, error, retry_in=None, count_attempt=True):
+        """
+        Release a job for a retry in retry_in seconds, or mark it failed if None
+
+        With count_attempt=False the claim is not counted against max attempts.
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE summary_jobs
+                    SET state = CASE WHEN %(retry_in)s::FLOAT IS NULL THEN 'failed' ELSE 'pending' END,
+                        next_run_at = CURRENT_TIMESTAMP + make_interval(secs => COALESCE(%(retry_in)s::FLOAT, 0)),
+                        attempts = CASE WHEN %(count)s THEN attempts ELSE GREATEST(attempts - 1, 0) END,
+                        locked_by = NULL, locked_at = NULL, last_error = %(error)s,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %(id)s
+                """, {'id': job_id, 'error': error, 'retry_in': retry_in, 'count': count_attempt})
+
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error failing summary job: {e}")
+            raise
+
+    def get_summary_job_stats(self):
+        """Get number of summary jobs per state"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("SELECT state, COUNT(*) FROM summary_jobs GROUP BY state")
+                return {row[0]: row[1] for row in cursor.fetchall()}
+
+        except Exception as e:
+            logger.error(f"Error retrieving summary job stats: {e}")
+            return {}
+
+    def get_undigested_documents(self, since):
+        """Get documents created since a point in time that are not part of a digest yet"""
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT id, document_name, document_url, season, summary, summary_source, created_at
+                    FROM fia_documents
+                    WHERE digest_id IS NULL AND created_at >= %s
+                    ORDER BY created_at
+                """, (since,))
+                return cursor.fetchall()
+
+        except Exception as e:
+            logger.error(f"Error retrieving undigested documents: {e}")
+            return []
+
+    def save_digest(self, event, document_ids, result):
+        """
+        Store a stewards' digest and link its documents to it
+
+        Args:
+            event: Event the documents belong to
+            document_ids: IDs of the digested documents
+            result: Summarizer result with 'summary', 'summaries' and 'source'
+
+        Returns:
+            ID of the digest
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO stewards_digests (event, document_count, summary, summaries, summary_source)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (event, len(document_ids), result['summary'], Json(result['summaries']), result['source']))
+                digest_id = cursor.fetchone()[0]
+
+                cursor.execute("""
+                    UPDATE fia_documents SET digest_id = %s WHERE id = ANY(%s)
+                """, (digest_id, list(document_ids)))
+
+                connection.commit()
+                return digest_id
+
+        except Exception as e:
+            logger.error(f"Error saving stewards digest: {e}")
+            raise
+
+    def insert_api_usage(self, rows):
+        """
+        Log API usage in one statement
+
+        Args:
+            rows: list of (document_name, doc_type, source, strategy, model, input_tokens,
+                output_tokens, cache_creation_input_tokens, cache_read_input_tokens, cost_usd) tuples
+        """
+        if not rows:
+            return
+
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO api_usage
+                        (document_name, doc_type, source, strategy, model, input_tokens, output_tokens,
+                         cache_creation_input_tokens, cache_read_input_tokens, cost_usd)
+                    VALUES %s
+                """, rows)
+
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error logging API usage: {e}")
+            raise
+
+    def get_api_cost_since(self, since):
+        """Get total API cost in USD since a point in time"""
+        with self.connection() as connection, connection.cursor() as cursor:
             cursor.execute("""
-                SELECT * FROM fia_documents
-                ORDER BY created_at DESC
-            """)
+                SELECT COALESCE(SUM(cost_usd), 0) FROM api_usage WHERE created_at >= %s
+            """, (since,))
+            return float(cursor.fetchone()[0])
+
 
-            documents = cursor.fetchall()
-            return documents
+    def get_api_usage_summary(self, since, group_by):
+        """
+        Get API usage aggregated since a point in time
+
+        Args:
+            since: Start of the period
+            group_by: 'day', 'source' or 'doc_type'
+
+        Returns:
+            List of dicts with the group key, calls, summaries made without_call, token sums and cost_usd
+        """
+        group_columns = {'day': 'created_at::date', 'source': 'source', 'doc_type': 'doc_type'}
+        column = group_columns[group_by]
+
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT {column} AS key,
+                           COUNT(model) AS calls,
+                           COUNT(*) FILTER (WHERE model IS NULL) AS without_call,
+                           SUM(input_tokens) AS input_tokens,
+                           SUM(output_tokens) AS output_tokens,
+                           SUM(cache_creation_input_tokens) AS cache_creation_input_tokens,
+                           SUM(cache_read_input_tokens) AS cache_read_input_tokens,
+                           SUM(cost_usd)::float AS cost_usd
+                    FROM api_usage
+                    WHERE created_at >= %s
+                    GROUP BY 1
+                    ORDER BY 1 DESC
+                """, (since,))
+                return [dict(row) for row in cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Error retrieving API usage: {e}")
+            return []
+
+    def create_summary_batch(self, batch_id, document_ids):
+        """Checkpoint a submitted summary batch"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO summary_batches (batch_id, document_ids)
+                    VALUES (%s, %s)
+                    ON CONFLICT (batch_id) DO NOTHING
+                """, (batch_id, list(document_ids)))
+
+                connection.commit()
+                return True
+
+        except Exception as e:
+            logger.error(f"Error saving summary batch {batch_id}: {e}")
+            raise
+
+    def get_open_summary_batches(self):
+        """Get ids of submitted batches whose results were not written yet"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT batch_id FROM summary_batches
+                    WHERE status = 'submitted'
+                    ORDER BY created_at
+                """)
+
+                return [row[0] for row in cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Error getting open summary batches: {e}")
+            return []
+
+    def set_summary_batch_status(self, batch_id, status):
+        """Update status of a summary batch"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE summary_batches
+                    SET status = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE batch_id = %s
+                """, (status, batch_id))
+
+                connection.commit()
+                return True
+
+        except Exception as e:
+            logger.error(f"Error updating summary batch {batch_id}: {e}")
+            return False
+
+    # Columns of document listings and exports
+    LIST_COLUMNS = (
+        'id', 'document_name', 'document_url', 'document_hash', 'file_size', 'document_type',
+        'season', 'created_at', 'summary', 'summary_source'
+    )
+
+    def get_all_documents(self):
+        """Retrieve all documents from database (see iter_documents for large tables)"""
+        return list(self.iter_documents())
+
+    def iter_documents(self, season=None, batch_size=None):
+        """
+        Stream documents, newest first, through a server-side cursor
+
+        Only batch_size rows are held in memory at a time. The pooled
+        connection stays checked out until the iteration ends or the
+        generator is closed.
+
+        Args:
+            season: Only documents of this season
+            batch_size: Rows fetched per round trip (DOCUMENT_STREAM_BATCH)
+
+        Yields:
+            Document dicts with LIST_COLUMNS
+        """
+        batch_size = batch_size or int(os.getenv('DOCUMENT_STREAM_BATCH', 1000))
+        try:
+            with self.connection() as connection, \
+                    connection.cursor(name='iter_documents', cursor_factory=RealDictCursor) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(f"""
+                    SELECT {', '.join(self.LIST_COLUMNS)} FROM fia_documents
+                    WHERE %(season)s IS NULL OR season = %(season)s
+                    ORDER BY created_at DESC, id DESC
+                """, {'season': season})
+
+                yield from cursor
+
+        except Exception as e:
+            logger.error(f"Error streaming documents: {e}")
+            raise
+
+    def get_documents_page(self, after=None, limit=100, season=None):
+        """
+        One page of documents, newest first, by keyset (created_at, id)
+
+        Each page is an index range scan on idx_created_at_id, however deep
+        into the table it starts.
+
+        Args:
+            after: Keyset (created_at, id) of the last row of the previous page, None for the first page
+            limit: Rows per page
+            season: Only documents of this season
+
+        Returns:
+            (list of document dicts with LIST_COLUMNS, keyset of the next page or None after the last page)
+        """
+        after_created_at, after_id = after or (None, None)
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT {', '.join(self.LIST_COLUMNS)} FROM fia_documents
+                    WHERE (%(created_at)s::timestamp IS NULL OR (created_at, id) < (%(created_at)s, %(id)s))
+                      AND (%(season)s IS NULL OR season = %(season)s)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %(limit)s
+                """, {'created_at': after_created_at, 'id': after_id, 'season': season, 'limit': limit})
+
+                rows = cursor.fetchall()
+                next_after = (rows[-1]['created_at'], rows[-1]['id']) if len(rows) == limit else None
+                return rows, next_after
+
+        except Exception as e:
+            logger.error(f"Error getting documents page: {e}")
+            raise
+
+    def get_document_stats(self, days=7):
+        """
+        Document counts and sizes from the document_stats counters
+
+        The counters are kept current by a trigger on fia_documents, so the
+        cost does not grow with the number of documents.
+
+        Args:
+            days: Number of recent days in the per-day breakdown
+
+        Returns:
+            dict with 'documents' and 'total_size', plus 'by_season', 'by_type'
+            (largest first) and 'by_day' (newest first) lists of dicts with
+            'key', 'documents' and 'total_size'
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT GROUPING(season), GROUPING(document_type), season, document_type,
+                           COALESCE(SUM(documents), 0), COALESCE(SUM(total_size), 0)
+                    FROM document_stats
+                    GROUP BY GROUPING SETS ((), (season), (document_type))
+                """)
+                stats = {'documents': 0, 'total_size': 0, 'by_season': [], 'by_type': [], 'by_day': []}
+                for season_grouped, type_grouped, season, document_type, count, size in cursor.fetchall():
+                    if season_grouped and type_grouped:
+                        stats['documents'], stats['total_size'] = int(count), int(size)
+                    elif count:
+                        key = 'by_type' if season_grouped else 'by_season'
+                        stats[key].append({'key': document_type if season_grouped else season,
+                                           'documents': int(count), 'total_size': int(size)})
+                for key in ('by_season', 'by_type'):
+                    stats[key].sort(key=lambda row: row['documents'], reverse=True)
+
+                cursor.execute("""
+                    SELECT day, SUM(documents), SUM(total_size)
+                    FROM document_stats
+                    WHERE day > CURRENT_DATE - %s
+                    GROUP BY day
+                    ORDER BY day DESC
+                """, (days,))
+                stats['by_day'] = [
+                    {'key': day, 'documents': int(count), 'total_size': int(size)}
+                    for day, count, size in cursor.fetchall() if count
+                ]
+                return stats
+
+        except Exception as e:
+            logger.error(f"Error getting document stats: {e}")
+            raise
+
+    def get_latest_document(self):
+        """Most recently added document (id, name, url, season, created_at), or None"""
+        try:
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT id, document_name, document_url, season, created_at
+                    FROM fia_documents
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """)
+                return cursor.fetchone()
 
         except Exception as e:
-            logger.error(f"Error retrieving documents: {e}")
+            logger.error(f"Error getting latest document: {e}")
             raise
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
 
     def close_all_connections(self):
-        """Close all connections in pool"""
+        """Release the shared pool; its connections close when no other Database uses it"""
         if self.connection_pool:
-            self.connection_pool.closeall()
-            logger.info("All database connections closed")
+            release_pool(self.connection_pool)
+            self.connection_pool = None
 
     def create_settings_table(self):
         """Create bot_settings table if not exists"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
+            with self.connection() as connection, connection.cursor() as cursor:
+                # Create settings table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS bot_settings (
+                        id SERIAL PRIMARY KEY,
+                        setting_key VARCHAR(100) NOT NULL UNIQUE,
+                        setting_value TEXT NOT NULL,
+                        description TEXT,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_by VARCHAR(100)
+                    );
+                """)
 
-            # Create settings table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bot_settings (
-                    id SERIAL PRIMARY KEY,
-                    setting_key VARCHAR(100) NOT NULL UNIQUE,
-                    setting_value TEXT NOT NULL,
-                    description TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_by VARCHAR(100)
-                );
-            """)
-
-            # Create index
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_setting_key
-                ON bot_settings(setting_key);
-            """)
+                # Create index
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_setting_key
+                    ON bot_settings(setting_key);
+                """)
 
-            # Insert default settings
-            cursor.execute("""
-                INSERT INTO bot_settings (setting_key, setting_value, description, updated_by)
-                VALUES
-                    ('check_interval', '3600', 'Interval between checks in seconds', 'system'),
-                    ('scraper_enabled', 'true', 'Enable/disable automatic scraping', 'system'),
-                    ('last_check_time', '0', 'Unix timestamp of last check', 'system')
-                ON CONFLICT (setting_key) DO NOTHING;
-            """)
+                # Insert default settings
+                cursor.execute("""
+                    INSERT INTO bot_settings (setting_key, setting_value, description, updated_by)
+                    VALUES
+                        ('check_interval', '3600', 'Interval between checks in seconds', 'system'),
+                        ('scraper_enabled', 'true', 'Enable/disable automatic scraping', 'system'),
+                        ('last_check_time', '0', 'Unix timestamp of last check', 'system')
+                    ON CONFLICT (setting_key) DO NOTHING;
+                """)
 
-            connection.commit()
-            logger.info("Bot settings table created successfully")
+                connection.commit()
+                logger.info("Bot settings table created successfully")
 
         except Exception as e:
             logger.error(f"Error creating settings table: {e}")
-            if connection:
-                connection.rollback()
             raise
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
 
     def get_setting(self, key, default=None):
         """Get setting value by key"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-
-            cursor.execute(
-                "SELECT setting_value FROM bot_settings WHERE setting_key = %s",
-                (key,)
-            )
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT setting_value FROM bot_settings WHERE setting_key = %s",
+                    (key,)
+                )
 
-            result = cursor.fetchone()
-            return result[0] if result else default
+                result = cursor.fetchone()
+                return result[0] if result else default
 
         except Exception as e:
             logger.error(f"Error getting setting {key}: {e}")
             return default
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
 
     def set_setting(self, key, value, updated_by='bot'):
         """Update setting value"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO bot_settings (setting_key, setting_value, updated_by)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (setting_key)
+                    DO UPDATE SET
+                        setting_value = EXCLUDED.setting_value,
+                        updated_by = EXCLUDED.updated_by,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (key, value, updated_by))
+                # Delivered to listening SettingsCaches on commit
+                cursor.execute("SELECT pg_notify(%s, %s)", (SETTINGS_CHANNEL, key))
 
-            cursor.execute("""
-                INSERT INTO bot_settings (setting_key, setting_value, updated_by)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (setting_key)
-                DO UPDATE SET
-                    setting_value = EXCLUDED.setting_value,
-                    updated_by = EXCLUDED.updated_by,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (key, value, updated_by))
-
-            connection.commit()
-            logger.info(f"Setting updated: {key} = {value}")
-            return True
+                connection.commit()
+                logger.info(f"Setting updated: {key} = {value}")
+                return True
 
         except Exception as e:
             logger.error(f"Error setting {key}: {e}")
-            if connection:
-                connection.rollback()
             return False
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
+
+    def get_settings(self):
+        """
+        Load all settings at once
+
+        Returns:
+            (dict of setting key -> value, version) where version changes
+            whenever a setting is added or updated
+        """
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("SELECT setting_key, setting_value, updated_at FROM bot_settings")
+                rows = cursor.fetchall()
+                version = (len(rows), max((row[2] for row in rows if row[2]), default=None))
+                return {row[0]: row[1] for row in rows}, version
+
+        except Exception as e:
+            logger.error(f"Error loading settings: {e}")
+            raise
+
+    def get_settings_version(self):
+        """Cheap change marker of bot_settings, comparable with the version from get_settings"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*), MAX(updated_at) FROM bot_settings")
+                count, updated_at = cursor.fetchone()
+                return count, updated_at
+
+        except Exception as e:
+            logger.error(f"Error checking settings version: {e}")
+            raise
+
+    def listen(self, *channels):
+        """
+        Open a dedicated connection listening on NOTIFY channels
+
+        The connection is not taken from the pool: it stays open for the
+        lifetime of the listener. Call poll() on it and read its notifies.
+
+        Returns:
+            psycopg2 connection in autocommit mode
+        """
+        connection = psycopg2.connect(**self.connection_pool.connect_kwargs)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            for channel in channels:
+                cursor.execute(f"LISTEN {channel}")
+        return connection
+
+    def notify(self, channel, payload):
+        """Send a NOTIFY message to the listeners of a channel"""
+        try:
+            with self.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+                connection.commit()
+
+        except Exception as e:
+            logger.error(f"Error notifying {channel}: {e}")
+            raise
 
     def get_all_settings(self):
         """Get all settings"""
-        connection = None
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(cursor_factory=RealDictCursor)
-
-            cursor.execute("""
-                SELECT setting_key, setting_value, description, updated_at, updated_by
-                FROM bot_settings
-                ORDER BY setting_key
-            """)
+            with self.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT setting_key, setting_value, description, updated_at, updated_by
+                    FROM bot_settings
+                    ORDER BY setting_key
+                """)
 
-            return cursor.fetchall()
+                return cursor.fetchall()
 
         except Exception as e:
             logger.error(f"Error getting all settings: {e}")
             return []
-        finally:
-            if connection:
-                cursor.close()
-                self.return_connection(connection)
@@ -6,25 +6,32 @@ Downloads and extracts text from PDF documents
 """
 
 import os
+import hashlib
 import logging
 import tempfile
 import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Callable
 
 logger = logging.getLogger(__name__)
 
+# Nesting of Form XObjects searched for fonts when checking for a text layer
+MAX_FORM_DEPTH = 5
+
 
 class PDFProcessor:
     """Handles PDF downloading and text extraction"""
 
-    def __init__(self, session: Optional[requests.Session] = None):
+    def __init__(self, session: Optional[requests.Session] = None, ocr=None):
         """
         Initialize PDF Processor
 
         Args:
             session: Optional requests session to reuse connections
+            ocr: Optional OCRProcessor used for pages without a text layer
         """
         self.session = session or requests.Session()
+        self.ocr = ocr
+        self.ocr_min_chars = int(os.getenv('OCR_MIN_CHARS', 20))
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -168,19 +175,266 @@ class PDFProcessor:
         logger.error("All text extraction methods failed")
         return None
 
-    def process_pdf(self, url: str) -> Dict[str, Optional[str]]:
+    @staticmethod
+    def _stream_bytes(obj) -> bytes:
+        """Return raw (still encoded) bytes of a PDF stream or array of streams"""
+        if obj is None:
+            return b''
+        obj = obj.get_object()
+        if isinstance(obj, list):
+            return b''.join(PDFProcessor._stream_bytes(item) for item in obj)
+        return getattr(obj, '_data', b'') or b''
+
+    def _page_fingerprint(self, page) -> str:
+        """
+        Hash the raw content of a single page
+
+        The hash covers the page content stream and any XObjects it draws
+        (scanned pages are a single image XObject with an identical content
+        stream), so it changes whenever the rendered page changes without
+        having to run text extraction.
+
+        Args:
+            page: PyPDF2 page object
+
+        Returns:
+            SHA256 hex digest of the page content
+        """
+        digest = hashlib.sha256()
+        digest.update(self._stream_bytes(page.get('/Contents')))
+
+        resources = page.get('/Resources')
+        xobjects = resources.get_object().get('/XObject') if resources else None
+        if xobjects:
+            xobjects = xobjects.get_object()
+            for name in sorted(xobjects.keys()):
+                digest.update(name.encode())
+                digest.update(self._stream_bytes(xobjects[name]))
+
+        return digest.hexdigest()
+
+    @classmethod
+    def _has_text_layer(cls, page) -> bool:
+        """Cheap check whether a page declares any fonts (scanned pages have none)"""
+        resources = page.get('/Resources')
+        if resources is None:
+            # Resources may be inherited from the page tree, let extraction decide
+            return True
+        return cls._resources_have_fonts(resources.get_object())
+
+    @classmethod
+    def _resources_have_fonts(cls, resources, depth: int = 0) -> bool:
+        """Fonts in a resource dictionary or in the Form XObjects it draws (stamped and merged pages)"""
+        if resources.get('/Font'):
+            return True
+        xobjects = resources.get('/XObject')
+        if not xobjects or depth >= MAX_FORM_DEPTH:
+            return False
+        xobjects = xobjects.get_object()
+        for name in xobjects.keys():
+            xobject = xobjects[name].get_object()
+            if xobject.get('/Subtype') != '/Form':
+                continue
+            form_resources = xobject.get('/Resources')
+            if form_resources is not None and cls._resources_have_fonts(form_resources.get_object(), depth + 1):
+                return True
+        return False
+
+    def _scan_pages(self, pdf_path: str) -> Optional[List[Dict]]:
+        """
+        Compute per-page content hashes and text-layer flags
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            List of dicts with 'hash' and 'has_text_layer' keys, or None if failed
+        """
+        try:
+            import PyPDF2
+
+            with open(pdf_path, 'rb') as f:
+                pdf_reader = PyPDF2.PdfReader(f)
+                return [
+                    {'hash': self._page_fingerprint(page), 'has_text_layer': self._has_text_layer(page)}
+                    for page in pdf_reader.pages
+                ]
+
+        except ImportError:
+            logger.warning("PyPDF2 not installed, page hashing disabled")
+            return None
+        except Exception as e:
+            logger.error(f"Error computing page hashes: {e}")
+            return None
+
+    def compute_page_hashes(self, pdf_path: str) -> Optional[List[str]]:
+        """
+        Compute per-page content hashes
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            List of page hashes in page order, or None if failed
+        """
+        scanned = self._scan_pages(pdf_path)
+        return [page['hash'] for page in scanned] if scanned is not None else None
+
+    def _extract_page_texts(self, pdf_path: str, page_numbers: List[int]) -> Dict[int, str]:
+        """
+        Extract text for selected pages only
+
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: Zero-based page indexes to extract
+
+        Returns:
+            Dictionary mapping page index to extracted text
+        """
+        texts = {}
+        if not page_numbers:
+            return texts
+
+        try:
+            import pdfplumber
+
+            with pdfplumber.open(pdf_path) as pdf:
+                for page_num in page_numbers:
+                    texts[page_num] = pdf.pages[page_num].extract_text() or ''
+            return texts
+
+        except ImportError:
+            logger.warning("pdfplumber not installed, trying PyPDF2 for page text")
+        except Exception as e:
+            logger.error(f"Error extracting page text with pdfplumber: {e}")
+
+        try:
+            import PyPDF2
+
+            with open(pdf_path, 'rb') as f:
+                pdf_reader = PyPDF2.PdfReader(f)
+                for page_num in page_numbers:
+                    texts[page_num] = pdf_reader.pages[page_num].extract_text() or ''
+
+        except Exception as e:
+            logger.error(f"Error extracting page text with PyPDF2: {e}")
+
+        return texts
+
+    def extract_pages(self, pdf_path: str,
+                      text_lookup: Optional[Callable[[List[str]], Dict[str, str]]] = None
+                      ) -> Optional[List[Dict]]:
+        """
+        Extract text page by page, reusing text of already known pages
+
+        Pages whose hash is returned by text_lookup are not extracted again,
+        so a republished document only pays for the pages that changed.
+        Pages without a usable text layer are sent to OCR when available.
+
+        Args:
+            pdf_path: Path to PDF file
+            text_lookup: Optional callable mapping a list of page hashes to
+                {page_hash: previously extracted text}
+
+        Returns:
+            List of dicts with 'page_number', 'hash', 'text', 'reused' and
+            'ocr' keys, or None if the PDF could not be hashed
+        """
+        scanned = self._scan_pages(pdf_path)
+        if scanned is None:
+            return None
+
+        page_hashes = [page['hash'] for page in scanned]
+        known_texts = text_lookup(page_hashes) if text_lookup else {}
+        to_extract = [i for i, page_hash in enumerate(page_hashes) if page_hash not in known_texts]
+        extracted = self._extract_page_texts(
+            pdf_path, [i for i in to_extract if scanned[i]['has_text_layer']]
+        )
+
+        pages = []
+        for i, page_hash in enumerate(page_hashes):
+            reused = page_hash in known_texts
+            pages.append({
+                'page_number': i + 1,
+                'hash': page_hash,
+                'text': known_texts[page_hash] if reused else extracted.get(i, ''),
+                'reused': reused,
+                'ocr': False
+            })
+
+        # OCR fallback for new pages with no (or an empty) text layer
+        if self.ocr is not None:
+            needs_ocr = [
+                pages[i] for i in to_extract
+                if len(pages[i]['text'].strip()) < self.ocr_min_chars
+            ]
+            if needs_ocr:
+                for page_number, text in self.ocr.ocr_pages(pdf_path, needs_ocr).items():
+                    page = pages[page_number - 1]
+                    if len(text) > len(page['text'].strip()):
+                        page['text'] = text
+                        page['ocr'] = True
+
+        logger.info(
+            f"Extracted {len(to_extract)}/{len(page_hashes)} pages "
+            f"({len(page_hashes) - len(to_extract)} reused from previous versions, "
+            f"{sum(1 for page in pages if page['ocr'])} via OCR)"
+        )
+        return pages
+
+    @staticmethod
+    def build_change_map(previous_hashes: Optional[List[str]], current_hashes: List[str]) -> Dict:
+        """
+        Compare page hashes of two versions of a document
+
+        Args:
+            previous_hashes: Page hashes of the previous version (None if unknown)
+            current_hashes: Page hashes of the new version
+
+        Returns:
+            Dictionary with per-page 'pages' statuses (unchanged, moved,
+            changed, added), the list of 'changed_pages' numbers and the
+            number of 'removed_pages'
+        """
+        previous_hashes = previous_hashes or []
+        previous_set = set(previous_hashes)
+
+        pages = []
+        for i, page_hash in enumerate(current_hashes):
+            if i < len(previous_hashes) and previous_hashes[i] == page_hash:
+                status = 'unchanged'
+            elif page_hash in previous_set:
+                status = 'moved'
+            elif i < len(previous_hashes):
+                status = 'changed'
+            else:
+                status = 'added'
+            pages.append({'page_number': i + 1, 'status': status})
+
+        current_set = set(current_hashes)
+        return {
+            'pages': pages,
+            'changed_pages': [p['page_number'] for p in pages if p['status'] in ('changed', 'added')],
+            'removed_pages': sum(1 for h in previous_hashes if h not in current_set)
+        }
+
+    def process_pdf(self, url: str,
+                    text_lookup: Optional[Callable[[List[str]], Dict[str, str]]] = None) -> Dict:
         """
         Download PDF and extract text in one call
 
         Args:
             url: PDF document URL
+            text_lookup: Optional callable returning previously extracted text
+                for page hashes; matching pages are reused instead of extracted
 
         Returns:
-            Dictionary with 'text' and 'pdf_path' keys
+            Dictionary with 'text', 'pdf_path' and 'pages' keys
         """
         result = {
             'text': None,
-            'pdf_path': None
+            'pdf_path': None,
+            'pages': None
         }
 
         try:
@@ -191,7 +445,16 @@ class PDFProcessor:
 
             result['pdf_path'] = pdf_path
 
-            # Extract text
+            # Extract text page by page so unchanged pages can be reused
+            pages = self.extract_pages(pdf_path, text_lookup)
+            if pages is not None:
+                result['pages'] = pages
+                text = '\n\n'.join(page['text'] for page in pages if page['text'])
+                if text.strip():
+                    result['text'] = text
+                    return result
+
+            # Fall back to whole-document extraction
             text = self.extract_text(pdf_path)
             result['text'] = text
 
@@ -201,6 +464,11 @@ class PDFProcessor:
             logger.error(f"Error processing PDF {url}: {e}")
             return result
 
+    def close(self):
+        """Release OCR worker processes"""
+        if self.ocr is not None:
+            self.ocr.shutdown()
+
     def cleanup_temp_file(self, file_path: str):
         """
         Remove temporary PDF file
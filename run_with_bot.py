@@ -6,7 +6,6 @@ Starts both the continuous scraper and bot command handler
 
 import os
 import sys
-import time
 import logging
 import threading
 import asyncio
@@ -27,57 +26,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_scraper():
+def run_scraper(service):
     """Run continuous scraper in a separate thread"""
-    from main import FIADocumentService
-
     logger.info("Starting scraper thread...")
-    service = FIADocumentService()
 
+    # /check from the bot thread wakes the loop at once through the shared CheckTrigger.
+    # The bot keeps using the service's database: it is closed at process shutdown.
     try:
-        service.initialize()
-        initial_interval = service.get_check_interval()
-        logger.info(f"Scraper initialized with interval: {initial_interval} seconds")
-
-        while True:
-            try:
-                current_interval = service.get_check_interval()
-
-                if not service.is_scraper_enabled():
-                    logger.info("Scraping disabled, waiting...")
-                    time.sleep(30)
-                    continue
-
-                # Process documents
-                new_docs = service.process_documents()
-                service.update_last_check_time()
-
-                if new_docs > 0:
-                    logger.info(f"Added {new_docs} new document(s)")
-
-                # Sleep with force check monitoring
-                sleep_time = 0
-                while sleep_time < current_interval:
-                    time.sleep(10)
-                    sleep_time += 10
-
-                    if service.check_force_flag():
-                        logger.info("Force check triggered, running immediately!")
-                        break
-
-            except Exception as e:
-                logger.error(f"Error in scraper thread: {e}")
-                time.sleep(60)
-
+        service.run_continuous(close_on_exit=False)
     except Exception as e:
         logger.error(f"Fatal error in scraper thread: {e}")
-    finally:
-        service.db.close_all_connections()
 
 
-def run_bot():
+def run_bot(service):
     """Run Telegram bot"""
-    from old_database import Database
     from bot_commands import setup_bot_handlers
 
     logger.info("Starting Telegram bot...")
@@ -90,7 +52,8 @@ def run_bot():
         logger.error("Missing Telegram credentials!")
         return
 
-    db = Database()
+    # The scraper's service: the Summarize button uses its summary worker, circuit breaker and budget
+    db = service.db
 
     # Create application
     application = Application.builder().token(bot_token).build()
@@ -98,12 +61,12 @@ def run_bot():
     # Setup handlers synchronously with admin chat ID
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
-    loop.run_until_complete(setup_bot_handlers(application, db, admin_chat_id))
+    loop.run_until_complete(setup_bot_handlers(application, db, admin_chat_id, service.summary_worker))
 
     logger.info("Bot handlers registered, starting polling...")
 
     # Run polling (this is blocking and manages its own event loop)
-    application.run_polling(drop_pending_updates=True, allowed_updates=['message'])
+    application.run_polling(drop_pending_updates=True, allowed_updates=['message', 'callback_query'])
 
 
 def main():
@@ -112,19 +75,31 @@ def main():
     logger.info("Starting FIA Scraper with Bot Control")
     logger.info("="*60)
 
+    from main import FIADocumentService
+
+    # One service for both threads, so they share the summarizer, its circuit
+    # breaker and the usage budget
+    try:
+        service = FIADocumentService()
+    except Exception as e:
+        logger.error(f"Error initializing service: {e}")
+        sys.exit(1)
+
     # Start scraper in a background thread
-    scraper_thread = threading.Thread(target=run_scraper, daemon=True)
+    scraper_thread = threading.Thread(target=run_scraper, args=(service,), daemon=True)
     scraper_thread.start()
     logger.info("Scraper thread started")
 
     # Run bot in main thread (blocking)
     try:
-        run_bot()
+        run_bot(service)
     except KeyboardInterrupt:
         logger.info("Shutting down...")
     except Exception as e:
         logger.error(f"Error running bot: {e}")
         sys.exit(1)
+    finally:
+        service.close()
 
 
 if __name__ == '__main__':
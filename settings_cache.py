@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Settings Cache Module
+
+In-memory copy of bot_settings. Reads are served without touching the
+database; the copy is reloaded when a change notification arrives
+(set_setting sends NOTIFY) or, as a fallback, when the cheap version
+check finds that a setting changed.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Optional, Any
+
+from old_database import SETTINGS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = ('true', '1', 'yes', 'on')
+
+
+class SettingsCache:
+    """Typed, zero-round-trip reads of bot_settings with notification and version based refresh"""
+
+    def __init__(self, db, version_interval: Optional[int] = None, listen: Optional[bool] = None):
+        """
+        Initialize Settings Cache
+
+        Args:
+            db: Database providing get_settings/get_settings_version/set_setting/listen
+            version_interval: Seconds between version checks (SETTINGS_VERSION_INTERVAL);
+                with a working listener they only catch changes made without NOTIFY
+            listen: Subscribe to change notifications (SETTINGS_LISTEN, default true)
+        """
+        self.db = db
+        self.version_interval = version_interval or int(os.getenv('SETTINGS_VERSION_INTERVAL', 300))
+        self.listen = (listen if listen is not None
+                       else os.getenv('SETTINGS_LISTEN', 'true').lower() in TRUE_VALUES)
+
+        self.values = {}
+        self.version = None
+        self.loaded = False
+        self.last_version_check = 0
+        self.listener = None
+        self.last_listen_attempt = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+
+    def _connect_listener(self):
+        if not self.listen or time.time() - self.last_listen_attempt < self.version_interval:
+            return
+        self.last_listen_attempt = time.time()
+        try:
+            self.listener = self.db.listen(SETTINGS_CHANNEL)
+            logger.info("Listening for settings changes")
+        except Exception as e:
+            logger.warning(f"Could not listen for settings changes, checking versions only: {e}")
+            self.listener = None
+
+    def _notified(self) -> bool:
+        """Drain pending notifications (no round trip: only reads what the server already sent)"""
+        if self.listener is None:
+            self._connect_listener()
+            # A fresh listener may have missed changes: reload once
+            return self.listener is not None
+        try:
+            self.listener.poll()
+        except Exception as e:
+            logger.warning(f"Settings listener lost: {e}")
+            try:
+                self.listener.close()
+            except Exception:
+                pass
+            self.listener = None
+            return True
+        if not self.listener.notifies:
+            return False
+        del self.listener.notifies[:]
+        return True
+
+    def _load(self):
+        self.values, self.version = self.db.get_settings()
+        self.loaded = True
+        self.last_version_check = time.time()
+        self.reloads += 1
+
+    def refresh(self, force: bool = False):
+        """
+        Reload the settings if they changed
+
+        Args:
+            force: Reload without checking for changes
+        """
+        with self._lock:
+            try:
+                notified = self._notified()
+                if force or notified or not self.loaded:
+                    self._load()
+                elif time.time() - self.last_version_check >= self.version_interval:
+                    self.last_version_check = time.time()
+                    if self.db.get_settings_version() != self.version:
+                        self._load()
+            except Exception as e:
+                # Keep serving the last known values
+                logger.warning(f"Could not refresh settings: {e}")
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Setting as stored (a string), or default"""
+        self.refresh()
+        return self.values.get(key, default)
+
+    def get_int(self, key: str, default: int) -> int:
+        """Setting as an integer, default if missing or not a number"""
+        value = self.get(key)
+        try:
+            return int(value) if value is not None else default
+        except ValueError:
+            logger.warning(f"Setting {key} is not an integer: {value!r}")
+            return default
+
+    def get_bool(self, key: str, default: bool) -> bool:
+        """Setting as a boolean ('true', '1', 'yes', 'on' are true)"""
+        value = self.get(key)
+        return value.lower() in TRUE_VALUES if value is not None else default
+
+    def get_json(self, key: str, default: Any = None) -> Any:
+        """Setting parsed as JSON, default if missing or malformed"""
+        value = self.get(key)
+        try:
+            return json.loads(value) if value is not None else default
+        except ValueError:
+            logger.warning(f"Setting {key} is not valid JSON")
+            return default
+
+    def set(self, key: str, value, updated_by: str = 'system') -> bool:
+        """
+        Store a setting and update the cached copy
+
+        Args:
+            key: Setting key
+            value: New value (stored as a string)
+            updated_by: Recorded in updated_by
+
+        Returns:
+            True if stored
+        """
+        value = str(value)
+        stored = self.db.set_setting(key, value, updated_by)
+        if stored:
+            with self._lock:
+                self.values[key] = value
+        return stored
+
+    def close(self):
+        """Close the listener connection"""
+        with self._lock:
+            if self.listener is not None:
+                try:
+                    self.listener.close()
+                except Exception:
+                    pass
+                self.listener = None
@@ -8,23 +8,30 @@
 \c fia_documents;
 
 -- Create documents table
+-- Partitioned by season: unique keys must contain the partition key
 CREATE TABLE IF NOT EXISTS fia_documents (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     document_name VARCHAR(500) NOT NULL,
-    document_url VARCHAR(1000) NOT NULL UNIQUE,
-    document_hash VARCHAR(64) NOT NULL,
+    document_url VARCHAR(1000) NOT NULL,
+    document_hash VARCHAR(80) NOT NULL,
     file_size BIGINT,
     document_type VARCHAR(50),
-    season VARCHAR(20),
+    season VARCHAR(20) NOT NULL DEFAULT '',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duplicate_of INTEGER,  -- First document with the same content, NULL for the first one
+    PRIMARY KEY (id, season),
+    UNIQUE (document_url, season)
+) PARTITION BY LIST (season);
+
+-- Documents of seasons without their own partition
+CREATE TABLE IF NOT EXISTS fia_documents_default PARTITION OF fia_documents DEFAULT;
 
--- Create indexes for faster lookups
-CREATE INDEX IF NOT EXISTS idx_document_url ON fia_documents(document_url);
+-- Create indexes for faster lookups (created on every partition)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_document_hash_unique ON fia_documents(document_hash, season)
+    WHERE duplicate_of IS NULL;
 CREATE INDEX IF NOT EXISTS idx_document_hash ON fia_documents(document_hash);
-CREATE INDEX IF NOT EXISTS idx_created_at ON fia_documents(created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_season ON fia_documents(season);
+CREATE INDEX IF NOT EXISTS idx_created_at_id ON fia_documents(created_at DESC, id DESC);
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -41,6 +48,94 @@ CREATE TRIGGER update_fia_documents_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Create document counters for /status and /stats, maintained by trigger
+CREATE TABLE IF NOT EXISTS document_stats (
+    season VARCHAR(20) NOT NULL,
+    document_type VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    documents INTEGER NOT NULL DEFAULT 0,
+    total_size BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (season, document_type, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_document_stats_day ON document_stats(day);
+
+CREATE OR REPLACE FUNCTION update_document_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE document_stats
+        SET documents = documents - 1,
+            total_size = total_size - COALESCE(OLD.file_size, 0)
+        WHERE season = COALESCE(OLD.season, '')
+          AND document_type = COALESCE(OLD.document_type, '')
+          AND day = COALESCE(OLD.created_at::date, CURRENT_DATE);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO document_stats (season, document_type, day, documents, total_size)
+        VALUES (COALESCE(NEW.season, ''), COALESCE(NEW.document_type, ''),
+                COALESCE(NEW.created_at::date, CURRENT_DATE), 1, COALESCE(NEW.file_size, 0))
+        ON CONFLICT (season, document_type, day) DO UPDATE
+        SET documents = document_stats.documents + 1,
+            total_size = document_stats.total_size + EXCLUDED.total_size;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_document_stats ON fia_documents;
+CREATE TRIGGER update_document_stats
+    AFTER INSERT OR DELETE OR UPDATE OF season, document_type, file_size, created_at ON fia_documents
+    FOR EACH ROW
+    EXECUTE FUNCTION update_document_stats();
+
+-- Creates the partition of a season, moving its rows out of the default partition;
+-- false if it already exists. The application calls it for the current and next season.
+CREATE OR REPLACE FUNCTION create_season_partition(p_season TEXT)
+RETURNS BOOLEAN AS $$
+DECLARE
+    partition_name TEXT := 'fia_documents_' || regexp_replace(lower(p_season), '[^a-z0-9]+', '_', 'g');
+    moved INTEGER;
+BEGIN
+    -- Scraper and bot may start at the same time
+    PERFORM pg_advisory_xact_lock(hashtext('create_season_partition'));
+
+    IF EXISTS (
+        SELECT 1 FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'fia_documents'::regclass
+          AND c.relname = partition_name
+    ) THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE fia_documents INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM fia_documents_default WHERE season = %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved', p_season, partition_name);
+    GET DIAGNOSTICS moved = ROW_COUNT;
+    EXECUTE format('ALTER TABLE fia_documents ATTACH PARTITION %I FOR VALUES IN (%L)',
+                   partition_name, p_season);
+
+    -- The DELETE above took the moved rows out of document_stats: count them again
+    IF moved > 0 THEN
+        EXECUTE format(
+            'INSERT INTO document_stats (season, document_type, day, documents, total_size) '
+            'SELECT season, COALESCE(document_type, ''''), COALESCE(created_at::date, CURRENT_DATE), '
+            '       COUNT(*), COALESCE(SUM(file_size), 0) '
+            'FROM %I GROUP BY 1, 2, 3 '
+            'ON CONFLICT (season, document_type, day) DO UPDATE '
+            'SET documents = document_stats.documents + EXCLUDED.documents, '
+            '    total_size = document_stats.total_size + EXCLUDED.total_size', partition_name);
+    END IF;
+
+    RETURN TRUE;
+END;
+$$ language 'plpgsql';
+
+SELECT create_season_partition(EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER::TEXT);
+SELECT create_season_partition((EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1)::TEXT);
+
 -- Grant permissions (adjust username as needed)
 -- GRANT ALL PRIVILEGES ON TABLE fia_documents TO your_username;
 -- GRANT USAGE, SELECT ON SEQUENCE fia_documents_id_seq TO your_username;
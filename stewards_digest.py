@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Stewards Digest Module
+
+Groups the burst of stewards' decisions and summons that follows a session
+and summarizes each group in one call, posted as a single digest
+"""
+
+import os
+import re
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List
+from urllib.parse import unquote
+
+from batch_summarizer import fetch_document_text
+
+logger = logging.getLogger(__name__)
+
+# Documents issued by the stewards during and after a session
+STEWARDS_RE = re.compile(
+    r'\b(decisions?|summons|offence|infringement|penalt\w*|reprimand|investigation|'
+    r'right of review|disqualifi\w*)\b',
+    re.IGNORECASE
+)
+
+# "2025 Abu Dhabi Grand Prix - Decision - Car 4 - ...pdf" -> "2025 Abu Dhabi Grand Prix"
+EVENT_RE = re.compile(r'^(.*?\b(grand prix|gp|testing|test)\b)', re.IGNORECASE)
+
+# Digest modes
+MODE_OFF = 'off'
+MODE_DIGEST = 'digest'  # Digest in addition to the individual posts
+MODE_ONLY = 'only'      # Digest instead of individual posts of stewards' documents
+
+
+def is_stewards_document(document_name: str) -> bool:
+    """True for decisions, summons, offences and other stewards' documents"""
+    return bool(STEWARDS_RE.search(document_name or ''))
+
+
+def event_name(document_url: str, default: str = '') -> str:
+    """Event a document belongs to, read from the PDF file name"""
+    file_name = unquote((document_url or '').rsplit('/', 1)[-1])
+    file_name = re.sub(r'\.pdf$', '', file_name, flags=re.IGNORECASE).replace('_', ' ')
+    match = EVENT_RE.match(file_name)
+    return ' '.join(match.group(1).split()) if match else default
+
+
+class StewardsDigest:
+    """Collects stewards' documents per event and time window and posts one digest per group"""
+
+    def __init__(self, db, summarizer, telegram=None, pdf_processor=None, mode: Optional[str] = None,
+                 gap_minutes: Optional[int] = None, min_documents: Optional[int] = None,
+                 lookback_hours: Optional[int] = None, max_delay_minutes: Optional[int] = None):
+        """
+        Initialize Stewards Digest
+
+        Args:
+            db: Database
+            summarizer: ClaudeSummarizer making the digest call
+            telegram: Optional TelegramNotifier posting the digest
+            pdf_processor: Optional PDFProcessor for documents without stored page text
+            mode: 'off', 'digest' (in addition to individual posts) or
+                'only' (instead of them) (DIGEST_MODE)
+            gap_minutes: A group ends after this long without a new stewards'
+                document of the event (DIGEST_GAP_MINUTES)
+            min_documents: Smallest group digested in 'digest' mode (DIGEST_MIN_DOCUMENTS)
+            lookback_hours: Only documents this recent are grouped (DIGEST_LOOKBACK_HOURS)
+            max_delay_minutes: While the API is unavailable a digest waits this long
+                after its group closed before the document list is posted without a
+                summary (DIGEST_MAX_DELAY_MINUTES)
+        """
+        self.db = db
+        self.summarizer = summarizer
+        self.telegram = telegram
+        self.pdf_processor = pdf_processor
+        self.mode = (mode or os.getenv('DIGEST_MODE', MODE_OFF)).lower()
+        self.gap = timedelta(minutes=gap_minutes or int(os.getenv('DIGEST_GAP_MINUTES', 20)))
+        self.min_documents = min_documents or int(os.getenv('DIGEST_MIN_DOCUMENTS', 3))
+        self.lookback = timedelta(hours=lookback_hours or int(os.getenv('DIGEST_LOOKBACK_HOURS', 6)))
+        self.max_delay = timedelta(minutes=max_delay_minutes or int(os.getenv('DIGEST_MAX_DELAY_MINUTES', 60)))
+        self.max_document_chars = int(os.getenv('DIGEST_DOCUMENT_CHARS', 3000))
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in (MODE_DIGEST, MODE_ONLY)
+
+    def replaces_post(self, document_name: str) -> bool:
+        """True if a new document is covered by a digest instead of its own post and summary"""
+        return self.mode == MODE_ONLY and is_stewards_document(document_name)
+
+    def _groups(self, documents: List[Dict]) -> List[Dict]:
+        """Stewards' documents split per event and gap, open and closed groups alike"""
+        by_event = {}
+        for document in sorted(documents, key=lambda d: d['created_at']):
+            if not is_stewards_document(document['document_name']):
+                continue
+            event = event_name(document['document_url'], f"Сезон {document.get('season') or ''}".strip())
+            groups = by_event.setdefault(event, [])
+            if groups and document['created_at'] - groups[-1][-1]['created_at'] <= self.gap:
+                groups[-1].append(document)
+            else:
+                groups.append([document])
+
+        return [{'event': event, 'documents': group} for event, groups in by_event.items() for group in groups]
+
+    def group_documents(self, documents: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Split stewards' documents into closed groups per event
+
+        Documents of one event belong to the same group while less than
+        the gap passes between them; a group is closed once the gap has
+        passed since its last document.
+
+        Args:
+            documents: Undigested documents with 'document_name', 'document_url', 'season' and 'created_at'
+            now: Current time
+
+        Returns:
+            List of dicts with 'event' and 'documents', oldest group first
+        """
+        now = now or datetime.now()
+        closed = [g for g in self._groups(documents) if now - g['documents'][-1]['created_at'] >= self.gap]
+        return sorted(closed, key=lambda g: g['documents'][0]['created_at'])
+
+    @property
+    def min_group_size(self) -> int:
+        """Smallest group that gets a digest"""
+        return 1 if self.mode == MODE_ONLY else self.min_documents
+
+    def seconds_until_close(self, documents: List[Dict], now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Time until the next open group big enough for a digest closes
+
+        Args:
+            documents: Undigested documents as for group_documents
+            now: Current time
+
+        Returns:
+            Seconds (0 if one is due already), or None without such a group
+        """
+        now = now or datetime.now()
+        closing = [
+            (group['documents'][-1]['created_at'] + self.gap - now).total_seconds()
+            for group in self._groups(documents)
+            if len(group['documents']) >= self.min_group_size
+            and now - group['documents'][-1]['created_at'] < self.gap
+        ]
+        return max(min(closing), 0.0) if closing else None
+
+    def next_run_in(self, now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Seconds until run_once() has a burst to digest, so the caller can wake
+        up for it instead of waiting for the next scrape cycle
+
+        Returns:
+            Seconds, or None while no group is open (or digests are off)
+        """
+        if not self.enabled:
+            return None
+        now = now or datetime.now()
+        return self.seconds_until_close(self.db.get_undigested_documents(now - self.lookback), now)
+
+    def _entries(self, documents: List[Dict]) -> List[tuple]:
+        """(name, text) per document: its summary if it has one, otherwise the start of its text"""
+        texts = self.db.get_texts_for_documents([d['id'] for d in documents])
+        entries = []
+        for document in documents:
+            if document.get('summary') and document.get('summary_source') != 'extractive':
+                entries.append((document['document_name'], document['summary']))
+                continue
+            try:
+                text = fetch_document_text(self.db, self.pdf_processor, {
+                    'id': document['id'], 'document_url': document['document_url'], 'text': texts.get(document['id'])
+                })
+            except Exception as e:
+                logger.warning(f"Could not extract {document['document_name']} for the digest: {e}")
+                text = None
+            entries.append((document['document_name'], (text or '')[:self.max_document_chars]))
+        return entries
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Digest every closed group
+
+        Returns:
+            Number of digests posted
+        """
+        if not self.enabled:
+            return 0
+
+        now = now or datetime.now()
+        documents = self.db.get_undigested_documents(now - self.lookback)
+        groups = [g for g in self.group_documents(documents, now) if len(g['documents']) >= self.min_group_size]
+
+        posted = 0
+        for group in groups:
+            event, members = group['event'], group['documents']
+            result = self.summarizer.summarize_digest(event, self._entries(members))
+            if result is None:
+                if now - members[-1]['created_at'] < self.gap + self.max_delay:
+                    logger.info(f"Digest of {event} postponed: summary not available")
+                    continue
+                logger.warning(f"Digest call failed for {event}, posting the document list only")
+                result = {'summary': None, 'summaries': {}, 'source': None}
+
+            self.db.save_digest(event, [d['id'] for d in members], result)
+            logger.info(f"Stewards digest for {event}: {len(members)} documents in one call")
+
+            if self.telegram is not None:
+                self.telegram.post_digest(event, members, result['summaries'])
+            posted += 1
+
+        return posted
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Summary Cache Module
+
+Persistent cache of generated summaries keyed by content, prompt version and model
+"""
+
+import hashlib
+import logging
+from typing import Optional, Dict
+
+from text_compactor import TextCompactor
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """Looks up and stores summaries by (normalized-text hash, prompt version, model)"""
+
+    def __init__(self, db):
+        """
+        Initialize Summary Cache
+
+        Args:
+            db: Database object providing get_cached_summary/save_cached_summary
+        """
+        self.db = db
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def text_hash(document_text: str) -> str:
+        """
+        Hash of the normalized document text
+
+        Whitespace and hyphenation differences between two extractions of the
+        same content do not change the key.
+        """
+        normalized = TextCompactor.normalize(document_text)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def get(self, document_text: str, prompt_version: str, model: str) -> Optional[str]:
+        """
+        Get a cached summary
+
+        Args:
+            document_text: Document text as passed to the summarizer
+            prompt_version: Version of the prompt template
+            model: Model name
+
+        Returns:
+            Cached summary or None
+        """
+        try:
+            summary = self.db.get_cached_summary(self.text_hash(document_text), prompt_version, model)
+        except Exception as e:
+            logger.warning(f"Summary cache lookup failed: {e}")
+            summary = None
+
+        if summary:
+            self.hits += 1
+            logger.info(f"Summary cache hit (hit rate {self.hit_rate():.0%})")
+        else:
+            self.misses += 1
+        return summary
+
+    def put(self, document_text: str, prompt_version: str, model: str, summary: str):
+        """
+        Store a generated summary
+
+        Args:
+            document_text: Document text as passed to the summarizer
+            prompt_version: Version of the prompt template
+            model: Model name
+            summary: Generated summary
+        """
+        try:
+            self.db.save_cached_summary(self.text_hash(document_text), prompt_version, model, summary)
+        except Exception as e:
+            logger.warning(f"Could not store summary in cache: {e}")
+
+    def hit_rate(self) -> float:
+        """Share of lookups served from the cache in this process"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict:
+        """In-process cache statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate()
+        }
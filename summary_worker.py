@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Summary Worker Module
+
+Drains the summary_jobs queue. Any number of workers, in this or in
+separate processes, can run against the same database: jobs are claimed
+with FOR UPDATE SKIP LOCKED and retried with exponential backoff.
+"""
+
+import os
+import socket
+import random
+import time
+import logging
+from typing import Optional, Dict
+
+from batch_summarizer import fetch_document_text
+from claude_summarizer import language_summary_rows
+from usage_tracker import MODE_LOCAL
+
+logger = logging.getLogger(__name__)
+
+# Priorities of queued jobs: fresh documents before retries of old ones
+PRIORITY_NEW = 10
+PRIORITY_BACKFILL = -10
+
+
+class SummaryJobWorker:
+    """Claims summarization jobs, generates summaries and edits the channel posts"""
+
+    def __init__(self, db, summary_service, pdf_processor=None, telegram=None,
+                 worker_id: Optional[str] = None, batch_size: Optional[int] = None,
+                 max_attempts: Optional[int] = None, backoff_base: Optional[int] = None,
+                 backoff_max: Optional[int] = None, lease_seconds: Optional[int] = None):
+        """
+        Initialize Summary Worker
+
+        Args:
+            db: Database holding the summary_jobs queue
+            summary_service: AsyncSummarizationService used to summarize claimed jobs concurrently
+            pdf_processor: Optional PDFProcessor for documents without stored page text
+            telegram: Optional TelegramNotifier to edit posted messages
+            worker_id: Name recorded in locked_by (default host-pid)
+            batch_size: Jobs claimed per round (SUMMARY_JOB_BATCH)
+            max_attempts: Attempts before a job is marked failed (SUMMARY_JOB_MAX_ATTEMPTS)
+            backoff_base: First retry delay in seconds, doubled per attempt (SUMMARY_JOB_BACKOFF)
+            backoff_max: Maximum retry delay in seconds (SUMMARY_JOB_BACKOFF_MAX)
+            lease_seconds: Running jobs older than this are reclaimed (SUMMARY_JOB_LEASE)
+        """
+        self.db = db
+        self.summary_service = summary_service
+        self.pdf_processor = pdf_processor
+        self.telegram = telegram
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or int(os.getenv('SUMMARY_JOB_BATCH', 10))
+        self.max_attempts = max_attempts or int(os.getenv('SUMMARY_JOB_MAX_ATTEMPTS', 6))
+        self.backoff_base = backoff_base or int(os.getenv('SUMMARY_JOB_BACKOFF', 60))
+        self.backoff_max = backoff_max or int(os.getenv('SUMMARY_JOB_BACKOFF_MAX', 6 * 3600))
+        self.lease_seconds = lease_seconds or int(os.getenv('SUMMARY_JOB_LEASE', 900))
+        self.last_claimed = set()  # Document ids of the jobs claimed by the last round
+
+    def retry_delay(self, attempts: int) -> Optional[float]:
+        """
+        Delay before the next attempt
+
+        Args:
+            attempts: Attempts made so far
+
+        Returns:
+            Seconds to wait (with jitter), or None once max_attempts is reached
+        """
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _fail(self, job: Dict, error: str):
+        if not self.summary_service.is_available():
+            # API circuit open: not the document's fault, the attempt is not counted
+            retry_in = max(self.summary_service.retry_in(), self.backoff_base)
+            self.db.fail_summary_job(job['id'], error, retry_in, count_attempt=False)
+            logger.info(f"Summary job for document ID {job['document_id']} deferred "
+                        f"{retry_in:.0f}s while the API circuit is open")
+            return
+
+        retry_in = self.retry_delay(job['attempts'])
+        self.db.fail_summary_job(job['id'], error, retry_in)
+        if retry_in is None:
+            logger.error(f"Summary job for document ID {job['document_id']} failed "
+                         f"after {job['attempts']} attempts: {error}")
+            # No summary is coming: drop the pending marker from the posts
+            messages = self.db.get_language_messages([job['document_id']]) if self.telegram is not None else {}
+            self._update_post(job, None, messages.get(job['document_id']))
+        else:
+            logger.warning(f"Summary job for document ID {job['document_id']} will be retried "
+                           f"in {retry_in:.0f}s: {error}")
+
+    def run_once(self) -> Dict[int, Dict]:
+        """
+        Claim one round of due jobs and process them
+
+        Returns:
+            Dictionary mapping document id to the summarizer result of
+            every job completed in this round
+        """
+        self.last_claimed = set()
+        if not self.summary_service.can_summarize():
+            logger.debug("Summarizer not available, leaving summary jobs queued")
+            return {}
+
+        jobs = self.db.claim_summary_jobs(self.worker_id, self.batch_size, self.lease_seconds)
+        self.last_claimed = {job['document_id'] for job in jobs}
+        if not jobs:
+            return {}
+        logger.info(f"Worker {self.worker_id} claimed {len(jobs)} summary job(s)")
+
+        texts = self.db.get_texts_for_documents([job['document_id'] for job in jobs])
+        items = []
+        for job in jobs:
+            try:
+                text = fetch_document_text(self.db, self.pdf_processor, {
+                    'id': job['document_id'],
+                    'document_url': job['document_url'],
+                    'text': texts.get(job['document_id'])
+                })
+            except Exception as e:
+                self._fail(job, f"extraction failed: {e}")
+                continue
+            if not text:
+                self._fail(job, "no text extracted")
+                continue
+            items.append((job['id'], text, job['document_name']))
+
+        results = self.summary_service.summarize_batch(items) if items else {}
+
+        jobs_by_id = {job['id']: job for job in jobs}
+        completed = {}
+        stopgaps = []
+        for job_id, result in results.items():
+            job = jobs_by_id[job_id]
+            if not result:
+                self._fail(job, "summary generation failed")
+                continue
+
+            summarizer = self.summary_service.summarizer
+            if (result['source'] == 'extractive' and summarizer.api_available
+                    and summarizer.governor_mode() != MODE_LOCAL):
+                # API temporarily down: the extractive summary is shown meanwhile
+                # and the job stays queued for a model summary (once the monthly
+                # budget is used up it is final; summary-backfill redoes it later)
+                stopgaps.append(job)
+                if job.get('summary_source') == 'extractive':
+                    continue
+            completed[job_id] = result
+
+        if completed:
+            self.db.update_summaries([
+                (jobs_by_id[job_id]['document_id'], result['summary'], result['strategy'], result['source'],
+                 result['input_tokens'], result['output_tokens'])
+                for job_id, result in completed.items()
+            ], [
+                row for job_id, result in completed.items()
+                for row in language_summary_rows(jobs_by_id[job_id]['document_id'], result)
+            ])
+        finished = [job_id for job_id in completed if job_id not in {job['id'] for job in stopgaps}]
+        for job in stopgaps:
+            if not self.summary_service.is_available():
+                # Circuit open: wait for it without using up attempts
+                retry_in = max(self.summary_service.retry_in(), self.backoff_base)
+                self.db.fail_summary_job(job['id'], "extractive stopgap", retry_in, count_attempt=False)
+                continue
+            retry_in = self.retry_delay(job['attempts'])
+            if retry_in is None:
+                finished.append(job['id'])  # Out of attempts: the extractive summary stays
+            else:
+                self.db.fail_summary_job(job['id'], "extractive stopgap", retry_in)
+        self.db.complete_summary_jobs(finished)
+
+        messages = self.db.get_language_messages(
+            [jobs_by_id[job_id]['document_id'] for job_id in completed]
+        ) if self.telegram is not None and completed else {}
+        for job_id, result in completed.items():
+            job = jobs_by_id[job_id]
+            self._update_post(job, result, messages.get(job['document_id']))
+
+        failed = len(jobs) - sum(1 for result in results.values() if result)
+        logger.info(f"Summary jobs: {len(completed)} summaries written, "
+                    f"{len(stopgaps)} kept queued for a model summary, {failed} deferred or failed")
+        return {jobs_by_id[job_id]['document_id']: result for job_id, result in completed.items()}
+
+    def summarize_document(self, document_id: int) -> Optional[Dict]:
+        """
+        Summarize one document right away, e.g. when a reader asks for it
+
+        A stored summary is returned as is; otherwise the document is
+        extracted (if its pages are not stored yet), summarized and saved.
+
+        Args:
+            document_id: Document ID
+
+        Returns:
+            Post fields ('name', 'url', 'size', 'season') with 'summary',
+            'summaries' and 'summary_source', or None if no summary could be made
+        """
+        document = self.db.get_document_post(document_id)
+        if document is None:
+            return None
+        post = {
+            'name': document['document_name'],
+            'url': document['document_url'],
+            'size': document['file_size'],
+            'season': document['season'],
+        }
+
+        if document['summary']:
+            primary_language = self.summary_service.summarizer.primary_language
+            return dict(post, summary=document['summary'], summary_source=document['summary_source'],
+                        summaries=document['summaries'] or {primary_language: document['summary']})
+
+        text = fetch_document_text(self.db, self.pdf_processor, {
+            'id': document_id,
+            'document_url': document['document_url'],
+            'text': self.db.get_texts_for_documents([document_id]).get(document_id)
+        })
+        if not text:
+            logger.warning(f"No text for document ID {document_id}, cannot summarize on demand")
+            return None
+
+        result = self.summary_service.summarizer.summarize(text, document['document_name'])
+        if not result:
+            return None
+        self.db.update_summaries(
+            [(document_id, result['summary'], result['strategy'], result['source'],
+              result['input_tokens'], result['output_tokens'])],
+            language_summary_rows(document_id, result)
+        )
+        return dict(post, summary=result['summary'], summaries=result['summaries'],
+                    summary_source=result['source'])
+
+    def _update_post(self, job: Dict, result: Optional[Dict], messages: Optional[Dict] = None):
+        """Edit the channel posts of the document to include its summary in each language
+        (result None: no summary, the pending marker is removed)"""
+        if not messages and job.get('telegram_message_id'):
+            # Posted before per-language posts were recorded: primary chat only
+            messages = {self.summary_service.summarizer.primary_language: (None, job['telegram_message_id'])}
+        if self.telegram is None or not messages:
+            return
+        try:
+            self.telegram.update_document(messages, {
+                'name': job['document_name'],
+                'url': job['document_url'],
+                'size': job['file_size'],
+                'season': job['season'],
+                'summary': result['summary'] if result else None,
+                'summaries': result['summaries'] if result else {},
+                'summary_source': result['source'] if result else None
+            })
+        except Exception as e:
+            logger.error(f"Error updating Telegram notification: {e}")
+
+    def run(self, poll_interval: Optional[int] = None):
+        """
+        Process jobs until interrupted
+
+        Args:
+            poll_interval: Seconds to sleep when no job is due (SUMMARY_WORKER_POLL)
+        """
+        poll_interval = poll_interval or int(os.getenv('SUMMARY_WORKER_POLL', 30))
+        logger.info(f"Summary worker {self.worker_id} started")
+
+        while True:
+            try:
+                if not self.run_once():
+                    time.sleep(poll_interval)
+            except KeyboardInterrupt:
+                logger.info("Received interrupt signal. Stopping summary worker...")
+                break
+            except Exception as e:
+                logger.error(f"Error in summary worker: {e}")
+                time.sleep(poll_interval)
@@ -7,28 +7,73 @@ when new FIA documents are discovered.
 """
 
 import os
+import html
 import logging
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable
 import asyncio
-from telegram import Bot
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 
 logger = logging.getLogger(__name__)
 
+MAX_MESSAGE_LENGTH = 4096
+
+# Message texts per channel language; other languages use the English ones
+MESSAGE_LABELS = {
+    'ru': {
+        'title': 'Новый документ FIA', 'size': 'Размер', 'season': 'Сезон',
+        'summary': 'Краткое содержание', 'extractive': 'Ключевые фрагменты документа',
+        'pending': 'Краткое содержание готовится...', 'open': 'Открыть документ',
+        'summarize': '📝 Краткое содержание', 'unavailable': 'Краткое содержание недоступно',
+        'digest': 'Сводка стюардов', 'documents': 'Документы'
+    },
+    'en': {
+        'title': 'New FIA document', 'size': 'Size', 'season': 'Season',
+        'summary': 'Summary', 'extractive': 'Key passages',
+        'pending': 'Summary in progress...', 'open': 'Open document',
+        'summarize': '📝 Summarize', 'unavailable': 'Summary unavailable',
+        'digest': 'Stewards digest', 'documents': 'Documents'
+    },
+}
+
+
+def parse_language_chats(value: str) -> Dict[str, str]:
+    """Parse 'ru:-100123,en:@channel' into {'ru': '-100123', 'en': '@channel'}"""
+    chats = {}
+    for entry in (value or '').split(','):
+        language, _, chat_id = entry.partition(':')
+        if language.strip() and chat_id.strip():
+            chats[language.strip().lower()] = chat_id.strip()
+    return chats
+
+
+def summary_callback_data(document_id: int, language: str) -> str:
+    """callback_data of the Summarize button of a document post"""
+    return f"summarize:{document_id}:{language}"
+
 
 class TelegramNotifier:
     """Handles sending notifications to Telegram channels"""
 
-    def __init__(self, bot_token: Optional[str] = None, chat_id: Optional[str] = None):
+    def __init__(self, bot_token: Optional[str] = None, chat_id: Optional[str] = None,
+                 language_chats: Optional[Dict[str, str]] = None):
         """
         Initialize Telegram Notifier
 
         Args:
             bot_token: Telegram Bot API token
             chat_id: Telegram chat/channel ID
+            language_chats: Chat per summary language, e.g. {'ru': '-100123', 'en': '@f1_docs_en'}
+                (TELEGRAM_LANGUAGE_CHATS, default: the primary summary language in chat_id)
         """
         self.bot_token = bot_token or os.getenv('TELEGRAM_BOT_TOKEN')
         self.chat_id = chat_id or os.getenv('TELEGRAM_CHAT_ID')
+        primary_language = (os.getenv('SUMMARY_LANGUAGES', 'ru').split(',')[0].strip() or 'ru').lower()
+        self.language_chats = (language_chats or parse_language_chats(os.getenv('TELEGRAM_LANGUAGE_CHATS', ''))
+                               or {primary_language: self.chat_id})
+        # lazy: posts carry a Summarize button instead of a summary
+        self.lazy_summaries = os.getenv('SUMMARY_MODE', 'eager').lower() == 'lazy'
         self.enabled = bool(self.bot_token and self.chat_id)
         self.event_loop = None  # Persistent event loop
 
@@ -48,17 +93,25 @@ class TelegramNotifier:
             )
             self.bot = Bot(token=self.bot_token, request=request)
             logger.info(f"Telegram notifier initialized with dedicated connection pool (size=8) for chat ID: {self.chat_id}")
+            if len(self.language_chats) > 1:
+                logger.info(f"Document posts routed by language: {self.language_chats}")
 
-    def format_document_message(self, document: Dict) -> str:
+    @staticmethod
+    def format_document_message(document: Dict, summary_pending: bool = False,
+                                language: str = 'ru') -> str:
         """
         Format a document into a nice Telegram message
 
         Args:
             document: Document dictionary with name, url, size, summary, etc.
+            summary_pending: Show a placeholder while the summary is being generated
+            language: Language of the message texts
 
         Returns:
             Formatted message string
         """
+        labels = MESSAGE_LABELS.get(language, MESSAGE_LABELS['en'])
+
         # Format size if available
         size_str = ""
         if document.get('size'):
@@ -72,70 +125,137 @@ class TelegramNotifier:
 
         # Build message
         message_parts = [
-            "🏎️ <b>Новый документ FIA</b>\n",
-            f"📄 <b>{document.get('name', 'Unknown Document')}</b>\n"
+            f"🏎️ <b>{labels['title']}</b>\n",
+            f"📄 <b>{html.escape(document.get('name') or 'Unknown Document')}</b>\n"
         ]
 
         if size_str:
-            message_parts.append(f"📊 Размер: {size_str}\n")
+            message_parts.append(f"📊 {labels['size']}: {size_str}\n")
 
         if document.get('season'):
-            message_parts.append(f"🏁 Сезон: {document['season']}\n")
+            message_parts.append(f"🏁 {labels['season']}: {document['season']}\n")
 
         # Add summary if available
-        if document.get('summary'):
-            message_parts.append(f"\n📝 <b>Краткое содержание:</b>\n{document['summary']}\n")
+        if document.get('summary') and document.get('summary_source') == 'extractive':
+            message_parts.append(f"\n📝 <b>{labels['extractive']}:</b>\n{html.escape(document['summary'])}\n")
+        elif document.get('summary'):
+            message_parts.append(f"\n📝 <b>{labels['summary']}:</b>\n{html.escape(document['summary'])}\n")
+        elif summary_pending:
+            message_parts.append(f"\n⏳ <i>{labels['pending']}</i>\n")
 
-        message_parts.append(f"\n🔗 <a href=\"{document['url']}\">Открыть документ</a>")
+        message_parts.append(f"\n🔗 <a href=\"{document['url']}\">{labels['open']}</a>")
 
         return "".join(message_parts)
 
-    async def _send_message_async(self, message: str, chat_id: str = None) -> bool:
+    @staticmethod
+    def format_digest_message(event: str, documents: List[Dict], summary: Optional[str] = None,
+                              language: str = 'ru') -> str:
+        """
+        Format a stewards' digest: the consolidated summary and links to its documents
+
+        Args:
+            event: Event the documents belong to
+            documents: Digested documents with 'document_name' and 'document_url'
+            summary: Digest summary in this language, None for the document list only
+            language: Language of the message texts
+
+        Returns:
+            Formatted message string, within Telegram's message length limit
+        """
+        labels = MESSAGE_LABELS.get(language, MESSAGE_LABELS['en'])
+        header = f"⚖️ <b>{labels['digest']}: {html.escape(event)}</b>\n"
+        if summary:
+            header += f"\n{html.escape(summary[:MAX_MESSAGE_LENGTH // 2])}\n"
+        header += f"\n📄 <b>{labels['documents']} ({len(documents)}):</b>\n"
+
+        links = [
+            f"• <a href=\"{document['document_url']}\">{html.escape(document['document_name'])}</a>\n"
+            for document in documents
+        ]
+        message = header
+        for i, link in enumerate(links):
+            if len(message) + len(link) > MAX_MESSAGE_LENGTH - 20:
+                message += f"… +{len(links) - i}"
+                break
+            message += link
+        return message
+
+    @staticmethod
+    def summary_button(document_id: int, language: str = 'ru') -> InlineKeyboardMarkup:
+        """Inline keyboard asking for the summary of a document on demand"""
+        labels = MESSAGE_LABELS.get(language, MESSAGE_LABELS['en'])
+        return InlineKeyboardMarkup([[
+            InlineKeyboardButton(labels['summarize'], callback_data=summary_callback_data(document_id, language))
+        ]])
+
+    async def _send_message_async(self, message: str, chat_id: str = None,
+                                  reply_markup: Optional[InlineKeyboardMarkup] = None) -> int:
         """
         Send message asynchronously
 
         Args:
             message: Message text to send
             chat_id: Optional chat ID to send to (uses default if not specified)
+            reply_markup: Optional inline keyboard
 
         Returns:
-            True if successful, False otherwise
+            Telegram message_id of the sent message
 
         Raises:
             Exception if sending fails (for retry logic)
         """
         target_chat_id = chat_id or self.chat_id
-        await self.bot.send_message(
+        sent = await self.bot.send_message(
             chat_id=target_chat_id,
             text=message,
             parse_mode=ParseMode.HTML,
-            disable_web_page_preview=False
+            disable_web_page_preview=False,
+            reply_markup=reply_markup
         )
         logger.info(f"Message sent to Telegram chat {target_chat_id}")
-        return True
+        return sent.message_id
 
-    def send_message(self, message: str, chat_id: str = None) -> bool:
+    async def _edit_message_async(self, message_id: int, message: str, chat_id: str = None) -> int:
         """
-        Send a plain text message to Telegram
+        Replace the text of a sent message asynchronously
+
+        Raises:
+            Exception if editing fails (for retry logic)
+        """
+        target_chat_id = chat_id or self.chat_id
+        try:
+            await self.bot.edit_message_text(
+                chat_id=target_chat_id,
+                message_id=message_id,
+                text=message,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=False
+            )
+        except BadRequest as e:
+            # Same text as before is not an error for us
+            if 'message is not modified' not in str(e).lower():
+                raise
+        logger.info(f"Message {message_id} edited in Telegram chat {target_chat_id}")
+        return message_id
+
+    def _run_with_retry(self, make_coroutine: Callable[[], Awaitable], action: str = "send message"):
+        """
+        Run a Bot API call on the persistent event loop, retrying transient errors
 
         Args:
-            message: Message text to send
-            chat_id: Optional chat ID to send to (uses default if not specified)
+            make_coroutine: Function returning a fresh coroutine for each attempt
+            action: Description used in log messages
 
         Returns:
-            True if successful, False otherwise
+            Result of the coroutine, or None if it failed
         """
-        if not self.enabled:
-            logger.debug("Telegram notifications disabled, skipping message")
-            return False
-
         import time
         max_retries = 3
         retry_delay = 2  # Start with 2 seconds
 
         for attempt in range(max_retries):
             try:
-                logger.info(f"Attempting to send message (attempt {attempt + 1}/{max_retries})")
+                logger.info(f"Attempting to {action} (attempt {attempt + 1}/{max_retries})")
 
                 # Create or reuse persistent event loop for this instance
                 if self.event_loop is None or self.event_loop.is_closed():
@@ -143,10 +263,10 @@ class TelegramNotifier:
                     self.event_loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(self.event_loop)
 
-                # Run the async send operation
-                self.event_loop.run_until_complete(self._send_message_async(message, chat_id))
-                logger.info(f"Message sent successfully on attempt {attempt + 1}")
-                return True
+                # Run the async operation
+                result = self.event_loop.run_until_complete(make_coroutine())
+                logger.info(f"Succeeded to {action} on attempt {attempt + 1}")
+                return result
 
             except Exception as e:
                 error_str = str(e)
@@ -166,13 +286,125 @@ class TelegramNotifier:
                     retry_delay *= 2  # Exponential backoff
                     continue  # Try again
                 else:
-                    logger.error(f"Error in send_message (attempt {attempt + 1}/{max_retries}): {e}")
+                    logger.error(f"Failed to {action} (attempt {attempt + 1}/{max_retries}): {e}")
                     if attempt < max_retries - 1:
                         logger.error("Non-retryable error, aborting")
-                    return False
+                    return None
+
+        logger.error(f"Failed to {action} after {max_retries} attempts")
+        return None
+
+    def send_message(self, message: str, chat_id: str = None) -> bool:
+        """
+        Send a plain text message to Telegram
+
+        Args:
+            message: Message text to send
+            chat_id: Optional chat ID to send to (uses default if not specified)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.enabled:
+            logger.debug("Telegram notifications disabled, skipping message")
+            return False
+
+        return self._run_with_retry(lambda: self._send_message_async(message, chat_id)) is not None
+
+    def post_document(self, document: Dict, document_id: Optional[int] = None) -> Dict[str, Tuple[str, int]]:
+        """
+        Post a new document right away to the chat of every language
+
+        The summary is marked as pending, or in lazy mode (SUMMARY_MODE=lazy)
+        replaced by a Summarize button handled by the bot.
+
+        Args:
+            document: Document dictionary containing name, url, size, etc.
+            document_id: Stored document ID, needed for the Summarize button
+
+        Returns:
+            Dictionary mapping language to the (chat_id, message_id) to edit
+            later; languages whose post failed are missing
+        """
+        if not self.enabled:
+            logger.debug("Telegram notifications disabled, skipping document notification")
+            return {}
+
+        messages = {}
+        for language, chat_id in self.language_chats.items():
+            try:
+                lazy = self.lazy_summaries and document_id is not None
+                message = self.format_document_message(document, summary_pending=not lazy, language=language)
+                reply_markup = self.summary_button(document_id, language) if lazy else None
+                message_id = self._run_with_retry(
+                    lambda: self._send_message_async(message, chat_id, reply_markup)
+                )
+                if message_id is not None:
+                    messages[language] = (chat_id, message_id)
+
+            except Exception as e:
+                logger.error(f"Error notifying about document ({language}): {e}")
+        return messages
+
+    def update_document(self, messages: Dict[str, Tuple[Optional[str], int]], document: Dict) -> bool:
+        """
+        Edit posted document messages in place once the summaries are ready
+
+        Args:
+            messages: Dictionary mapping language to (chat_id, message_id) returned by post_document
+            document: Document dictionary, with 'summaries' by language (or a single
+                'summary' for the primary language) if they were generated
 
-        logger.error(f"Failed to send message after {max_retries} attempts")
-        return False
+        Returns:
+            True if every message was edited, False otherwise
+        """
+        if not self.enabled:
+            return False
+
+        edited = True
+        for language, (chat_id, message_id) in messages.items():
+            try:
+                summary = (document['summaries'].get(language) if document.get('summaries')
+                           else document.get('summary'))
+                message = self.format_document_message(dict(document, summary=summary), language=language)
+                edited = self._run_with_retry(
+                    lambda: self._edit_message_async(message_id, message, chat_id), action="edit message"
+                ) is not None and edited
+
+            except Exception as e:
+                logger.error(f"Error updating document message ({language}): {e}")
+                edited = False
+        return edited
+
+    def post_digest(self, event: str, documents: List[Dict], summaries: Dict[str, str]) -> Dict[str, Tuple[str, int]]:
+        """
+        Post a stewards' digest to the chat of every language
+
+        Args:
+            event: Event the documents belong to
+            documents: Digested documents with 'document_name' and 'document_url'
+            summaries: Digest summary per language (may be empty)
+
+        Returns:
+            Dictionary mapping language to the (chat_id, message_id) of the post
+        """
+        if not self.enabled:
+            logger.debug("Telegram notifications disabled, skipping digest")
+            return {}
+
+        messages = {}
+        for language, chat_id in self.language_chats.items():
+            try:
+                message = self.format_digest_message(event, documents, summaries.get(language), language)
+                message_id = self._run_with_retry(
+                    lambda: self._send_message_async(message, chat_id), action="post digest"
+                )
+                if message_id is not None:
+                    messages[language] = (chat_id, message_id)
+
+            except Exception as e:
+                logger.error(f"Error posting digest ({language}): {e}")
+        return messages
 
     def notify_new_document(self, document: Dict) -> bool:
         """
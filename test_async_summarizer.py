@@ -0,0 +1,88 @@
+"""
+Test script for concurrent summarization
+Runs two throttled summarize_batch bursts of one AsyncSummarizationService
+against a local fake Messages endpoint, without the real Anthropic API
+"""
+
+import os
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import async_summarizer
+from async_summarizer import AsyncSummarizationService, TokenRateScheduler
+from claude_summarizer import ClaudeSummarizer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeMessagesAPI(BaseHTTPRequestHandler):
+    """Minimal /v1/messages implementation answering every request"""
+
+    calls = 0
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeMessagesAPI.calls += 1
+        body = json.dumps({
+            'id': f"msg_{FakeMessagesAPI.calls}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': payload['model'],
+            'content': [{'type': 'text', 'text': f"Саммари {FakeMessagesAPI.calls}"}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': 100, 'output_tokens': 20}
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    """Test that the shared rate scheduler survives one event loop per burst"""
+    logger.info("=== Testing Async Summarization ===")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeMessagesAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ['ANTHROPIC_BASE_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+    async_summarizer.WINDOW_SECONDS = 0.2
+
+    try:
+        summarizer = ClaudeSummarizer()
+        summarizer.api_key = 'test-key'
+        summarizer.api_available = True
+
+        # One request per window: calls queue up on the scheduler lock in every burst
+        service = AsyncSummarizationService(summarizer, max_concurrency=2,
+                                            scheduler=TokenRateScheduler(requests_per_minute=1))
+
+        for burst in range(2):
+            items = [(f"{burst}-{i}", f"Decision text {burst} {i}", f"Decision - Car {i}") for i in range(3)]
+            results = service.summarize_batch(items)
+            assert all(r and r['source'] == 'llm' for r in results.values()), results
+
+        assert FakeMessagesAPI.calls == 6, FakeMessagesAPI.calls
+
+        logger.info("=== Test Complete: all checks passed ===")
+
+    except Exception as e:
+        logger.error(f"Error during test: {e}", exc_info=True)
+        raise
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
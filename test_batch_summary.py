@@ -0,0 +1,188 @@
+"""
+Test script for batch summarization
+Runs BatchSummarizer against a local fake Message Batches endpoint,
+without the real Anthropic API or database
+"""
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anthropic
+
+from claude_summarizer import ClaudeSummarizer
+from batch_summarizer import BatchSummarizer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeBatchAPI(BaseHTTPRequestHandler):
+    """Minimal /v1/messages/batches implementation: batches end on the second poll"""
+
+    batches = {}
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _batch(self, batch_id, ended):
+        requests_ = self.batches[batch_id]['requests']
+        host = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else len(requests_),
+                'succeeded': len(requests_) if ended else 0,
+                'errored': 0, 'canceled': 0, 'expired': 0
+            },
+            'created_at': '2026-01-01T00:00:00Z',
+            'expires_at': '2026-01-02T00:00:00Z',
+            'ended_at': '2026-01-01T00:01:00Z' if ended else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"{host}/v1/messages/batches/{batch_id}/results" if ended else None
+        }
+
+    def _send(self, body, content_type='application/json'):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        batch_id = f"msgbatch_{len(self.batches) + 1}"
+        self.batches[batch_id] = {'requests': payload['requests'], 'polls': 0}
+        self._send(self._batch(batch_id, ended=False))
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        batch_id = parts[3]
+
+        if parts[-1] == 'results':
+            lines = []
+            for request in self.batches[batch_id]['requests']:
+                lines.append(json.dumps({
+                    'custom_id': request['custom_id'],
+                    'result': {
+                        'type': 'succeeded',
+                        'message': {
+                            'id': f"msg_{request['custom_id']}",
+                            'type': 'message',
+                            'role': 'assistant',
+                            'model': request['params']['model'],
+                            'content': [{'type': 'text', 'text': f"Саммари {request['custom_id']}"}],
+                            'stop_reason': 'end_turn',
+                            'stop_sequence': None,
+                            'usage': {'input_tokens': 100, 'output_tokens': 20}
+                        }
+                    }
+                }))
+            self._send('\n'.join(lines).encode(), 'application/binary')
+            return
+
+        batch = self.batches[batch_id]
+        batch['polls'] += 1
+        self._send(self._batch(batch_id, ended=batch['polls'] >= 2))
+
+
+class InMemoryDatabase:
+    """Implements the Database methods used by BatchSummarizer"""
+
+    def __init__(self, documents):
+        self.documents = {doc['id']: dict(doc) for doc in documents}
+        self.batches = {}
+
+    def get_documents_for_summary(self, season=None, missing_only=True):
+        open_ids = {i for b in self.batches.values() if b['status'] == 'submitted' for i in b['ids']}
+        return [
+            doc for doc in self.documents.values()
+            if (not missing_only or not doc.get('summary')) and doc['id'] not in open_ids
+        ]
+
+    def get_texts_for_documents(self, document_ids):
+        return {i: self.documents[i]['text'] for i in document_ids}
+
+    def update_summaries(self, summaries, language_summaries=None):
+        for document_id, language, summary in language_summaries or []:
+            self.documents[document_id].setdefault('languages', {})[language] = summary
+        for document_id, summary, strategy, source, input_tokens, output_tokens in summaries:
+            self.documents[document_id].update(summary=summary, summary_strategy=strategy,
+                                               summary_source=source,
+                                               summary_input_tokens=input_tokens,
+                                               summary_output_tokens=output_tokens)
+        return len(summaries)
+
+    def create_summary_batch(self, batch_id, document_ids):
+        self.batches[batch_id] = {'status': 'submitted', 'ids': list(document_ids)}
+
+    def get_open_summary_batches(self):
+        return [i for i, b in self.batches.items() if b['status'] == 'submitted']
+
+    def set_summary_batch_status(self, batch_id, status):
+        self.batches[batch_id]['status'] = status
+
+
+def main():
+    """Test batch summarization end to end against the fake endpoint"""
+    logger.info("=== Testing Batch Summarization ===")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBatchAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    logger.info(f"Fake endpoint: {base_url}")
+
+    try:
+        client = anthropic.Anthropic(api_key='test-key', base_url=base_url, max_retries=0)
+
+        summarizer = ClaudeSummarizer()
+        summarizer.api_available = True
+        summarizer.client = client
+
+        db = InMemoryDatabase([
+            {'id': i, 'document_name': f"Document {i}", 'document_url': f"{base_url}/{i}.pdf",
+             'text': f"Decision text of document {i}", 'summary': None}
+            for i in range(1, 6)
+        ])
+        db.documents[5]['summary'] = 'Existing summary'
+
+        # Interrupted run: batches are submitted and checkpointed, then the process "dies"
+        batch = BatchSummarizer(summarizer, db, poll_interval=0, max_requests=3, client=client)
+        batch_ids = batch.submit()
+        assert len(batch_ids) == 2, batch_ids
+        assert db.get_open_summary_batches() == batch_ids
+
+        # Nothing new is submitted for documents already in open batches
+        assert batch.submit() == []
+
+        # Next run resumes the open batches and writes summaries back in bulk
+        written = BatchSummarizer(summarizer, db, poll_interval=0, client=client).run()
+        assert written == 4, written
+        assert not db.get_open_summary_batches()
+        assert db.documents[1]['summary'] == 'Саммари doc-1'
+        assert db.documents[1]['summary_strategy'] == 'single'
+        assert db.documents[1]['summary_source'] == 'llm'
+        assert db.documents[1]['summary_input_tokens'] == 100
+        assert db.documents[1]['languages'] == {'ru': 'Саммари doc-1'}
+        assert db.documents[5]['summary'] == 'Existing summary'
+
+        logger.info("=== Test Complete: all checks passed ===")
+
+    except Exception as e:
+        logger.error(f"Error during test: {e}", exc_info=True)
+        raise
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Test script for document classification
+Checks which titles get a templated summary and which go to the model,
+without the Anthropic API or database
+"""
+
+import logging
+
+from document_classifier import DocumentClassifier
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Run classification checks"""
+    logger.info("=== Testing Document Classifier ===")
+    classifier = DocumentClassifier(enabled=True)
+
+    # Formulaic titles
+    assert classifier.classify('2025 Abu Dhabi Grand Prix - Provisional Race Classification.pdf') == 'classification'
+    assert classifier.classify('Final Starting Grid') == 'starting_grid'
+    assert classifier.classify('Entry List') == 'entry_list'
+    assert classifier.classify('Event Timetable') == 'timetable'
+    assert classifier.classify('Summons - Car 4') == 'summons'
+
+    # Titles that need the model, whatever the pattern words in them
+    assert classifier.classify('Decision - Car 4 - Timetable infringement') is None
+    assert classifier.classify('Offence - Car 16 - Entry List') is None
+
+    # Descriptive titles: the body is not searched for pattern words
+    assert classifier.classify('Race Director Event Notes',
+                               'Race Director Event Notes\n... per the official timetable ...') is None
+    assert classifier.classify('Team Managers Meeting',
+                               'Agenda\n1. Changes to the entry list\n2. Pit lane') is None
+    route = classifier.route('Race Director Event Notes', 'Notes\nSessions run per the official timetable.')
+    assert route == {'type': None}, route
+
+    # File names and numbers fall back to the first page header
+    header = 'FIA Formula One World Championship\n2025 Abu Dhabi Grand Prix\nENTRY LIST\nNo Driver Team'
+    assert classifier.classify('2025_045_v2.pdf', header) == 'entry_list'
+    assert classifier.classify('Doc 12', 'FIA\nTIMETABLE\nFriday') == 'timetable'
+    assert classifier.classify('Doc 12', 'FIA\nDecision\nCar 4, timetable') is None
+
+    # Only the header lines count, not mentions further down the body
+    body = 'FIA Formula One World Championship\nNote\n' + '\n'.join(f"Line {i}" for i in range(10))
+    assert classifier.classify('Doc 13', body + '\nSee the entry list') is None
+
+    logger.info("=== Test Complete: all checks passed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Test script for document inserts
+Inserts the same URL and the same content under two seasons against the
+PostgreSQL database from .env and checks that only the first one is stored.
+The test rows go to the default partition and are deleted afterwards.
+"""
+
+import logging
+from dotenv import load_dotenv
+
+from old_database import Database
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+URL = "https://example.invalid/test-document-insert/{}.pdf"
+HASH = "test-document-insert-{}"
+
+
+def document(name, season, url=None, document_hash=None):
+    return {'name': name, 'url': url or URL.format(name), 'hash': document_hash or HASH.format(name),
+            'size': 1, 'season': season}
+
+
+def main():
+    """Run cross-season duplicate checks"""
+    logger.info("=== Testing Document Inserts ===")
+
+    db = Database()
+    # Known to this Database: no partitions are created for the test seasons
+    db.season_partitions.update({'test-a', 'test-b'})
+
+    try:
+        first = db.insert_document(document('first', 'test-a'))
+        assert first is not None
+
+        # Same URL or same content under another season
+        assert db.insert_document(document('first', 'test-b')) is None
+        assert db.insert_document(document('copy', 'test-b', document_hash=HASH.format('first'))) is None
+
+        # Bulk inserts skip documents known in any season and repeats within the list
+        ids = db.insert_documents([
+            document('first', 'test-b'),
+            document('second', 'test-b'),
+            document('second-copy', 'test-a', document_hash=HASH.format('second')),
+        ])
+        assert ids[0] is None and ids[1] is not None and ids[2] is None, ids
+
+        urls, _ = db.get_existing_documents([URL.format(n) for n in ('first', 'second', 'copy')], [])
+        assert urls == {URL.format('first'), URL.format('second')}, urls
+
+        logger.info("=== Test Complete: all checks passed ===")
+
+    except Exception as e:
+        logger.error(f"Error during test: {e}", exc_info=True)
+        raise
+    finally:
+        with db.connection() as connection, connection.cursor() as cursor:
+            cursor.execute("DELETE FROM fia_documents WHERE document_url LIKE %s",
+                           (URL.format('%'),))
+            connection.commit()
+        db.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Test script for revision detection
+Stores the pages of a document against the PostgreSQL database from .env and
+checks which page sets are taken for a revision of it. The test pages are
+deleted afterwards.
+"""
+
+import logging
+from dotenv import load_dotenv
+
+from old_database import Database
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DOCUMENT_ID = -1  # document_pages has no foreign key, no document row is needed
+
+
+def page_hash(name):
+    return f"test-previous-version-{name}"
+
+
+def main():
+    """Run revision matching checks"""
+    logger.info("=== Testing Previous Version Lookup ===")
+
+    db = Database()
+    stored = [page_hash(n) for n in ('cover', 'p1', 'p2', 'p3')]
+
+    try:
+        assert db.save_document_pages(DOCUMENT_ID, [
+            {'page_number': number, 'hash': h, 'text': None} for number, h in enumerate(stored, 1)
+        ])
+
+        # Only the cover page in common: a different document
+        other = [page_hash('cover'), page_hash('x1'), page_hash('x2'), page_hash('x3')]
+        assert db.find_previous_version(other) is None
+
+        # Page 2 changed: a revision, pages come back in page order
+        revision = [page_hash('cover'), page_hash('p1'), page_hash('p2-new'), page_hash('p3')]
+        assert db.find_previous_version(revision) == (DOCUMENT_ID, stored)
+
+        # Half of the new pages is enough
+        assert db.find_previous_version(stored[:2] + [page_hash('x1'), page_hash('x2')]) is not None
+
+        logger.info("=== Test Complete: all checks passed ===")
+
+    except Exception as e:
+        logger.error(f"Error during test: {e}", exc_info=True)
+        raise
+    finally:
+        with db.connection() as connection, connection.cursor() as cursor:
+            cursor.execute("DELETE FROM document_pages WHERE document_id = %s", (DOCUMENT_ID,))
+            connection.commit()
+        db.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
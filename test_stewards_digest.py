@@ -0,0 +1,112 @@
+"""
+Test script for stewards' digests
+Checks how stewards' documents are grouped per event and time gap and
+when a digest is due, without the Anthropic API or database
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from stewards_digest import StewardsDigest, event_name, MODE_DIGEST, MODE_ONLY
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+NOW = datetime(2025, 12, 7, 18, 0)
+ABU_DHABI = "https://www.fia.com/sites/default/files/decision-document/2025_Abu_Dhabi_Grand_Prix_-_{}.pdf"
+QATAR = "https://www.fia.com/sites/default/files/decision-document/2025_Qatar_Grand_Prix_-_{}.pdf"
+
+
+def document(document_id, name, url, minutes_ago):
+    return {'id': document_id, 'document_name': name, 'document_url': url.format(name.replace(' ', '_')),
+            'season': '2025', 'summary': None, 'summary_source': None,
+            'created_at': NOW - timedelta(minutes=minutes_ago)}
+
+
+class FakeDB:
+    """Undigested documents and saved digests in memory"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.digests = []
+
+    def get_undigested_documents(self, since):
+        return [d for d in self.documents if d['created_at'] >= since and not d.get('digest_id')]
+
+    def get_texts_for_documents(self, document_ids):
+        return {document_id: 'Decision text' for document_id in document_ids}
+
+    def save_digest(self, event, document_ids, result):
+        self.digests.append((event, document_ids))
+        for d in self.documents:
+            if d['id'] in document_ids:
+                d['digest_id'] = len(self.digests)
+
+
+class FakeSummarizer:
+    def summarize_digest(self, event, entries):
+        return {'summary': f"Digest {event}", 'summaries': {'ru': f"Digest {event}"}, 'source': 'llm'}
+
+
+def make_digest(mode, documents):
+    return StewardsDigest(FakeDB(documents), FakeSummarizer(), mode=mode, gap_minutes=20,
+                          min_documents=3, lookback_hours=6, max_delay_minutes=60)
+
+
+def main():
+    """Run digest grouping checks"""
+    logger.info("=== Testing Stewards Digest ===")
+
+    assert event_name(ABU_DHABI.format('Decision_-_Car_4')) == '2025 Abu Dhabi Grand Prix'
+    assert event_name('https://example.invalid/notes.pdf', 'Сезон 2025') == 'Сезон 2025'
+
+    documents = [
+        # Abu Dhabi: a closed burst of three, a 30 minute gap, then a closed burst of one
+        document(1, 'Decision - Car 4', ABU_DHABI, 120),
+        document(2, 'Decision - Car 16', ABU_DHABI, 110),
+        document(3, 'Summons - Car 1', ABU_DHABI, 100),
+        document(4, 'Decision - Car 1', ABU_DHABI, 70),
+        # Qatar: an open burst (last document 5 minutes ago)
+        document(5, 'Decision - Car 44', QATAR, 15),
+        document(6, 'Offence - Car 63', QATAR, 5),
+        # Not a stewards' document
+        document(7, 'Final Race Classification', ABU_DHABI, 90),
+    ]
+    digest = make_digest(MODE_DIGEST, [dict(d) for d in documents])
+
+    # Split by gap and event; open groups and other documents are left out
+    groups = digest.group_documents(documents, NOW)
+    assert [(g['event'], [d['id'] for d in g['documents']]) for g in groups] == [
+        ('2025 Abu Dhabi Grand Prix', [1, 2, 3]),
+        ('2025 Abu Dhabi Grand Prix', [4]),
+    ], groups
+
+    # The Qatar burst closes 20 minutes after its last document, but in 'digest'
+    # mode two documents are below the threshold: nothing to wake up for
+    assert digest.seconds_until_close(documents, NOW) is None
+    assert digest.run_once(NOW) == 1
+    assert digest.db.digests == [('2025 Abu Dhabi Grand Prix', [1, 2, 3])]
+
+    # In 'only' mode every group is digested, and the open one is due in 15 minutes
+    digest = make_digest(MODE_ONLY, [dict(d) for d in documents])
+    assert digest.min_group_size == 1
+    assert digest.seconds_until_close(documents, NOW) == 15 * 60
+    assert digest.next_run_in(NOW) == 15 * 60
+    assert digest.run_once(NOW) == 2
+    assert [ids for _, ids in digest.db.digests] == [[1, 2, 3], [4]]
+    assert digest.next_run_in(NOW) == 15 * 60  # Only the Qatar burst is left
+    assert digest.run_once(NOW + timedelta(minutes=15)) == 1
+    assert digest.db.digests[-1] == ('2025 Qatar Grand Prix', [5, 6])
+
+    # Digests off: never scheduled
+    assert make_digest('off', documents).next_run_in(NOW) is None
+
+    logger.info("=== Test Complete: all checks passed ===")
+
+
+if __name__ == "__main__":
+    main()
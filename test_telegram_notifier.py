@@ -0,0 +1,43 @@
+"""
+Test script for Telegram message formatting
+Checks that document names and summaries are escaped for HTML parse mode,
+without the Telegram API
+"""
+
+import logging
+
+from telegram_notifier import TelegramNotifier
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Run message formatting checks"""
+    logger.info("=== Testing Telegram Message Formatting ===")
+
+    document = {
+        'name': 'Decision - Car 4 & Car 16 <Turn 1>',
+        'url': 'https://www.fia.com/sites/default/files/decision-document/decision.pdf',
+        'season': '2025',
+        'summary': 'Разница < 0.1 с, штраф 5 с & предупреждение',
+    }
+
+    message = TelegramNotifier.format_document_message(document)
+    assert '📄 <b>Decision - Car 4 &amp; Car 16 &lt;Turn 1&gt;</b>' in message, message
+    assert 'Разница &lt; 0.1 с, штраф 5 с &amp; предупреждение' in message, message
+    assert '<Turn 1>' not in message and '< 0.1' not in message, message
+
+    # Extractive fallbacks are escaped the same way
+    message = TelegramNotifier.format_document_message(dict(document, summary_source='extractive'), language='en')
+    assert 'Key passages:</b>\nРазница &lt; 0.1 с' in message, message
+
+    logger.info("=== Test Complete: all checks passed ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Text Compactor Module
+
+Normalizes extracted PDF text and strips learned FIA boilerplate before prompting
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+from typing import Optional, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Word broken across lines by a hyphen: "regula-\ntions"
+HYPHENATION_RE = re.compile(r'(?<=[^\W\d_])-\n(?=[a-zа-яё])')
+# Page footers: "Page 2 of 5", "2/5", "- 3 -". Bare numbers are left alone: on
+# their own line they are as often car numbers or positions as page numbers.
+PAGE_FOOTER_RE = re.compile(r'^(?:page\s*\d+(?:\s*(?:/|of)\s*\d+)?|\d+\s*(?:/|of)\s*\d+|-\s*\d{1,3}\s*-)$',
+                            re.IGNORECASE)
+INLINE_SPACE_RE = re.compile(r'[ \t\u00a0\u2009\u202f]+')
+DIGITS_RE = re.compile(r'\d+')
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Rough token estimate used for reporting and budgeting
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate number of tokens (about 4 characters per token)
+    """
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens (estimated)
+
+    Splits on paragraph breaks first, then on lines, and only cuts inside
+    a line when a single line is longer than a chunk.
+
+    Args:
+        text: Text to split
+        max_tokens: Maximum estimated tokens per chunk
+
+    Returns:
+        List of chunks in document order
+    """
+    max_chars = max_tokens * 4
+    pieces = []
+    for paragraph in text.split('\n\n'):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.split('\n'):
+            while len(line) > max_chars:
+                pieces.append(line[:max_chars])
+                line = line[max_chars:]
+            pieces.append(line)
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        candidate = f"{current}\n\n{piece}" if current else piece
+        if estimate_tokens(candidate) <= max_tokens:
+            current = candidate
+        else:
+            if current:
+                chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+class TextCompactor:
+    """Shrinks document text before it is sent to the model"""
+
+    def __init__(self, db=None, min_documents: Optional[int] = None, min_ratio: Optional[float] = None,
+                 min_line_chars: Optional[int] = None, refresh_interval: Optional[int] = None):
+        """
+        Initialize Text Compactor
+
+        Args:
+            db: Optional Database used to store the boilerplate frequency index
+            min_documents: Minimum number of documents a line must appear in (BOILERPLATE_MIN_DOCS)
+            min_ratio: Minimum share of the corpus a line must appear in (BOILERPLATE_MIN_RATIO)
+            min_line_chars: Shorter lines (headings such as "Decision") are never stripped
+            refresh_interval: Seconds between reloads of the boilerplate set from the DB
+        """
+        self.db = db
+        self.min_documents = min_documents or int(os.getenv('BOILERPLATE_MIN_DOCS', 20))
+        self.min_ratio = min_ratio or float(os.getenv('BOILERPLATE_MIN_RATIO', 0.3))
+        self.min_line_chars = min_line_chars or int(os.getenv('BOILERPLATE_MIN_LINE_CHARS', 15))
+        self.refresh_interval = refresh_interval or int(os.getenv('BOILERPLATE_REFRESH_INTERVAL', 3600))
+
+        self.boilerplate = set()
+        self.last_refresh = 0
+        self.total_chars_saved = 0
+        self.total_tokens_saved = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize whitespace, hyphenation and page footers
+
+        Args:
+            text: Raw extracted text
+
+        Returns:
+            Normalized text
+        """
+        if not text:
+            return ''
+
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = INLINE_SPACE_RE.sub(' ', text)
+        text = '\n'.join(line.strip() for line in text.split('\n'))
+        text = HYPHENATION_RE.sub('', text)
+
+        lines = []
+        for line in text.split('\n'):
+            if PAGE_FOOTER_RE.match(line):
+                continue
+            # Collapse runs of blank lines into a single paragraph break
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+
+        return '\n'.join(lines).strip()
+
+    @staticmethod
+    def line_key(line: str) -> str:
+        """
+        Key under which a line is counted in the boilerplate index
+
+        Digits are masked so dated footers and numbered headers count as one line.
+        """
+        normalized = DIGITS_RE.sub('#', line.lower())
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def _candidate_lines(self, text: str) -> Dict[str, str]:
+        """Map line key to line text for lines long enough to be boilerplate"""
+        return {
+            self.line_key(line): line
+            for line in text.split('\n')
+            if len(line) >= self.min_line_chars
+        }
+
+    def learn(self, text: str):
+        """
+        Add a document to the boilerplate frequency index
+
+        Args:
+            text: Document text (raw or normalized)
+        """
+        if self.db is None or not text:
+            return
+
+        lines = self._candidate_lines(self.normalize(text))
+        if lines:
+            self.db.update_boilerplate_index(lines)
+
+    def learn_corpus(self, texts: Iterable[str]) -> int:
+        """
+        Rebuild the index from already stored documents
+
+        Lines are counted in memory and replace the stored index and corpus
+        count in one transaction, so documents learned before (on the live
+        path or by an earlier rebuild) are not counted twice.
+
+        Args:
+            texts: Iterable of document texts
+
+        Returns:
+            Number of documents learned
+        """
+        if self.db is None:
+            return 0
+
+        counts = {}
+        count = 0
+        for text in texts:
+            if not text:
+                continue
+            count += 1
+            for key, line in self._candidate_lines(self.normalize(text)).items():
+                line_text, documents = counts.get(key, (line, 0))
+                counts[key] = (line_text, documents + 1)
+
+        self.db.replace_boilerplate_index(counts, count)
+        self.last_refresh = 0
+        logger.info(f"Boilerplate index rebuilt from {count} stored documents ({len(counts)} lines)")
+        return count
+
+    def refresh(self, force: bool = False):
+        """Reload the boilerplate line set from the DB if it is stale"""
+        if self.db is None:
+            return
+        if not force and time.time() - self.last_refresh < self.refresh_interval:
+            return
+
+        self.boilerplate = self.db.get_boilerplate_lines(self.min_documents, self.min_ratio)
+        self.last_refresh = time.time()
+        logger.info(f"Loaded {len(self.boilerplate)} boilerplate lines")
+
+    def compact(self, text: str) -> Dict:
+        """
+        Normalize text and strip known boilerplate lines
+
+        Args:
+            text: Raw extracted text
+
+        Returns:
+            Dictionary with compacted 'text' and 'chars_saved', 'tokens_saved',
+            'lines_removed' statistics
+        """
+        self.refresh()
+
+        normalized = self.normalize(text)
+        lines_removed = 0
+        if self.boilerplate:
+            kept = []
+            for line in normalized.split('\n'):
+                if len(line) >= self.min_line_chars and self.line_key(line) in self.boilerplate:
+                    lines_removed += 1
+                    continue
+                kept.append(line)
+            normalized = '\n'.join(kept).strip()
+
+        chars_saved = len(text) - len(normalized)
+        tokens_saved = estimate_tokens(text) - estimate_tokens(normalized)
+        self.total_chars_saved += chars_saved
+        self.total_tokens_saved += tokens_saved
+
+        logger.info(
+            f"Prompt compaction: {len(text)} -> {len(normalized)} chars "
+            f"(saved {chars_saved} chars, ~{tokens_saved} tokens, {lines_removed} boilerplate lines)"
+        )
+
+        return {
+            'text': normalized,
+            'chars_saved': chars_saved,
+            'tokens_saved': tokens_saved,
+            'lines_removed': lines_removed
+        }
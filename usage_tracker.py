@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Usage Tracker Module
+
+Persists token usage and cost of every summary and steers the summarizer
+towards cheaper paths as the monthly budget is consumed
+"""
+
+import os
+import time
+import calendar
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: input, output, cache write, cache read (longest prefix wins)
+MODEL_PRICES = {
+    'claude-3-haiku': (0.25, 1.25, 0.30, 0.03),
+    'claude-3-5-haiku': (0.80, 4.00, 1.00, 0.08),
+    'claude-haiku-4': (1.00, 5.00, 1.25, 0.10),
+    'claude-3-5-sonnet': (3.00, 15.00, 3.75, 0.30),
+    'claude-3-7-sonnet': (3.00, 15.00, 3.75, 0.30),
+    'claude-sonnet-4': (3.00, 15.00, 3.75, 0.30),
+    'claude-3-opus': (15.00, 75.00, 18.75, 1.50),
+    'claude-opus-4': (15.00, 75.00, 18.75, 1.50),
+}
+BATCH_DISCOUNT = 0.5
+
+# Governor modes, cheapest last
+MODE_NORMAL = 'normal'
+MODE_ECONOMY = 'economy'
+MODE_LOCAL = 'local'
+
+
+def model_prices(model: str):
+    """Per-million-token prices of a model (input, output, cache write, cache read)"""
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not matches:
+        logger.warning(f"No price known for model {model}, using claude-3-5-sonnet prices")
+        return MODEL_PRICES['claude-3-5-sonnet']
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+def call_cost(model: str, usage: Dict, batch: bool = False) -> float:
+    """
+    Cost of one API call in USD
+
+    Args:
+        model: Model name
+        usage: Dict with input_tokens, output_tokens, cache_creation_input_tokens, cache_read_input_tokens
+        batch: Call made through the Message Batches API
+
+    Returns:
+        Cost in USD
+    """
+    input_price, output_price, write_price, read_price = model_prices(model)
+    cost = (usage.get('input_tokens', 0) * input_price
+            + usage.get('output_tokens', 0) * output_price
+            + usage.get('cache_creation_input_tokens', 0) * write_price
+            + usage.get('cache_read_input_tokens', 0) * read_price) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def month_start(now: Optional[datetime] = None) -> datetime:
+    """Midnight of the first day of the current month"""
+    now = now or datetime.now()
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def governor_mode(spent: float, budget: float, now: Optional[datetime] = None,
+                  economy_at: Optional[float] = None, local_at: Optional[float] = None,
+                  pace_slack: Optional[float] = None) -> str:
+    """
+    Summarization mode for the money spent so far this month
+
+    Economy mode starts at a share of the budget, or earlier when spending
+    runs ahead of the month (a burst early in the month must not use up the
+    budget for the race weekend). Local mode stops API calls entirely.
+
+    Args:
+        spent: USD spent this month
+        budget: Monthly budget in USD (0 disables the governor)
+        now: Current time
+        economy_at: Budget share switching to economy mode (GOVERNOR_ECONOMY_AT)
+        local_at: Budget share switching to local summaries only (GOVERNOR_LOCAL_AT)
+        pace_slack: Allowed lead of budget share over month share (GOVERNOR_PACE_SLACK)
+
+    Returns:
+        'normal', 'economy' or 'local'
+    """
+    if not budget:
+        return MODE_NORMAL
+
+    economy_at = economy_at if economy_at is not None else float(os.getenv('GOVERNOR_ECONOMY_AT', 0.7))
+    local_at = local_at if local_at is not None else float(os.getenv('GOVERNOR_LOCAL_AT', 0.95))
+    pace_slack = pace_slack if pace_slack is not None else float(os.getenv('GOVERNOR_PACE_SLACK', 0.25))
+
+    now = now or datetime.now()
+    days_in_month = calendar.monthrange(now.year, now.month)[1]
+    month_share = (now - month_start(now)).total_seconds() / (days_in_month * 86400)
+
+    share = spent / budget
+    if share >= local_at:
+        return MODE_LOCAL
+    if share >= economy_at or share > month_share + pace_slack:
+        return MODE_ECONOMY
+    return MODE_NORMAL
+
+
+class UsageTracker:
+    """Records usage rows in api_usage and tracks this month's spend for the governor"""
+
+    def __init__(self, db, monthly_budget: Optional[float] = None, refresh_interval: Optional[int] = None):
+        """
+        Initialize Usage Tracker
+
+        Args:
+            db: Database providing insert_api_usage/get_api_cost_since
+            monthly_budget: Monthly budget in USD, 0 to disable the governor (MONTHLY_BUDGET_USD)
+            refresh_interval: Seconds between reloads of the month's spend, which
+                other processes add to (USAGE_REFRESH_INTERVAL)
+        """
+        self.db = db
+        self.monthly_budget = (monthly_budget if monthly_budget is not None
+                               else float(os.getenv('MONTHLY_BUDGET_USD', 0)))
+        self.refresh_interval = refresh_interval or int(os.getenv('USAGE_REFRESH_INTERVAL', 300))
+
+        self.month_spent = 0.0
+        self.month = None
+        self.last_refresh = 0
+        self.last_mode = MODE_NORMAL
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = datetime.now()
+        if self.month == (now.year, now.month) and time.time() - self.last_refresh < self.refresh_interval:
+            return
+        try:
+            self.month_spent = self.db.get_api_cost_since(month_start(now))
+            self.month = (now.year, now.month)
+            self.last_refresh = time.time()
+        except Exception as e:
+            logger.warning(f"Could not load this month's API spend: {e}")
+
+    def record(self, model: str, source: str, strategy: str, usages: List[Dict],
+               document_name: Optional[str] = None, doc_type: Optional[str] = None,
+               batch: bool = False) -> float:
+        """
+        Persist the usage of one summary
+
+        One row is written per API call; summaries made without a call
+        (template, extractive, cache hit) are written as a single zero-cost row.
+
+        Args:
+            model: Model name
+            source: 'llm', 'extractive' or 'template'
+            strategy: Summarization strategy
+            usages: Usage dicts of the calls made
+            document_name: Name of the document
+            doc_type: Formulaic type from DocumentClassifier, if any
+            batch: Calls made through the Message Batches API
+
+        Returns:
+            Total cost in USD
+        """
+        rows = []
+        total = 0.0
+        for usage in usages or [{}]:
+            cost = call_cost(model, usage, batch) if usage else 0.0
+            total += cost
+            rows.append((
+                document_name, doc_type or 'other', source, strategy, model if usage else None,
+                usage.get('input_tokens', 0), usage.get('output_tokens', 0),
+                usage.get('cache_creation_input_tokens', 0), usage.get('cache_read_input_tokens', 0),
+                cost
+            ))
+
+        # Refresh before the rows are stored: a reload afterwards would already
+        # include them. The lock keeps other threads from reloading in between.
+        with self._lock:
+            self._refresh()
+            try:
+                self.db.insert_api_usage(rows)
+            except Exception as e:
+                logger.warning(f"Could not store API usage: {e}")
+            self.month_spent += total
+        return total
+
+    def mode(self) -> str:
+        """Current governor mode"""
+        if not self.monthly_budget:
+            return MODE_NORMAL
+
+        with self._lock:
+            self._refresh()
+            mode = governor_mode(self.month_spent, self.monthly_budget)
+            if mode != self.last_mode:
+                logger.warning(f"Budget governor: {self.last_mode} -> {mode} "
+                               f"(${self.month_spent:.2f} of ${self.monthly_budget:.2f} spent this month)")
+                self.last_mode = mode
+            return mode